@@ -18,6 +18,7 @@ export const CheckInWorkflow: React.FC<CheckInWorkflowProps> = ({ isAI }) => {
   // Actions from store
   const setCheckInSearch = useHotelStore((state) => state.setCheckInSearch);
   const selectCheckInReservation = useHotelStore((state) => state.selectCheckInReservation);
+  const completeWorkflow = useHotelStore((state) => state.completeWorkflow);
 
   const performSearch = (query: string) => {
     if (!query.trim()) {
@@ -56,6 +57,7 @@ export const CheckInWorkflow: React.FC<CheckInWorkflowProps> = ({ isAI }) => {
       alert(
         `Checking in ${selectedReservation.guest?.name} to room ${selectedReservation.room?.room_number}`
       );
+      completeWorkflow();
     }
   };
 
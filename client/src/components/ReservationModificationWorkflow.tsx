@@ -17,6 +17,7 @@ export const ReservationModificationWorkflow: React.FC<ReservationModificationWo
   const selectModificationReservation = useHotelStore((state) => state.selectModificationReservation);
   const setModificationEditMode = useHotelStore((state) => state.setModificationEditMode);
   const updateModificationEdit = useHotelStore((state) => state.updateModificationEdit);
+  const completeWorkflow = useHotelStore((state) => state.completeWorkflow);
 
   const handleSearch = (query: string) => {
     const results = mockReservations.filter(
@@ -36,6 +37,7 @@ export const ReservationModificationWorkflow: React.FC<ReservationModificationWo
     console.log('Saving reservation changes:', editedData);
     setModificationEditMode(screen, false);
     // In a real app, this would send data to backend
+    completeWorkflow();
   };
 
   return (
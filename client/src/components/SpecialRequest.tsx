@@ -13,12 +13,14 @@ export const SpecialRequest: React.FC<SpecialRequestProps> = ({ isAI }) => {
   const requestCreated = useHotelStore((state) => state[screen].specialRequestData.request_created);
   const updateSpecialRequestUI = useHotelStore((state) => state.updateSpecialRequestUI);
   const submitSpecialRequest = useHotelStore((state) => state.submitSpecialRequest);
+  const completeWorkflow = useHotelStore((state) => state.completeWorkflow);
 
   const [submitted, setSubmitted] = useState(false);
 
   const handleSubmit = (e: React.FormEvent) => {
     e.preventDefault();
     submitSpecialRequest(screen);
+    completeWorkflow();
     setSubmitted(true);
 
     // Reset form after 3 seconds
@@ -1,4 +1,4 @@
-import { useState, useCallback } from 'react';
+import { useState, useCallback, useEffect, useRef } from 'react';
 import { usePipecatClient, useRTVIClientEvent } from '@pipecat-ai/client-react';
 import { RTVIEvent } from '@pipecat-ai/client-js';
 import { useHotelStore } from '../store/hotelStore';
@@ -6,7 +6,8 @@ import { ConnectionState } from '../types/hotel';
 
 export const usePipecatHotel = () => {
   const client = usePipecatClient();
-  const { updateAI } = useHotelStore();
+  const { applyAIPatch, applyTentativeAI, commitTentativeAI, rollbackTentativeAI } = useHotelStore();
+  const completedWorkflows = useHotelStore((state) => state.completedWorkflows);
   const [connectionState, setConnectionState] = useState<ConnectionState>({
     isConnected: false,
     isConnecting: false,
@@ -35,12 +36,22 @@ export const usePipecatHotel = () => {
             console.log('📦 Function call payload:', data);
           
             let result: Record<string, unknown> = { success: false, message: 'Unknown function' };
+
+            // args is a versioned patch against the state last acknowledged to the server
+            const applyUpdate = (workflow: string) => {
+              const { version, base_version, patch } = data.args;
+              if (applyAIPatch(workflow, version, base_version, patch)) {
+                client?.sendClientMessage('state-ack', { function_name: data.function_name, version });
+              } else {
+                client?.sendClientMessage('state-resync', { function_name: data.function_name });
+              }
+            };
           
             try {
               switch (data.function_name) {
                 case 'update_checkin_form': {
                   console.log('🏨 Updating check-in form:', data.args);
-                  updateAI('checkin', data.args);
+                  applyUpdate('checkin');
                   result = { success: true, message: 'Check-in form updated' };
                   console.log('✅ Check-in form updated');
                   break;
@@ -48,7 +59,7 @@ export const usePipecatHotel = () => {
                 
                 case 'search_availability': {
                   console.log('🔍 Searching availability:', data.args);
-                  updateAI('availability', data.args);
+                  applyUpdate('availability');
                   result = { success: true, message: 'Availability search updated' };
                   console.log('✅ Availability search updated');
                   break;
@@ -56,7 +67,7 @@ export const usePipecatHotel = () => {
               
                 case 'modify_reservation': {
                   console.log('✏️ Modifying reservation:', data.args);
-                  updateAI('modification', data.args);
+                  applyUpdate('modification');
                   result = { success: true, message: 'Reservation modification updated' };
                   console.log('✅ Reservation modification updated');
                   break;
@@ -64,7 +75,7 @@ export const usePipecatHotel = () => {
               
                 case 'create_special_request': {
                   console.log('⭐ Creating special request:', data.args);
-                  updateAI('special_request', data.args);
+                  applyUpdate('special_request');
                   result = { success: true, message: 'Special request created' };
                   console.log('✅ Special request created');
                   break;
@@ -81,11 +92,43 @@ export const usePipecatHotel = () => {
             }
           }
         },
-        [updateAI]
+        [applyAIPatch, client]
       )
     );
   });
 
+  // Speculative form updates from interim transcripts
+  useRTVIClientEvent(
+    RTVIEvent.ServerMessage,
+    useCallback(
+      (data: any) => {
+        switch (data?.type) {
+          case 'speculative-update':
+            applyTentativeAI(data.speculation_id, data.workflow, data.args);
+            break;
+          case 'speculative-commit':
+            commitTentativeAI(data.speculation_id);
+            break;
+          case 'speculative-rollback':
+            rollbackTentativeAI(data.speculation_id);
+            break;
+        }
+      },
+      [applyTentativeAI, commitTentativeAI, rollbackTentativeAI]
+    )
+  );
+
+  // A submitted or cleared form ends the workflow; the server resets the
+  // conversation context and form state for the next one
+  const lastCompleted = useRef(completedWorkflows);
+  useEffect(() => {
+    if (completedWorkflows === lastCompleted.current) return;
+    lastCompleted.current = completedWorkflows;
+    if (connectionState.isConnected) {
+      client?.sendClientMessage('workflow-complete', {});
+    }
+  }, [completedWorkflows, connectionState.isConnected, client]);
+
   // Handle transcription updates
   useRTVIClientEvent(
     RTVIEvent.UserTranscript,
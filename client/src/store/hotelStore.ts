@@ -61,12 +61,26 @@ interface HotelStore {
   // AI update (from backend)
   updateAI: (workflow: string, data: any) => void;
 
+  // Versioned AI updates: patches against the last version acknowledged to the server
+  aiVersions: Record<string, number>;
+  applyAIPatch: (workflow: string, version: number, baseVersion: number, patch: any) => boolean;
+
+  // Speculative AI updates (from interim transcripts)
+  tentative: { id: string; snapshot: WorkflowWithUI } | null;
+  applyTentativeAI: (id: string, workflow: string, data: any) => void;
+  commitTentativeAI: (id: string) => void;
+  rollbackTentativeAI: (id: string) => void;
+
   // Pull from AI
   pullFromAI: () => void;
 
   // Reset
   resetStates: () => void;
 
+  // Workflow finished (form submitted or cleared); the server resets its context on each change
+  completedWorkflows: number;
+  completeWorkflow: () => void;
+
   // UI state
   isAIDataReady: boolean;
   setAIDataReady: (ready: boolean) => void;
@@ -137,11 +151,22 @@ const initialWorkflowState: WorkflowWithUI = {
   lastUpdated: '',
 };
 
+// Form data and UI state keys of each AI workflow, for snapshot updates
+const workflowStateKeys: Record<string, [keyof WorkflowWithUI, keyof WorkflowWithUI]> = {
+  checkin: ['checkinData', 'checkinUI'],
+  availability: ['availabilityData', 'availabilityUI'],
+  modification: ['modificationData', 'modificationUI'],
+  special_request: ['specialRequestData', 'specialRequestUI'],
+};
+
 export const useHotelStore = create<HotelStore>((set, get) => ({
   // Initial state
   manual: { ...initialWorkflowState },
   ai: { ...initialWorkflowState },
   isAIDataReady: false,
+  tentative: null,
+  aiVersions: {},
+  completedWorkflows: 0,
 
   // Set manual workflow
   setManualWorkflow: (workflow) => {
@@ -337,8 +362,9 @@ export const useHotelStore = create<HotelStore>((set, get) => ({
     }));
   },
 
-  // Update AI state (from backend)
-  updateAI: (workflow, data) => {
+  // Update AI state (from backend). The server sends only changed fields, so
+  // merge them into the form data first and derive the UI state from the result.
+  updateAI: (workflow, changes) => {
     set((state) => {
       const newState = { ...state.ai };
       newState.currentWorkflow = workflow as any;
@@ -346,34 +372,40 @@ export const useHotelStore = create<HotelStore>((set, get) => ({
 
       // Update data and populate UI state based on workflow
       if (workflow === 'checkin') {
-        newState.checkinData = { ...state.ai.checkinData, ...data };
+        const data: any = { ...state.ai.checkinData, ...changes };
+        newState.checkinData = data;
         // Auto-populate UI state for checkin
         if (data.guest_name) {
-          const { reservations } = get().manual; // Use manual's mock database access
-          const results = mockReservations.filter(r =>
+          // Prefer the ranked results from the server-side index, fall back to local mock data
+          const results: Reservation[] = data.filteredReservations ?? mockReservations.filter(r =>
             r.guest?.name.toLowerCase().includes(data.guest_name.toLowerCase())
           );
           newState.checkinUI = {
             searchQuery: data.guest_name,
             filteredReservations: results,
-            selectedReservation: results.find(r => r.id === data.reservation_number) || results[0] || null,
+            selectedReservation: data.selectedReservation
+              ?? results.find(r => r.id === data.reservation_number)
+              ?? results[0]
+              ?? null,
           };
         }
       } else if (workflow === 'availability') {
-        newState.availabilityData = { ...state.ai.availabilityData, ...data };
+        const data: any = { ...state.ai.availabilityData, ...changes };
+        newState.availabilityData = data;
         // Auto-populate UI state for availability
         newState.availabilityUI = {
           filters: {
             check_in_date: data.check_in_date || '',
             check_out_date: data.check_out_date || '',
             room_type: data.room_type || 'any',
-            min_price: '',
-            max_price: '',
+            min_price: String(data.min_price ?? ''),
+            max_price: String(data.max_price ?? ''),
           },
           filteredRooms: data.available_rooms || [],
         };
       } else if (workflow === 'modification') {
-        newState.modificationData = { ...state.ai.modificationData, ...data };
+        const data: any = { ...state.ai.modificationData, ...changes };
+        newState.modificationData = data;
         // Auto-populate UI state for modification
         if (data.reservation_id) {
           const reservation = mockReservations.find(r => r.id === data.reservation_id);
@@ -391,7 +423,8 @@ export const useHotelStore = create<HotelStore>((set, get) => ({
           };
         }
       } else if (workflow === 'special_request') {
-        newState.specialRequestData = { ...state.ai.specialRequestData, ...data };
+        const data: any = { ...state.ai.specialRequestData, ...changes };
+        newState.specialRequestData = data;
         // Auto-populate UI state for special request
         newState.specialRequestUI = {
           request_type: data.request_type || '',
@@ -407,6 +440,57 @@ export const useHotelStore = create<HotelStore>((set, get) => ({
     });
   },
 
+  // Apply a versioned patch; returns false when the client is behind the
+  // patch's base and must ask the server for a resync
+  applyAIPatch: (workflow, version, baseVersion, patch) => {
+    const { aiVersions, updateAI } = get();
+    const current = aiVersions[workflow] ?? 0;
+    if (baseVersion > current) {
+      return false;
+    }
+    if (version <= current && baseVersion !== 0) {
+      return true; // Already applied
+    }
+    if (baseVersion === 0) {
+      // Snapshot: replace the workflow's form and UI state
+      const [dataKey, uiKey] = workflowStateKeys[workflow];
+      set((state) => ({
+        ai: {
+          ...state.ai,
+          [dataKey]: initialWorkflowState[dataKey],
+          [uiKey]: initialWorkflowState[uiKey],
+        },
+      }));
+    }
+    updateAI(workflow, patch);
+    set((state) => ({ aiVersions: { ...state.aiVersions, [workflow]: version } }));
+    return true;
+  },
+
+  // Apply a tentative update, remembering the state to roll back to
+  applyTentativeAI: (id, workflow, data) => {
+    const { ai, tentative, updateAI } = get();
+    // A newer speculation replaces the previous one but keeps the original snapshot
+    const snapshot = tentative ? tentative.snapshot : ai;
+    updateAI(workflow, data);
+    set({ tentative: { id, snapshot } });
+  },
+
+  // Final transcript confirmed the tentative update
+  commitTentativeAI: (id) => {
+    if (get().tentative?.id === id) {
+      set({ tentative: null });
+    }
+  },
+
+  // Final transcript disagreed; restore the state from before the speculation
+  rollbackTentativeAI: (id) => {
+    const { tentative } = get();
+    if (tentative?.id === id) {
+      set({ ai: tentative.snapshot, tentative: null });
+    }
+  },
+
   // Pull from AI - ONE LINE!
   pullFromAI: () => {
     const { ai } = get();
@@ -418,11 +502,26 @@ export const useHotelStore = create<HotelStore>((set, get) => ({
 
   // Reset states
   resetStates: () => {
-    set({
+    set((state) => ({
       manual: { ...initialWorkflowState },
       ai: { ...initialWorkflowState },
       isAIDataReady: false,
-    });
+      tentative: null,
+      aiVersions: {},
+      completedWorkflows: state.completedWorkflows + 1,
+    }));
+  },
+
+  // Start the next guest's workflow from a clean AI screen; the server's form
+  // versions restart too, so the acknowledged versions are dropped
+  completeWorkflow: () => {
+    set((state) => ({
+      ai: { ...initialWorkflowState },
+      isAIDataReady: false,
+      tentative: null,
+      aiVersions: {},
+      completedWorkflows: state.completedWorkflows + 1,
+    }));
   },
 
   // Set AI data ready state
@@ -0,0 +1,100 @@
+"""
+Shared result cache for availability searches.
+
+During busy hours every desk asks for the same few stays ("tonight",
+"this weekend") over and over. AvailabilityCache answers repeated
+(check-in, check-out, room type, price range) searches from memory and is
+kept correct by the availability index itself: every booking that is added,
+moved or released reports the nights it touched, and only the cached
+searches overlapping those nights are dropped. Searches for other dates stay
+cached.
+
+The cache is process-wide (shared by all desk sessions) and bounded to
+AVAILABILITY_CACHE_SIZE entries, least recently used first out.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from availability_index import AvailabilityIndex
+
+
+# Distinct searches kept (0 disables the cache)
+AVAILABILITY_CACHE_SIZE = int(os.getenv("AVAILABILITY_CACHE_SIZE", "1024"))
+
+SearchKey = Tuple[str, str, str, Optional[float], Optional[float]]
+
+
+class AvailabilityCache:
+    """LRU cache in front of an AvailabilityIndex with booking-aware invalidation."""
+
+    def __init__(self, index: AvailabilityIndex, max_entries: int = AVAILABILITY_CACHE_SIZE):
+        self._index = index
+        self.max_entries = max_entries
+        # Key -> (check_in ordinal, check_out ordinal, rooms)
+        self._entries: "OrderedDict[SearchKey, Tuple[int, int, List[Dict[str, Any]]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self._hit_secs = 0.0
+        self._miss_secs = 0.0
+        index.add_listener(self.invalidate)
+
+    def available_rooms(
+        self,
+        check_in_date: str,
+        check_out_date: str,
+        room_type: str = "any",
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rooms free for the whole stay, from the cache when possible.
+
+        Same arguments and result as AvailabilityIndex.available_rooms; the
+        returned list is shared and must not be modified.
+        """
+        start = time.perf_counter()
+        key = (check_in_date, check_out_date, room_type or "any", min_price, max_price)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._hit_secs += time.perf_counter() - start
+            return entry[2]
+
+        rooms = self._index.available_rooms(check_in_date, check_out_date, room_type, min_price, max_price)
+        if self.max_entries > 0:
+            check_in = date.fromisoformat(check_in_date).toordinal()
+            check_out = max(date.fromisoformat(check_out_date).toordinal(), check_in + 1)
+            self._entries[key] = (check_in, check_out, rooms)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self.misses += 1
+        self._miss_secs += time.perf_counter() - start
+        return rooms
+
+    def invalidate(self, check_in: int, check_out: int) -> None:
+        """Drop cached searches whose stay overlaps the nights [check_in, check_out)."""
+        stale = [key for key, (key_in, key_out, _) in self._entries.items() if key_in < check_out and key_out > check_in]
+        for key in stale:
+            del self._entries[key]
+        self.invalidated += len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidated": self.invalidated,
+            "avg_hit_us": self._hit_secs / self.hits * 1e6 if self.hits else 0.0,
+            "avg_miss_us": self._miss_secs / self.misses * 1e6 if self.misses else 0.0,
+        }
@@ -0,0 +1,262 @@
+"""
+Date-interval availability index for the availability search workflow.
+
+Occupancy is stored as one bitmap per night over a rolling horizon (365 days
+by default), where bit ``i`` is set when room ``i`` is booked that night.
+Python integers are used as bitsets, so a date-range query is a handful of
+word-parallel ORs over the requested nights followed by a mask for the room
+type, instead of a scan over every room and reservation.
+
+Each room also keeps its bookings as a sorted interval list. Those are the
+source of truth used to roll the horizon forward at day change and to answer
+the rare query that falls outside the horizon.
+
+One index covers one property; multi-property deployments keep one index per
+property and can answer many searches at once with ``available_rooms_bulk``.
+"""
+
+import bisect
+from datetime import date, datetime
+from typing import Dict, Any, Callable, Optional, List, Tuple, Iterable
+
+
+DEFAULT_HORIZON_DAYS = 365
+
+# Called with the (check_in, check_out) ordinals of nights whose occupancy changed
+BookingListener = Callable[[int, int], None]
+
+# Reservation statuses that no longer hold a room (checked_out also frees it after an early departure)
+_RELEASED_STATUSES = {"cancelled", "checked_out"}
+
+
+def _to_ordinal(value: str) -> int:
+    return date.fromisoformat(value).toordinal()
+
+
+def _within_price(
+    rooms: List[Dict[str, Any]], min_price: Optional[float] = None, max_price: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    if min_price is None and max_price is None:
+        return rooms
+    return [
+        room for room in rooms
+        if (min_price is None or room["price_per_night"] >= min_price)
+        and (max_price is None or room["price_per_night"] <= max_price)
+    ]
+
+
+class AvailabilityIndex:
+    """Per-night occupancy bitmaps plus per-room booking intervals for one property."""
+
+    def __init__(
+        self,
+        rooms: List[Dict[str, Any]],
+        reservations: Optional[Iterable[Dict[str, Any]]] = None,
+        horizon_days: int = DEFAULT_HORIZON_DAYS,
+        start_date: Optional[date] = None,
+    ):
+        self._rooms: List[Dict[str, Any]] = list(rooms)
+        self._slot_by_room_id: Dict[str, int] = {room["id"]: slot for slot, room in enumerate(self._rooms)}
+        self._type_masks: Dict[str, int] = {}
+        for slot, room in enumerate(self._rooms):
+            self._type_masks[room["room_type"]] = self._type_masks.get(room["room_type"], 0) | (1 << slot)
+        self._all_mask = (1 << len(self._rooms)) - 1
+
+        self._horizon_days = horizon_days
+        self._start = (start_date or datetime.now().date()).toordinal()
+        self._nights: List[int] = [0] * horizon_days
+
+        # Per-room sorted (check_in, check_out, reservation_id) intervals
+        self._intervals: List[List[Tuple[int, int, str]]] = [[] for _ in self._rooms]
+        self._bookings: Dict[str, Tuple[int, int, int]] = {}
+        self._listeners: List[BookingListener] = []
+
+        for reservation in reservations or []:
+            self.add_booking(reservation)
+
+    @property
+    def rooms(self) -> List[Dict[str, Any]]:
+        return self._rooms
+
+    def add_listener(self, listener: BookingListener) -> None:
+        """Register a callback for occupancy changes (e.g. to invalidate cached searches)."""
+        self._listeners.append(listener)
+
+    def add_booking(self, reservation: Dict[str, Any]) -> None:
+        """Mark a reservation's room as occupied for its nights (replaces any previous version)."""
+        reservation_id = reservation["id"]
+        if reservation_id in self._bookings:
+            self.remove_booking(reservation_id)
+
+        slot = self._slot_by_room_id.get(reservation.get("room_id", ""))
+        if slot is None or reservation.get("status") in _RELEASED_STATUSES:
+            return
+
+        check_in = _to_ordinal(reservation["check_in_date"])
+        check_out = _to_ordinal(reservation["check_out_date"])
+        if check_out <= check_in:
+            return
+
+        bisect.insort(self._intervals[slot], (check_in, check_out, reservation_id))
+        self._bookings[reservation_id] = (slot, check_in, check_out)
+
+        bit = 1 << slot
+        for night in self._horizon_range(check_in, check_out):
+            self._nights[night] |= bit
+        self._notify(check_in, check_out)
+
+    def update_booking(self, reservation: Dict[str, Any]) -> None:
+        """Re-apply a reservation after its dates, room or status changed."""
+        self.add_booking(reservation)
+
+    def remove_booking(self, reservation_id: str) -> None:
+        """Release the nights held by a reservation."""
+        booking = self._bookings.pop(reservation_id, None)
+        if booking is None:
+            return
+
+        slot, check_in, check_out = booking
+        intervals = self._intervals[slot]
+        intervals.remove((check_in, check_out, reservation_id))
+
+        # Rebuild the affected nights for this room only; other bookings of the
+        # same room may still cover them
+        bit = 1 << slot
+        for night in self._horizon_range(check_in, check_out):
+            self._nights[night] &= ~bit
+        for other_in, other_out, _ in self._overlapping(slot, check_in, check_out):
+            for night in self._horizon_range(max(other_in, check_in), min(other_out, check_out)):
+                self._nights[night] |= bit
+        self._notify(check_in, check_out)
+
+    def room_free(self, room_id: str, check_in_date: str, check_out_date: str, ignore_reservation_id: str = "") -> bool:
+        """Whether a room has no booking, other than the ignored one, on any night of the stay."""
+        slot = self._slot_by_room_id.get(room_id)
+        if slot is None:
+            return False
+        overlapping = self._overlapping(slot, _to_ordinal(check_in_date), _to_ordinal(check_out_date))
+        return all(reservation_id == ignore_reservation_id for _, _, reservation_id in overlapping)
+
+    def available_rooms(
+        self,
+        check_in_date: str,
+        check_out_date: str,
+        room_type: str = "any",
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return rooms free for every night of [check_in_date, check_out_date).
+
+        Args:
+            check_in_date: Check-in date in YYYY-MM-DD format
+            check_out_date: Check-out date in YYYY-MM-DD format
+            room_type: standard/deluxe/suite, or "any"
+            min_price: Optional minimum nightly price
+            max_price: Optional maximum nightly price
+
+        Returns:
+            Room records, in inventory order
+        """
+        free_mask = self.free_mask(check_in_date, check_out_date, room_type)
+        return _within_price(self._rooms_from_mask(free_mask), min_price, max_price)
+
+    def available_rooms_bulk(self, queries: Iterable[Tuple[Any, ...]]) -> List[List[Dict[str, Any]]]:
+        """
+        Answer many searches at once.
+
+        Each query is (check_in_date, check_out_date, room_type), optionally
+        followed by min_price and max_price as in ``available_rooms``.
+        Occupancy for each distinct date range is computed once and shared by
+        every query over that range.
+        """
+        occupied_by_range: Dict[Tuple[str, str], int] = {}
+        results = []
+        for check_in_date, check_out_date, room_type, *prices in queries:
+            key = (check_in_date, check_out_date)
+            if key not in occupied_by_range:
+                occupied_by_range[key] = self.occupied_mask(check_in_date, check_out_date)
+            free_mask = ~occupied_by_range[key] & self._room_type_mask(room_type)
+            results.append(_within_price(self._rooms_from_mask(free_mask), *prices))
+        return results
+
+    def free_mask(self, check_in_date: str, check_out_date: str, room_type: str = "any") -> int:
+        """Bitmask of rooms of the given type free for the whole stay."""
+        return ~self.occupied_mask(check_in_date, check_out_date) & self._room_type_mask(room_type)
+
+    def occupied_mask(self, check_in_date: str, check_out_date: str) -> int:
+        """Bitmask of rooms booked on at least one night of [check_in_date, check_out_date)."""
+        check_in = _to_ordinal(check_in_date)
+        check_out = _to_ordinal(check_out_date)
+        if check_out <= check_in:
+            check_out = check_in + 1
+
+        self._roll_to(datetime.now().date().toordinal())
+
+        occupied = 0
+        for night in self._horizon_range(check_in, check_out):
+            occupied |= self._nights[night]
+
+        # Nights outside the horizon fall back to the interval lists
+        horizon_end = self._start + self._horizon_days
+        if check_in < self._start or check_out > horizon_end:
+            for slot in range(len(self._rooms)):
+                if occupied >> slot & 1:
+                    continue
+                for segment_in, segment_out in ((check_in, min(check_out, self._start)), (max(check_in, horizon_end), check_out)):
+                    if segment_in < segment_out and self._overlapping(slot, segment_in, segment_out):
+                        occupied |= 1 << slot
+                        break
+        return occupied
+
+    def _notify(self, check_in: int, check_out: int) -> None:
+        for listener in self._listeners:
+            listener(check_in, check_out)
+
+    def _room_type_mask(self, room_type: str) -> int:
+        if not room_type or room_type == "any":
+            return self._all_mask
+        return self._type_masks.get(room_type, 0)
+
+    def _rooms_from_mask(self, mask: int) -> List[Dict[str, Any]]:
+        rooms = []
+        while mask:
+            low_bit = mask & -mask
+            rooms.append(self._rooms[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return rooms
+
+    def _horizon_range(self, check_in: int, check_out: int) -> range:
+        """Bitmap positions of the nights in [check_in, check_out) that fall inside the horizon."""
+        first = max(check_in - self._start, 0)
+        last = min(check_out - self._start, self._horizon_days)
+        return range(first, max(first, last))
+
+    def _overlapping(self, slot: int, check_in: int, check_out: int) -> List[Tuple[int, int, str]]:
+        """Bookings of a room overlapping [check_in, check_out)."""
+        intervals = self._intervals[slot]
+        # Intervals are sorted by check-in; those starting at or after check_out cannot overlap
+        end = bisect.bisect_left(intervals, (check_out,))
+        return [interval for interval in intervals[:end] if interval[1] > check_in]
+
+    def _roll_to(self, today: int) -> None:
+        """Advance the horizon so it starts at today, filling the new nights from the intervals."""
+        shift = today - self._start
+        if shift <= 0:
+            return
+
+        if shift >= self._horizon_days:
+            self._nights = [0] * self._horizon_days
+            fill_from = 0
+        else:
+            self._nights = self._nights[shift:] + [0] * shift
+            fill_from = self._horizon_days - shift
+        self._start = today
+
+        fill_start = self._start + fill_from
+        fill_end = self._start + self._horizon_days
+        for slot in range(len(self._rooms)):
+            bit = 1 << slot
+            for check_in, check_out, _ in self._overlapping(slot, fill_start, fill_end):
+                for night in self._horizon_range(max(check_in, fill_start), check_out):
+                    self._nights[night] |= bit
@@ -0,0 +1,65 @@
+"""
+Compare batch date resolution (date_batch) against the per-call date_utils path.
+
+Builds a synthetic replay corpus of (check_in, check_out) expressions, checks
+that both paths agree, and reports rows per second for each.
+
+Usage:
+    python benchmarks/bench_date_batch.py [--rows 200000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+from loguru import logger
+
+from date_batch import resolve_date_pairs
+from date_utils import _resolve_date_pair
+
+
+EXPRESSIONS = [
+    "", "tomorrow", "+2", "today", "next Friday", "this sunday", "saturday",
+    "in 3 days", "in two weeks", "a week from Friday", "two nights", "next week",
+    "March 3rd", "the 15th", "2024-03-15", "not a date",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="Number of (check_in, check_out) pairs")
+    parser.add_argument("--scalar-rows", type=int, default=20000, help="Rows timed on the per-call path")
+    args = parser.parse_args()
+
+    logger.remove()
+    rng = random.Random(0)
+    reference = date.today()
+    pairs = [(rng.choice(EXPRESSIONS), rng.choice(EXPRESSIONS)) for _ in range(args.rows)]
+
+    start = time.perf_counter()
+    check_in, check_out = resolve_date_pairs(pairs, reference)
+    batch_secs = time.perf_counter() - start
+
+    scalar_rows = pairs[:args.scalar_rows]
+    start = time.perf_counter()
+    expected = [_resolve_date_pair(ci, co, reference) for ci, co in scalar_rows]
+    scalar_secs = time.perf_counter() - start
+
+    got = zip(np.datetime_as_string(check_in[:len(scalar_rows)]), np.datetime_as_string(check_out[:len(scalar_rows)]))
+    mismatches = sum(1 for e, g in zip(expected, got) if e != g)
+
+    batch_rate = args.rows / batch_secs
+    scalar_rate = len(scalar_rows) / scalar_secs
+    print(f"per-call: {scalar_rate:>12,.0f} pairs/sec")
+    print(f"batch:    {batch_rate:>12,.0f} pairs/sec ({batch_rate / scalar_rate:.1f}x)")
+    print(f"mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
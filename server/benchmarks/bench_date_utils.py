@@ -0,0 +1,69 @@
+"""
+Throughput benchmark for date_utils.parse_relative_date.
+
+Times every grammar branch of the parser and reports the cost per call.
+parse_relative_date memoizes its results, so repeated calls with one input
+would only time a cache hit. The parser itself (``_parse`` on the normalized
+text) is timed instead, and the memoized call is shown next to it.
+
+Usage:
+    python benchmarks/bench_date_utils.py [--number 20000]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from loguru import logger
+
+from date_utils import _normalize, _parse, parse_relative_date
+
+
+SAMPLE_INPUTS = [
+    "2024-03-15",
+    "+2",
+    "tomorrow",
+    "in 3 days",
+    "in two weeks",
+    "a week from Friday",
+    "two nights",
+    "next Friday",
+    "this sun",
+    "saturday",
+    "next week",
+    "March 3rd",
+    "3rd of March",
+    "the 15th",
+    "not a date",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="Calls per input")
+    args = parser.parse_args()
+
+    # Unparseable inputs log a warning; keep the output readable
+    logger.remove()
+
+    today = date.today()
+    print(f"{'input':<22} {'us/call':>10} {'calls/sec':>12} {'memoized us':>12}")
+    total = cached_total = 0.0
+    for text in SAMPLE_INPUTS:
+        elapsed = timeit.timeit(lambda: _parse(_normalize(text), today), number=args.number)
+        cached = timeit.timeit(lambda: parse_relative_date(text, today), number=args.number)
+        per_call, cached_per_call = elapsed / args.number, cached / args.number
+        total += per_call
+        cached_total += cached_per_call
+        print(f"{text!r:<22} {per_call * 1e6:>10.2f} {1 / per_call:>12,.0f} {cached_per_call * 1e6:>12.2f}")
+
+    mean, cached_mean = total / len(SAMPLE_INPUTS), cached_total / len(SAMPLE_INPUTS)
+    print(f"{'mean':<22} {mean * 1e6:>10.2f} {1 / mean:>12,.0f} {cached_mean * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Regression microbenchmarks for the per-tool-call hot paths.
+
+Times the date parser (every grammar branch, uncached and memoized),
+resolve_date_pair's defaulting paths, execute_function_call dispatch and
+each workflow handler that builds an enriched result. Every case runs
+--rounds rounds, each sized to take about --round-ms, and reports the
+median and best time per call. The handlers' writes go to a no-op queue,
+so only the work done before a handler returns is timed.
+
+--save stores the medians as the baseline for --machine; --compare checks a
+run against it and exits with status 1 when any case got slower by more
+than --threshold. Timings from different machines are not comparable, so
+the baseline file keeps one entry per machine. --machine defaults to the
+host name and Python version; pass a fixed name where host names change
+between runs (e.g. CI runners). The committed baseline
+(data/hot_paths_baseline.json) holds a "reference" entry recorded on a
+Linux x86-64 host with CPython 3.11, for a rough comparison on other machines.
+
+Usage:
+    python benchmarks/bench_hot_paths.py --save
+    python benchmarks/bench_hot_paths.py --compare --threshold 0.25
+    python benchmarks/bench_hot_paths.py --compare --machine reference --threshold 1.0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Union
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Keep anything the cases touch out of the real database
+os.environ.setdefault("STORAGE_PATH", ":memory:")
+
+from loguru import logger
+
+import functions
+from date_utils import _normalize, _parse, _resolve_date_pair, parse_relative_date, resolve_date_pair
+from functions import (
+    execute_function_call,
+    handle_availability_search,
+    handle_checkin_form,
+    handle_reservation_modification,
+    handle_special_request,
+)
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "hot_paths_baseline.json")
+
+# One input per parser grammar branch
+DATE_BRANCHES = {
+    "iso": "2024-03-15",
+    "offset": "+2",
+    "keyword": "tomorrow",
+    "in_span": "in 3 days",
+    "weeks_from": "two weeks from Friday",
+    "span": "two nights",
+    "ref_weekday": "next Friday",
+    "weekday": "saturday",
+    "week_ref": "next week",
+    "month_first": "March 3rd",
+    "day_first": "the 15th of March",
+    "no_match": "not a date",
+}
+
+# resolve_date_pair defaulting paths: (check_in, check_out)
+DATE_PAIRS = {
+    "both": ("tomorrow", "next Sunday"),
+    "check_in_only": ("next Friday", ""),
+    "check_out_only": ("", "Saturday"),
+    "stay_length": ("tomorrow", "two nights"),
+    "neither": ("", ""),
+}
+
+HANDLER_ARGS = {
+    "checkin_by_name": (handle_checkin_form, {"guest_name": "John Smith"}),
+    "checkin_misheard": (handle_checkin_form, {"guest_name": "Jon Smyth"}),
+    "checkin_complete": (handle_checkin_form, {"reservation_number": "res-3", "id_type": "passport"}),
+    "availability": (handle_availability_search, {"check_in_date": "tomorrow", "room_type": "suite"}),
+    "availability_price": (
+        handle_availability_search,
+        {"check_in_date": "next Friday", "check_out_date": "next Sunday", "max_price": "$250"},
+    ),
+    "modification": (handle_reservation_modification, {"reservation_id": "res-3", "new_room_type": "deluxe"}),
+    "modification_unknown": (
+        handle_reservation_modification,
+        {"reservation_id": "res-999", "new_check_out_date": "+2"},
+    ),
+    "special_request": (
+        handle_special_request,
+        {"request_type": "late_checkout", "details": "2 PM checkout requested", "room_number": "102"},
+    ),
+}
+
+Case = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+class NullWriteQueue:
+    """Stands in for WRITE_BEHIND so the handler cases neither journal nor commit."""
+
+    def __init__(self):
+        self.enqueued = 0
+
+    def enqueue(self, what: str, writes: Any) -> str:
+        self.enqueued += 1
+        return f"wb_null_{self.enqueued}"
+
+    async def drain(self) -> None:
+        pass
+
+
+def build_cases() -> List[Tuple[str, Case, bool]]:
+    """(name, callable, is_async) for every benchmark case."""
+    today = date.today()
+    cases: List[Tuple[str, Case, bool]] = []
+    for branch, text in DATE_BRANCHES.items():
+        normalized = _normalize(text)
+        cases.append((f"date.parse.{branch}", lambda n=normalized: _parse(n, today), False))
+    cases.append(("date.parse_relative_date.memoized", lambda: parse_relative_date("next Friday", today), False))
+
+    for path, (check_in, check_out) in DATE_PAIRS.items():
+        cases.append((f"date.pair.{path}", lambda ci=check_in, co=check_out: _resolve_date_pair(ci, co, today), False))
+    cases.append(("date.resolve_date_pair.memoized", lambda: resolve_date_pair("tomorrow", "next Sunday"), False))
+
+    cases.append((
+        "dispatch.execute_function_call",
+        lambda: execute_function_call("update_checkin_form", {"guest_name": "John Smith"}),
+        True,
+    ))
+    cases.append(("dispatch.unknown_function", lambda: execute_function_call("no_such_function", {}), True))
+
+    for name, (handler, args) in HANDLER_ARGS.items():
+        cases.append((f"handler.{name}", lambda h=handler, a=args: h(dict(a)), True))
+    return cases
+
+
+async def _time_calls(case: Case, is_async: bool, number: int) -> float:
+    start = time.perf_counter()
+    if is_async:
+        for _ in range(number):
+            await case()
+    else:
+        for _ in range(number):
+            case()
+    return time.perf_counter() - start
+
+
+async def measure(case: Case, is_async: bool, rounds: int, round_secs: float) -> Dict[str, float]:
+    """Median and best seconds per call over several calibrated rounds."""
+    number = 1
+    while True:
+        elapsed = await _time_calls(case, is_async, number)
+        if elapsed >= round_secs / 10 or number >= 1_000_000:
+            break
+        number *= 10
+    number = max(1, int(number * round_secs / max(elapsed, 1e-9)))
+
+    per_call = [await _time_calls(case, is_async, number) / number for _ in range(rounds)]
+    return {"median_us": statistics.median(per_call) * 1e6, "min_us": min(per_call) * 1e6, "calls": number}
+
+
+def machine_key() -> str:
+    return f"{platform.node()}/{platform.python_implementation()}-{platform.python_version()}"
+
+
+def load_baselines(path: str) -> Dict[str, Dict[str, Dict[str, float]]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+async def run(args) -> int:
+    functions.WRITE_BEHIND = NullWriteQueue()
+
+    cases = [case for case in build_cases() if args.filter in case[0]]
+    baseline = load_baselines(args.baseline).get(args.machine, {}) if args.compare else {}
+    if args.compare and not baseline:
+        print(f"No baseline for {args.machine} in {args.baseline}; run with --save first")
+        return 1
+
+    results: Dict[str, Dict[str, float]] = {}
+    regressions = []
+    print(f"{'case':<40} {'median us':>10} {'best us':>10} {'baseline':>10} {'change':>8}")
+    for name, case, is_async in cases:
+        result = await measure(case, is_async, args.rounds, args.round_ms / 1000)
+        results[name] = result
+        line = f"{name:<40} {result['median_us']:>10.2f} {result['min_us']:>10.2f}"
+        if name in baseline:
+            change = result["median_us"] / baseline[name]["median_us"] - 1
+            flag = "  SLOWER" if change > args.threshold else ""
+            line += f" {baseline[name]['median_us']:>10.2f} {change:>+8.1%}{flag}"
+            if flag:
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        baselines = load_baselines(args.baseline)
+        baselines[args.machine] = {name: {"median_us": round(r["median_us"], 3)} for name, r in results.items()}
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Saved baseline for {args.machine} to {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=7, help="Timed rounds per case")
+    parser.add_argument("--round-ms", type=float, default=50.0, help="Target duration of one round")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--machine", default=machine_key(), help="Baseline entry to save or compare against")
+    parser.add_argument("--save", action="store_true", help="Store this run as the machine's baseline")
+    parser.add_argument("--compare", action="store_true", help="Fail on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    # Handlers and the date parser log at INFO; keep the output readable
+    logger.remove()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Load generator simulating many concurrent desk sessions.
+
+Opens --desks simulated RTVI clients against the bot's websocket entry point
+(websocket_server.py), each of which sends client-ready, waits for
+bot-ready and then sends custom-message text turns at --rate turns per
+second, like the client's text input. A turn's latency is the time from
+sending it to receiving its first llm-function-call message, i.e. the form
+update the receptionist would see. Clients acknowledge every state patch
+(state-ack) like the desk client, so sessions keep their context and form
+state across turns and updates go out as patches. A desk never has more
+than one turn in flight: when a turn takes longer than 1 / --rate the next
+one is sent as soon as it finishes.
+
+A turn that changes nothing the desk has not already received produces no
+update; the server answers it with a state-unchanged server message, which
+is counted under "no update" and left out of the latency figures and the
+timeouts. Each desk cycles through the corpus, so this only happens when the
+corpus is shorter than a stage. --reset-every N sends workflow-complete after
+every N turns, as the client does when a form is submitted or cleared.
+
+--desks takes a comma-separated list of stages (e.g. 1,5,10,20), each run
+for --duration seconds, to find the number of desks at which latency
+degrades. Turns come from the replay corpus (the turns with expected calls);
+a turn the LLM backend makes no call for (the stub cannot resolve "extend my
+stay" without a reservation number) counts as a timeout after
+--turn-timeout.
+
+--spawn starts websocket_server.py with the stub LLM, no STT and no turn
+analyzer, so the whole test runs offline; without it, point --url at a
+running server.
+
+Usage:
+    python benchmarks/bench_load.py --spawn --desks 1,5,10,20 --rate 0.5 --duration 20
+    python benchmarks/bench_load.py --url ws://localhost:7861/ws --desks 10
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import websockets
+from loguru import logger
+
+from pipecat.frames.protobufs import frames_pb2
+
+from benchmarks.bench_replay import DEFAULT_CORPUS, load_corpus
+from latency import percentile
+
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "websocket_server.py")
+
+
+def rtvi_message(message_type: str, data: Optional[Dict[str, Any]] = None) -> bytes:
+    """An RTVI message wrapped in the protobuf frame the websocket serializer expects."""
+    message = {"label": "rtvi-ai", "type": message_type, "id": uuid.uuid4().hex[:8], "data": data or {}}
+    frame = frames_pb2.Frame()
+    frame.message.data = json.dumps(message)
+    return frame.SerializeToString()
+
+
+def client_message(message_type: str, data: Dict[str, Any]) -> bytes:
+    """A client-message carrying one of the bot's custom message types."""
+    return rtvi_message("client-message", {"t": message_type, "d": data})
+
+
+def parse_message(payload: Any) -> Optional[Dict[str, Any]]:
+    """The RTVI message in a server frame, or None for other frames (e.g. audio)."""
+    if not isinstance(payload, bytes):
+        return None
+    frame = frames_pb2.Frame.FromString(payload)
+    if frame.WhichOneof("frame") != "message":
+        return None
+    return json.loads(frame.message.data)
+
+
+def load_turns(path: str) -> List[str]:
+    """Corpus turns that should produce a function call."""
+    return [
+        turn["text"]
+        for turns in load_corpus(path).values()
+        for turn in turns
+        if turn.get("expected")
+    ]
+
+
+class StageResults:
+    def __init__(self, desks: int):
+        self.desks = desks
+        self.turn_ms: List[float] = []
+        self.timeouts = 0
+        self.no_update = 0
+        self.connected = 0
+        self.failed = 0
+        self.ready_ms: List[float] = []
+
+
+class SimulatedDesk:
+    """One RTVI client sending text turns and timing the form updates."""
+
+    def __init__(
+        self, url: str, turns: List[str], rate: float, turn_timeout: float, reset_every: int, results: StageResults
+    ):
+        self.url = url
+        self.turns = turns
+        self.interval = 1 / rate
+        self.turn_timeout = turn_timeout
+        self.reset_every = reset_every
+        self.results = results
+        self._ready = asyncio.Event()
+        self._updates: asyncio.Queue = asyncio.Queue()
+        self._websocket = None
+
+    async def run(self, deadline: float) -> None:
+        start = time.perf_counter()
+        try:
+            async with websockets.connect(self.url, max_size=None) as websocket:
+                self._websocket = websocket
+                reader = asyncio.create_task(self._read())
+                try:
+                    await websocket.send(rtvi_message("client-ready", {"version": "1.0.0", "about": {"library": "bench_load"}}))
+                    await asyncio.wait_for(self._ready.wait(), timeout=max(deadline - time.perf_counter(), 0.1))
+                    self.results.connected += 1
+                    self.results.ready_ms.append((time.perf_counter() - start) * 1000)
+                    await self._send_turns(deadline)
+                finally:
+                    reader.cancel()
+        except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+            self.results.failed += 1
+            logger.warning(f"Desk failed: {e!r}")
+
+    async def _send_turns(self, deadline: float) -> None:
+        # Stagger the desks so their turns do not all arrive at once
+        next_send = time.perf_counter() + random.uniform(0, self.interval)
+        for number, text in enumerate(self.turns, 1):
+            await asyncio.sleep(max(next_send - time.perf_counter(), 0))
+            sent = time.perf_counter()
+            if sent >= deadline:
+                return
+
+            # Updates that trailed the previous turn do not belong to this one
+            while not self._updates.empty():
+                self._updates.get_nowait()
+            await self._websocket.send(client_message("custom-message", {"text": text}))
+            try:
+                changed, received = await asyncio.wait_for(self._updates.get(), timeout=self.turn_timeout)
+                if changed:
+                    self.results.turn_ms.append((received - sent) * 1000)
+                else:
+                    self.results.no_update += 1
+            except asyncio.TimeoutError:
+                self.results.timeouts += 1
+                logger.debug(f"No function call for: {text}")
+
+            if self.reset_every and number % self.reset_every == 0:
+                await self._websocket.send(client_message("workflow-complete", {}))
+            next_send = max(sent + self.interval, time.perf_counter())
+
+    async def _read(self) -> None:
+        async for payload in self._websocket:
+            received = time.perf_counter()
+            message = parse_message(payload)
+            if not message:
+                continue
+            if message.get("type") == "bot-ready":
+                self._ready.set()
+            elif message.get("type") == "server-message":
+                if (message.get("data") or {}).get("type") == "state-unchanged":
+                    self._updates.put_nowait((False, received))
+            elif message.get("type") == "llm-function-call":
+                data = message.get("data") or {}
+                self._updates.put_nowait((True, received))
+                state = data.get("args") or {}
+                if "version" in state:
+                    await self._websocket.send(client_message(
+                        "state-ack", {"function_name": data.get("function_name"), "version": state["version"]}
+                    ))
+
+
+async def run_stage(args, desks: int, turns: List[str]) -> StageResults:
+    results = StageResults(desks)
+    deadline = time.perf_counter() + args.duration
+    clients = []
+    for index in range(desks):
+        # Each desk cycles through the corpus from its own starting point
+        offset = index * 7 % len(turns)
+        desk_turns = list(itertools.islice(itertools.cycle(turns[offset:] + turns[:offset]), 100_000))
+        clients.append(SimulatedDesk(args.url, desk_turns, args.rate, args.turn_timeout, args.reset_every, results))
+    await asyncio.gather(*(client.run(deadline) for client in clients))
+    return results
+
+
+def print_stage(results: StageResults, duration: float) -> None:
+    ordered = sorted(results.turn_ms)
+    line = (
+        f"{results.desks:>5} {results.connected:>9} {results.failed:>6} {len(ordered):>6} {results.no_update:>9} "
+        f"{results.timeouts:>8} {len(ordered) / duration:>7.2f}"
+    )
+    if ordered:
+        line += (
+            f" {percentile(ordered, 50):>8.1f} {percentile(ordered, 95):>8.1f} "
+            f"{percentile(ordered, 99):>8.1f} {ordered[-1]:>8.1f}"
+        )
+    print(line, flush=True)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(args, max_desks: int) -> subprocess.Popen:
+    """Start websocket_server.py with the offline backends."""
+    port = free_port()
+    args.url = f"ws://localhost:{port}/ws"
+    env = {
+        **os.environ,
+        "LLM_BACKEND": "stub",
+        "STT_BACKEND": "none",
+        "TURN_ANALYZER": "none",
+        "WARMUP_ENABLED": "false",
+        "STUB_LLM_LATENCY_MS": str(args.stub_latency_ms),
+        "MAX_DESK_SESSIONS": str(max_desks),
+        # Keep the workflow handlers' writes out of the real database and journal
+        "STORAGE_PATH": ":memory:",
+        "WRITE_BEHIND_JOURNAL": os.path.join(tempfile.mkdtemp(prefix="load-"), "load.journal"),
+    }
+    log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT, "--port", str(port)], env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+
+async def wait_for_server(url: str, server: Optional[subprocess.Popen], timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            async with websockets.connect(url):
+                return
+        except (OSError, websockets.WebSocketException):
+            if server is not None and server.poll() is not None:
+                raise SystemExit(f"websocket_server.py exited with status {server.returncode}")
+            if time.perf_counter() > deadline:
+                raise SystemExit(f"No server at {url} after {timeout:.0f}s")
+            await asyncio.sleep(0.25)
+
+
+async def run(args) -> None:
+    stages = [int(desks) for desks in args.desks.split(",")]
+    turns = load_turns(args.corpus)
+    server = spawn_server(args, max(stages)) if args.spawn else None
+    try:
+        await wait_for_server(args.url, server, args.startup_timeout)
+        print(f"{args.url}: {args.rate} turns/s per desk, {args.duration:.0f}s per stage")
+        print(
+            f"{'desks':>5} {'connected':>9} {'failed':>6} {'turns':>6} {'no update':>9} {'timeouts':>8} {'turns/s':>7} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        )
+        for desks in stages:
+            results = await run_stage(args, desks, turns)
+            print_stage(results, args.duration)
+            # Let the server tear the sessions down before the next stage connects
+            await asyncio.sleep(1.0)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="ws://localhost:7861/ws", help="websocket_server.py endpoint")
+    parser.add_argument("--spawn", action="store_true", help="Start an offline server (stub LLM, no STT)")
+    parser.add_argument("--desks", default="1,5,10", help="Comma-separated concurrent desks per stage")
+    parser.add_argument("--rate", type=float, default=0.5, help="Turns per second sent by each desk")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per stage")
+    parser.add_argument("--reset-every", type=int, default=0, help="Send workflow-complete every N turns (0 = never)")
+    parser.add_argument("--turn-timeout", type=float, default=5.0, help="Seconds to wait for a function call")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL transcript corpus")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="Simulated stub inference time (--spawn)")
+    parser.add_argument("--startup-timeout", type=float, default=60.0, help="Seconds to wait for the server")
+    parser.add_argument("--server-log", default="", help="Write the spawned server's log to this file")
+    parser.add_argument("--verbose", action="store_true", help="Log failed desks and unanswered turns")
+    args = parser.parse_args()
+
+    logger.remove()
+    if args.verbose:
+        logger.add(sys.stderr, level="DEBUG")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Offline replay benchmark for the full extraction pipeline.
+
+Feeds recorded transcripts through the same processors as a live desk
+session (bot.DeskPipeline: vocabulary correction, fast path, context
+aggregator, context window, LLM and the function handlers), without a
+transport or STT, and reports throughput, per-function latency and
+extraction accuracy against the expected calls.
+
+The corpus is JSONL, one turn per line, grouped into desk sessions:
+
+    {"session": "walk-in-1", "text": "Do you have a suite available tomorrow?",
+     "expected": [{"function": "search_availability",
+                   "arguments": {"check_in_date": "tomorrow", "room_type": "suite"}}]}
+    {"session": "walk-in-1", "reset": true}
+
+"reset" is the client's workflow-complete message. Turns of one session run
+in order, --concurrency sessions at a time. Expected arguments are compared
+with the arguments the function was called with: case-insensitively, with
+date expressions that resolve to the same day counted as equal ("for
+tomorrow night" vs "tomorrow"); arguments not listed are not checked.
+
+Turns that reach the LLM include the user aggregator's aggregation timeout
+(0.5 s), as in a live session where the transcription arrives after the end
+of speech. The stub LLM (stub_llm.py) needs no model server; --llm ollama
+replays against the configured Ollama model instead.
+
+The stub extracts calls with the fast-path rules (fast_path.match_rules), so
+with --llm stub the accuracy figures measure how much of the corpus the
+rules cover, not LLM extraction accuracy; the report header says so.
+
+Usage:
+    python benchmarks/bench_replay.py --corpus benchmarks/data/replay_corpus.jsonl --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Keep the workflow handlers' writes out of the real database and journal
+os.environ.setdefault("STORAGE_PATH", ":memory:")
+os.environ.setdefault("WRITE_BEHIND_JOURNAL", os.path.join(tempfile.mkdtemp(prefix="replay-"), "replay.journal"))
+
+from loguru import logger
+
+from pipecat.frames.frames import (
+    EndFrame,
+    Frame,
+    FunctionCallsStartedFrame,
+    LLMFullResponseEndFrame,
+    LLMFullResponseStartFrame,
+    TranscriptionFrame,
+    UserStartedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+)
+from pipecat.pipeline.runner import PipelineRunner
+from pipecat.pipeline.task import PipelineParams, PipelineTask
+from pipecat.processors.filters.identity_filter import IdentityFilter
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.utils.time import time_now_iso8601
+
+from date_utils import parse_relative_date
+from latency import percentile
+
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "replay_corpus.jsonl")
+
+# (function_name, arguments, ms since the turn started)
+Call = Tuple[str, Dict[str, Any], float]
+
+
+def load_corpus(path: str) -> "OrderedDict[str, List[Dict[str, Any]]]":
+    """Corpus lines grouped by session, in file order."""
+    sessions: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "text" not in record and not record.get("reset"):
+                raise SystemExit(f"{path}:{line_number}: a turn needs \"text\" (or \"reset\": true)")
+            sessions.setdefault(record.get("session", "default"), []).append(record)
+    return sessions
+
+
+def values_match(expected: Any, actual: Any) -> bool:
+    expected_text = " ".join(str(expected).lower().split())
+    actual_text = " ".join(str(actual).lower().split())
+    if expected_text == actual_text:
+        return True
+    expected_date = parse_relative_date(expected_text)
+    return bool(expected_date) and expected_date == parse_relative_date(actual_text)
+
+
+def score_turn(expected: List[Dict[str, Any]], calls: List[Call]) -> Dict[str, int]:
+    """Match expected calls to actual ones (same function, best argument overlap)."""
+    remaining = list(calls)
+    matched_args = total_args = missing = 0
+    correct = True
+    for want in expected:
+        arguments = want.get("arguments", {})
+        total_args += len(arguments)
+        candidates = [call for call in remaining if call[0] == want["function"]]
+        if not candidates:
+            missing += 1
+            correct = False
+            continue
+
+        def overlap(call: Call) -> int:
+            return sum(key in call[1] and values_match(value, call[1][key]) for key, value in arguments.items())
+
+        best = max(candidates, key=overlap)
+        remaining.remove(best)
+        matched = overlap(best)
+        matched_args += matched
+        correct = correct and matched == len(arguments)
+
+    return {
+        "correct": int(correct and not remaining),
+        "matched_args": matched_args,
+        "total_args": total_args,
+        "missing_calls": missing,
+        "extra_calls": len(remaining),
+    }
+
+
+class TurnTracker(FrameProcessor):
+    """
+    Sits in the transport output slot and detects when a replayed turn is done.
+
+    A fast-path turn is done once its call is dispatched. An LLM turn is done
+    at the end of the first response that makes no further function calls
+    (for a turn with calls, the response that follows their results).
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls: List[Call] = []
+        self.fast_path = False
+        self._done = asyncio.Event()
+        self._start = 0.0
+        self._response_calls = 0
+
+    def begin(self) -> None:
+        self.calls = []
+        self.fast_path = False
+        self._done.clear()
+        self._start = time.perf_counter()
+        self._response_calls = 0
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def on_dispatch(self, function_name: str, tool_call_id: str, arguments: Dict[str, Any], result: Dict[str, Any]):
+        self.calls.append((function_name, dict(arguments), self.elapsed_ms()))
+        if tool_call_id.startswith("fast-"):
+            self.fast_path = True
+            self._done.set()
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, LLMFullResponseStartFrame):
+            self._response_calls = 0
+        elif isinstance(frame, FunctionCallsStartedFrame) and direction == FrameDirection.DOWNSTREAM:
+            self._response_calls += len(frame.function_calls)
+        elif isinstance(frame, LLMFullResponseEndFrame) and not self._response_calls:
+            self._done.set()
+
+        await self.push_frame(frame, direction)
+
+
+class ReplayResults:
+    def __init__(self):
+        self.turn_ms: List[float] = []
+        self.function_ms: Dict[str, List[float]] = {}
+        self.fast_path_turns = 0
+        self.timeouts = 0
+        self.scores: Dict[str, int] = {}
+        self.mismatches: List[str] = []
+
+    def record(self, turn: Dict[str, Any], calls: List[Call], elapsed_ms: float, fast_path: bool) -> None:
+        self.turn_ms.append(elapsed_ms)
+        self.fast_path_turns += fast_path
+        for function_name, _, call_ms in calls:
+            self.function_ms.setdefault(function_name, []).append(call_ms)
+        score = score_turn(turn.get("expected", []), calls)
+        for key, value in score.items():
+            self.scores[key] = self.scores.get(key, 0) + value
+        if not score["correct"]:
+            actual = [{"function": name, "arguments": arguments} for name, arguments, _ in calls]
+            self.mismatches.append(f"  \"{turn['text']}\"\n    expected {turn.get('expected', [])}\n    got      {actual}")
+
+
+async def replay_session(name: str, turns: List[Dict[str, Any]], create_desk, results: ReplayResults, turn_timeout: float):
+    tracker = TurnTracker()
+    desk = create_desk(tracker.on_dispatch)
+    task = PipelineTask(
+        desk.pipeline(IdentityFilter(), tracker),
+        params=PipelineParams(allow_interruptions=True, enable_metrics=True),
+    )
+    runner = asyncio.create_task(PipelineRunner(handle_sigint=False).run(task))
+
+    for turn in turns:
+        if turn.get("reset"):
+            desk.reset()
+            continue
+
+        tracker.begin()
+        # The order a live turn arrives in, minus the audio
+        await task.queue_frames([
+            UserStartedSpeakingFrame(),
+            TranscriptionFrame(text=turn["text"], user_id=name, timestamp=time_now_iso8601()),
+            UserStoppedSpeakingFrame(),
+        ])
+        if not await tracker.wait(turn_timeout):
+            results.timeouts += 1
+            logger.warning(f"{name}: turn timed out: {turn['text']}")
+        results.record(turn, tracker.calls, tracker.elapsed_ms(), tracker.fast_path)
+
+    await task.queue_frame(EndFrame())
+    await runner
+
+
+def print_report(results: ReplayResults, elapsed: float, verbose: bool) -> None:
+    from functions import function_call_stats
+
+    turns = len(results.turn_ms)
+    ordered = sorted(results.turn_ms)
+    print(
+        f"{turns} turns in {elapsed:.2f}s: {turns / elapsed:.1f} turns/s  "
+        f"(fast path {results.fast_path_turns}, LLM {turns - results.fast_path_turns}, timeouts {results.timeouts})"
+    )
+    print(f"turn latency          p50 {percentile(ordered, 50):8.1f} ms  p95 {percentile(ordered, 95):8.1f} ms")
+
+    # Turn start to dispatch, and the handler's own share of it
+    handler_stats = function_call_stats()
+    for function_name, samples in sorted(results.function_ms.items()):
+        samples.sort()
+        print(
+            f"  {function_name:<22} n={len(samples):<4} p50 {percentile(samples, 50):8.1f} ms  "
+            f"p95 {percentile(samples, 95):8.1f} ms  handler avg {handler_stats[function_name]['avg_ms']:.2f} ms"
+        )
+
+    scores = results.scores
+    print(
+        f"accuracy              turns {scores.get('correct', 0)}/{turns} ({scores.get('correct', 0) / max(turns, 1):.1%})  "
+        f"arguments {scores.get('matched_args', 0)}/{scores.get('total_args', 0)} "
+        f"({scores.get('matched_args', 0) / max(scores.get('total_args', 0), 1):.1%})  "
+        f"missing calls {scores.get('missing_calls', 0)}  extra calls {scores.get('extra_calls', 0)}"
+    )
+    if verbose and results.mismatches:
+        print("mismatches:")
+        print("\n".join(results.mismatches))
+
+
+async def run(args) -> None:
+    from bot import DeskPipeline
+    from write_behind import WRITE_BEHIND
+
+    # bot.py installs its own DEBUG handler on import
+    logger.remove()
+
+    if args.llm == "stub":
+        from stub_llm import StubLLMService
+
+        def create_llm():
+            return StubLLMService(latency_secs=args.stub_latency_ms / 1000)
+    else:
+        from services import create_llm_service as create_llm
+
+    corpus = load_corpus(args.corpus)
+    sessions = [
+        (f"{name}#{copy}" if args.repeat > 1 else name, turns)
+        for copy in range(args.repeat)
+        for name, turns in corpus.items()
+    ]
+    results = ReplayResults()
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def replay(name: str, turns: List[Dict[str, Any]]) -> None:
+        async with slots:
+            await replay_session(
+                name, turns, lambda on_dispatch: DeskPipeline(create_llm(), on_dispatch=on_dispatch), results, args.turn_timeout
+            )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(replay(name, turns) for name, turns in sessions))
+    elapsed = time.perf_counter() - start
+    await WRITE_BEHIND.drain()
+
+    print(f"{len(sessions)} sessions, {args.llm} LLM, concurrency {args.concurrency}")
+    if args.llm == "stub":
+        print("stub LLM answers with the fast-path rules: stub accuracy = rule coverage, not LLM accuracy")
+    print_report(results, elapsed, args.verbose)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL transcript corpus")
+    parser.add_argument("--llm", choices=["stub", "ollama"], default="stub", help="LLM behind the fast path")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="Simulated stub inference time")
+    parser.add_argument("--concurrency", type=int, default=1, help="Sessions replayed at once")
+    parser.add_argument("--repeat", type=int, default=1, help="Times the corpus is replayed")
+    parser.add_argument("--turn-timeout", type=float, default=30.0, help="Seconds before a turn is abandoned")
+    parser.add_argument("--verbose", action="store_true", help="Print every mismatched turn")
+    args = parser.parse_args()
+
+    logger.remove()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Latency and accuracy benchmark for the STT backends on a fixed audio corpus.
+
+The corpus directory holds mono 16-bit WAV utterances with a reference
+transcript next to each one (same name, .txt extension):
+
+    CORPUS/checkin_01.wav
+    CORPUS/checkin_01.txt     "Hi, I have a reservation under John Smith"
+
+Each clip is transcribed on its own (latency, real-time factor and word error
+rate), then --concurrency clips at a time to show how the faster-whisper
+batcher behaves when several desks finish speaking together. Decoding is
+biased with the hotel vocabulary like in the pipeline (STT_VOCABULARY=false
+to compare without), and the WER after vocabulary correction is reported
+next to the raw one.
+
+Usage:
+    STT_BACKEND=faster-whisper python benchmarks/bench_stt.py --corpus recordings/stt --concurrency 4
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import re
+import sys
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from loguru import logger
+
+from latency import percentile
+from benchmarks.bench_turn_analyzer import SAMPLE_RATE, load_wav
+
+Transcriber = Callable[[np.ndarray], Awaitable[str]]
+
+
+def normalize_words(text: str) -> List[str]:
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """Word-level edit distance and reference length."""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def load_corpus(corpus_dir: str) -> List[Tuple[str, np.ndarray, str]]:
+    clips = []
+    for wav_path in sorted(glob.glob(os.path.join(corpus_dir, "*.wav"))):
+        txt_path = os.path.splitext(wav_path)[0] + ".txt"
+        if not os.path.exists(txt_path):
+            continue
+        with open(txt_path, encoding="utf-8") as f:
+            clips.append((os.path.basename(wav_path), load_wav(wav_path), f.read().strip()))
+    return clips
+
+
+def create_transcriber(backend: str) -> Transcriber:
+    from vocabulary import stt_prompt
+
+    if backend == "faster-whisper":
+        from faster_whisper_stt import STT_BATCHER, shared_whisper_model
+
+        shared_whisper_model()
+
+        async def transcribe(audio: np.ndarray) -> str:
+            return await STT_BATCHER.transcribe(audio, prompt=stt_prompt())
+
+        return transcribe
+
+    import mlx_whisper
+
+    from services import STT_MODEL
+
+    async def transcribe_mlx(audio: np.ndarray) -> str:
+        result = await asyncio.to_thread(
+            mlx_whisper.transcribe,
+            audio,
+            path_or_hf_repo=STT_MODEL.value,
+            language="en",
+            initial_prompt=stt_prompt(),
+        )
+        return result.get("text", "").strip()
+
+    return transcribe_mlx
+
+
+async def run(args) -> None:
+    from services import stt_backend
+    from vocabulary import HOTEL_VOCABULARY
+
+    backend = stt_backend()
+    if backend == "none":
+        raise SystemExit("STT_BACKEND=none has nothing to benchmark")
+
+    clips = load_corpus(args.corpus)
+    if not clips:
+        raise SystemExit(f"No .wav/.txt pairs found in {args.corpus}")
+
+    start = time.perf_counter()
+    transcribe = create_transcriber(backend)
+    await transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32))
+    print(f"{backend}: {len(clips)} clips, model load + first decode {time.perf_counter() - start:.1f}s")
+
+    latencies = []
+    errors = corrected_errors = words = 0
+    audio_secs = 0.0
+    for name, audio, reference in clips:
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            text = await transcribe(audio)
+            latencies.append((time.perf_counter() - start) * 1000)
+        clip_errors, clip_words = word_errors(reference, text)
+        errors += clip_errors
+        corrected_errors += word_errors(reference, HOTEL_VOCABULARY.correct(text))[0]
+        words += clip_words
+        audio_secs += len(audio) / SAMPLE_RATE
+        if args.verbose:
+            print(f"  {name}: {clip_errors}/{clip_words} errors  \"{text}\"")
+
+    latencies.sort()
+    decode_secs = sum(latencies) / 1000 / args.repeat
+    print(
+        f"sequential   p50 {percentile(latencies, 50):7.1f} ms  p95 {percentile(latencies, 95):7.1f} ms  "
+        f"RTF {decode_secs / audio_secs:.3f}  WER {errors / max(words, 1):.1%}  "
+        f"corrected {corrected_errors / max(words, 1):.1%}"
+    )
+
+    if args.concurrency > 1:
+        latencies = []
+
+        async def timed(audio: np.ndarray) -> None:
+            start = time.perf_counter()
+            await transcribe(audio)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        audios = [audio for _, audio, _ in clips] * args.repeat
+        for offset in range(0, len(audios), args.concurrency):
+            await asyncio.gather(*(timed(audio) for audio in audios[offset:offset + args.concurrency]))
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        print(
+            f"concurrent x{args.concurrency}  p50 {percentile(latencies, 50):7.1f} ms  "
+            f"p95 {percentile(latencies, 95):7.1f} ms  {len(audios) / elapsed:.2f} utterances/s"
+        )
+        if backend == "faster-whisper":
+            from faster_whisper_stt import STT_BATCHER
+
+            print(f"batcher: {STT_BATCHER.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", required=True, help="Directory of .wav clips with .txt references")
+    parser.add_argument("--repeat", type=int, default=1, help="Transcriptions per clip")
+    parser.add_argument("--concurrency", type=int, default=4, help="Clips submitted at once (1 to skip)")
+    parser.add_argument("--verbose", action="store_true", help="Print every transcript")
+    args = parser.parse_args()
+
+    logger.remove()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
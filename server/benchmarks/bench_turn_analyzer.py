@@ -0,0 +1,128 @@
+"""
+Accuracy and latency benchmark for end-of-turn detection.
+
+Runs recorded utterances through the in-process smart-turn analyzer and
+compares it with plain VAD (which ends the turn at every pause). The data
+directory holds mono 16-bit WAV clips, each ending at a pause, sorted by the
+correct decision:
+
+    DATA/complete/*.wav      the speaker had finished the turn
+    DATA/incomplete/*.wav    the speaker paused mid-sentence
+
+Reports accuracy, how often a guest would be cut off mid-sentence
+(false "complete") and per-decision latency percentiles.
+
+Usage:
+    python benchmarks/bench_turn_analyzer.py --data recordings/turns
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import wave
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from loguru import logger
+
+from latency import percentile
+
+
+SAMPLE_RATE = 16000
+
+# Clip label: 1 = complete, 0 = incomplete
+Clip = Tuple[str, np.ndarray, int]
+
+
+def load_wav(path: str) -> np.ndarray:
+    """Read a mono 16-bit WAV file as float32 at 16 kHz."""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit PCM")
+        audio = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        if wav.getnchannels() > 1:
+            audio = audio.reshape(-1, wav.getnchannels()).mean(axis=1)
+        rate = wav.getframerate()
+    audio = audio.astype(np.float32) / 32768.0
+    if rate != SAMPLE_RATE:
+        positions = np.arange(0, len(audio), rate / SAMPLE_RATE)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+
+def load_clips(data_dir: str) -> List[Clip]:
+    clips = []
+    for label_name, label in (("complete", 1), ("incomplete", 0)):
+        for path in sorted(glob.glob(os.path.join(data_dir, label_name, "*.wav"))):
+            clips.append((path, load_wav(path), label))
+    return clips
+
+
+def evaluate(predict: Callable[[np.ndarray], int], clips: List[Clip]) -> Dict[str, float]:
+    latencies = []
+    correct = false_complete = false_incomplete = 0
+    for _, audio, label in clips:
+        start = time.perf_counter()
+        prediction = predict(audio)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if prediction == label:
+            correct += 1
+        elif prediction == 1:
+            false_complete += 1
+        else:
+            false_incomplete += 1
+
+    incomplete = sum(1 for _, _, label in clips if label == 0)
+    complete = len(clips) - incomplete
+    latencies.sort()
+    return {
+        "accuracy": correct / len(clips),
+        "cut_off_rate": false_complete / incomplete if incomplete else 0.0,
+        "late_rate": false_incomplete / complete if complete else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", required=True, help="Directory with complete/ and incomplete/ WAV clips")
+    args = parser.parse_args()
+
+    logger.remove()
+
+    clips = load_clips(args.data)
+    if not clips:
+        raise SystemExit(f"No WAV clips found under {args.data}/complete or {args.data}/incomplete")
+
+    from smart_turn import shared_turn_model
+
+    start = time.perf_counter()
+    model = shared_turn_model()
+    load_ms = (time.perf_counter() - start) * 1000
+    # First inference initializes onnxruntime kernels; keep it out of the numbers
+    model._predict_endpoint(np.zeros(SAMPLE_RATE, dtype=np.float32))
+
+    analyzers = {
+        "vad_only": lambda audio: 1,
+        "local_smart_turn": lambda audio: model._predict_endpoint(audio)["prediction"],
+    }
+
+    complete = sum(label for _, _, label in clips)
+    print(f"{len(clips)} clips ({complete} complete, {len(clips) - complete} incomplete), model load {load_ms:.0f} ms")
+    print(f"{'analyzer':<18} {'accuracy':>9} {'cut off':>8} {'late':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, predict in analyzers.items():
+        result = evaluate(predict, clips)
+        print(
+            f"{name:<18} {result['accuracy']:>9.1%} {result['cut_off_rate']:>8.1%} {result['late_rate']:>7.1%} "
+            f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Import-time profile for the bot entry point.
+
+Imports a module in a fresh interpreter with ``python -X importtime`` and
+reports the total import time plus the slowest top-level packages, so a new
+eager import on the startup path shows up before it reaches production.
+
+Usage:
+    python benchmarks/profile_imports.py [--module bot] [--top 15]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def profile_import(module: str) -> List[Tuple[int, int, str]]:
+    """Return (self_us, cumulative_us, dotted_name) for every module imported."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVER_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((int(self_us), int(cumulative_us), name.strip()))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="bot", help="Module to import")
+    parser.add_argument("--top", type=int, default=15, help="Number of packages to list")
+    args = parser.parse_args()
+
+    entries = profile_import(args.module)
+
+    # Attribute self time to top-level packages
+    by_package: Dict[str, int] = {}
+    for self_us, _, name in entries:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+
+    total_us = next(cumulative for _, cumulative, name in entries if name == args.module)
+    print(f"import {args.module}: {total_us / 1000:.0f} ms, {len(entries)} modules")
+    print()
+    print(f"{'package':<28} {'ms':>8} {'share':>7}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{package:<28} {self_us / 1000:>8.1f} {self_us / total_us:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
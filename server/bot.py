@@ -4,19 +4,17 @@ Based on Pipecat's RTVI framework with local Whisper STT and gpt-oss LLM.
 No TTS - listens only and populates forms via function calling.
 """
 
+import asyncio
 import os
 import sys
 import json
 from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
 from dotenv import load_dotenv
 from loguru import logger
 
 from pipecat.adapters.schemas.function_schema import FunctionSchema
 from pipecat.adapters.schemas.tools_schema import ToolsSchema
-from pipecat.audio.vad.silero import SileroVADAnalyzer
-from pipecat.audio.vad.vad_analyzer import VADParams
-from pipecat.audio.turn.smart_turn.base_smart_turn import SmartTurnParams
-from pipecat.audio.turn.smart_turn.fal_smart_turn import FalSmartTurnAnalyzer
 from pipecat.frames.frames import (
     TranscriptionFrame,
     StartInterruptionFrame,
@@ -27,32 +25,36 @@ from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.processors.aggregators.llm_context import LLMContext
 from pipecat.processors.aggregators.llm_response_universal import LLMContextAggregatorPair
-from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIObserver, RTVIProcessor
-from pipecat.services.whisper.stt import WhisperSTTServiceMLX, MLXModel
-from pipecat.services.ollama.llm import OLLamaLLMService
+from pipecat.processors.frame_processor import FrameProcessor
+from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIObserver, RTVIProcessor, RTVIServerMessageFrame
 from pipecat.services.llm_service import FunctionCallParams
-from pipecat.transports.base_transport import TransportParams
-from pipecat.runner.types import RunnerArguments
-from pipecat.runner.utils import create_transport
 
-# Optional imports for different transports and features
-try:
-    from pipecat.transports.daily.transport import DailyParams
-except Exception:
-    DailyParams = None
+if TYPE_CHECKING:
+    # Pulls in FastAPI; only needed for the annotation
+    from pipecat.runner.types import RunnerArguments
 
-try:
-    from pipecat.transports.fastapi_websocket.transport import FastAPIWebsocketParams
-except Exception:
-    FastAPIWebsocketParams = None
+# Transport, VAD/turn analyzer and STT/LLM service modules are imported lazily
+# (see transports.py and run_bot) so startup only pays for what is used
 
 from functions import (
+    AVAILABILITY_CACHE,
     FUNCTION_DEFINITIONS,
-    handle_checkin_form,
-    handle_availability_search,
-    handle_reservation_modification,
-    handle_special_request,
+    FUNCTION_REGISTRY,
+    WorkflowSession,
+    execute_function_call,
+    load_saved_reservations,
 )
+from coalescer import FunctionCallCoalescer
+from context_window import ContextWindowProcessor
+from fast_path import FastPathProcessor
+from latency import LATENCY_STATS, LatencyObserver
+from state_store import SessionStateStore
+from session_manager import SESSION_MANAGER, SessionLimitError
+from storage import STORAGE
+from transports import transport_params
+from vocabulary import HOTEL_VOCABULARY, VOCABULARY_ENABLED, VocabularyCorrectionProcessor
+from warmup import MODEL_WARMUP
+from write_behind import WRITE_BEHIND
 
 load_dotenv()
 
@@ -121,107 +123,220 @@ Guest: "Can I get a late checkout at 2 PM?"
 
 Remember: Extract data accurately, call functions promptly."""
 
+# Tool schemas are identical for every session, so build them once at import
+TOOLS = ToolsSchema(
+    standard_tools=[
+        FunctionSchema(
+            name=func_def["name"],
+            description=func_def["description"],
+            properties=func_def["parameters"]["properties"],
+            required=func_def["parameters"].get("required", []),
+        )
+        for func_def in FUNCTION_DEFINITIONS
+    ]
+)
 
-async def run_bot(transport):
-    """Main bot function that creates and runs the pipeline."""
 
-    rtvi = RTVIProcessor(config=RTVIConfig(config=[]))
+# Called after every dispatched call: (function_name, tool_call_id, arguments, result)
+DispatchListener = Callable[[str, str, Dict[str, Any], Dict[str, Any]], None]
+
+
+def create_function_dispatcher(
+    rtvi: RTVIProcessor,
+    context_window: ContextWindowProcessor,
+    coalescer: FunctionCallCoalescer,
+    session: Optional[WorkflowSession] = None,
+    on_dispatch: Optional[DispatchListener] = None,
+):
+    """Create the per-session dispatcher shared by the LLM callback and the fast path."""
+
+    async def dispatch(function_name: str, tool_call_id: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        # Process the arguments (lookups, date parsing, defaults)
+        result = await execute_function_call(function_name, arguments, session=session)
+        context_window.record_result(result)
+        if session:
+            session.record_result(result)
+
+        # Send the PROCESSED data to the frontend, only the fields that changed
+        changes = await coalescer.submit(function_name, tool_call_id, result.get("data", arguments))
+        if changes is None:
+            # The call left the form as the client has it; say so instead of staying silent
+            await rtvi.push_frame(RTVIServerMessageFrame(
+                data={"type": "state-unchanged", "function_name": function_name, "tool_call_id": tool_call_id}
+            ))
+        if on_dispatch:
+            on_dispatch(function_name, tool_call_id, arguments, result)
+        return result
 
-    # Initialize STT service (Whisper MLX)
-    stt = WhisperSTTServiceMLX(model=MLXModel.LARGE_V3_TURBO_Q4)
+    return dispatch
 
-    # Initialize LLM service (Ollama)
-    llm = OLLamaLLMService(
-        model=os.getenv("OLLAMA_MODEL", "llama3.2:latest")
+
+def create_update_sender(rtvi: RTVIProcessor, state_store: SessionStateStore):
+    """Create the coalescer's sender that pushes a versioned state patch to the client."""
+
+    async def send_update(function_name: str, tool_call_id: str, changes: Dict[str, Any]):
+        await push_state(rtvi, function_name, tool_call_id, state_store.update(function_name, changes))
+
+    return send_update
+
+
+async def push_state(rtvi: RTVIProcessor, function_name: str, tool_call_id: str, message: Dict[str, Any]):
+    """Send a state patch (or snapshot) to the client as an llm-function-call message."""
+    await rtvi.handle_function_call(
+        FunctionCallParams(
+            function_name=function_name,
+            tool_call_id=tool_call_id,
+            arguments=message,
+            llm=None,
+            context=None,
+            result_callback=None,
+        )
     )
 
-    # Register function callbacks
-    async def update_checkin_form_callback(params: FunctionCallParams):
-        logger.info(f"update_checkin_form called with args: {params.arguments}")
 
-        # Process the arguments
-        result = await handle_checkin_form(params.arguments)
+def create_function_callback(dispatch):
+    """Create the LLM callback that dispatches any registered function for a session."""
+
+    async def function_callback(params: FunctionCallParams):
+        logger.info(f"{params.function_name} called with args: {params.arguments}")
 
-        # Push RTVI message with PROCESSED data to frontend
-        await rtvi.handle_function_call(params)
+        result = await dispatch(params.function_name, params.tool_call_id, params.arguments)
 
         await params.result_callback(result)
 
-    async def search_availability_callback(params: FunctionCallParams):
-        logger.info(f"search_availability called with args: {params.arguments}")
+    return function_callback
 
-        # Process the arguments (parse dates, apply defaults)
-        result = await handle_availability_search(params.arguments)
 
-        params.arguments = result.get("data", {})
-        # Push RTVI message with PROCESSED data to frontend
-        await rtvi.handle_function_call(params)
+class DeskPipeline:
+    """
+    One desk session's pipeline processors and per-session state.
 
-        await params.result_callback(result)
+    Shared by run_bot and the offline replay harness (benchmarks/bench_replay.py),
+    so both run exactly the same processors between their input and output.
+    """
 
-    async def modify_reservation_callback(params: FunctionCallParams):
-        logger.info(f"modify_reservation called with args: {params.arguments}")
+    def __init__(self, llm, stt=None, on_dispatch: Optional[DispatchListener] = None):
+        self.rtvi = RTVIProcessor(config=RTVIConfig(config=[]))
+        self.stt = stt
+        self.llm = llm
 
-        # Process the arguments (parse relative dates)
-        result = await handle_reservation_modification(params.arguments)
+        # System prompt
+        messages = [
+            {
+                "role": "system",
+                "content": SYSTEM_INSTRUCTION,
+            }
+        ]
 
-        # Push RTVI message with PROCESSED data to frontend
-        await rtvi.handle_function_call(params)
+        # Create context aggregator
+        self.context = LLMContext(messages, TOOLS)
+        self.context_aggregator = LLMContextAggregatorPair(self.context)
 
-        await params.result_callback(result)
+        # Keep the context to the system prompt, workflow state and recent turns
+        self.context_window = ContextWindowProcessor(self.context)
 
-    async def create_special_request_callback(params: FunctionCallParams):
-        logger.info(f"create_special_request called with args: {params.arguments}")
-        # Push RTVI message to notify frontend of function call
-        await rtvi.handle_function_call(params)
-        
-        result = await handle_special_request(params.arguments)
-        await params.result_callback(result)
+        # Merge rapid-fire calls and send them as patches against the client's acked state
+        self.state_store = SessionStateStore()
+        self.coalescer = FunctionCallCoalescer(create_update_sender(self.rtvi, self.state_store))
 
-    llm.register_function("update_checkin_form", update_checkin_form_callback)
-    llm.register_function("search_availability", search_availability_callback)
-    llm.register_function("modify_reservation", modify_reservation_callback)
-    llm.register_function("create_special_request", create_special_request_callback)
+        # Records the current workflow keeps refining (e.g. its special request)
+        self.workflow = WorkflowSession()
 
-    # Convert function definitions to FunctionSchema format
-    function_schemas = []
-    for func_def in FUNCTION_DEFINITIONS:
-        schema = FunctionSchema(
-            name=func_def["name"],
-            description=func_def["description"],
-            properties=func_def["parameters"]["properties"],
-            required=func_def["parameters"].get("required", [])
+        # Register function callbacks
+        self.dispatch = create_function_dispatcher(
+            self.rtvi, self.context_window, self.coalescer, self.workflow, on_dispatch
+        )
+        function_callback = create_function_callback(self.dispatch)
+        for function_name in FUNCTION_REGISTRY:
+            llm.register_function(function_name, function_callback)
+
+    def pipeline(self, input_processor: FrameProcessor, output_processor: FrameProcessor) -> Pipeline:
+        """Create the pipeline (NO TTS - skip directly to context aggregator)."""
+        return Pipeline(
+            [
+                input_processor,
+                *([self.stt] if self.stt else []),  # Whisper STT
+                *([VocabularyCorrectionProcessor()] if VOCABULARY_ENABLED else []),  # Fix misheard names/room types
+                FastPathProcessor(self.dispatch, self.workflow),  # Rule-based extraction, LLM only when unsure
+                self.rtvi,
+                self.context_aggregator.user(),
+                self.context_window,
+                self.llm,  # LLM with function calling
+                # NO TTS HERE - skip directly to output
+                output_processor,
+                self.context_aggregator.assistant(),
+            ]
         )
-        function_schemas.append(schema)
 
-    tools = ToolsSchema(standard_tools=function_schemas)
+    async def handle_client_message(self, task: PipelineTask, message) -> None:
+        """Handle a custom message from the client."""
+        # Extract message type and data
+        msg_type = message.type
+        msg_data = message.data if hasattr(message, "data") else {}
 
-    # System prompt
-    messages = [
-        {
-            "role": "system",
-            "content": SYSTEM_INSTRUCTION,
-        }
-    ]
+        if msg_type == "custom-message":
+            text = msg_data.get("text", "") if isinstance(msg_data, dict) else ""
+            if text:
+                logger.info(f"Processing custom message: {text}")
+                # Send the text as a TranscriptionFrame
+                await task.queue_frames(
+                    [
+                        TranscriptionFrame(
+                            text=text,
+                            user_id="text-input",
+                            timestamp="",
+                        ),
+                    ]
+                )
+        elif msg_type == "workflow-complete":
+            # The desk finished the current form; start the next one from a clean context
+            self.reset()
+        elif msg_type in ("state-ack", "state-resync"):
+            # Malformed state messages are logged and dropped rather than ending the session
+            data = msg_data if isinstance(msg_data, dict) else {}
+            function_name = data.get("function_name")
+            if not isinstance(function_name, str) or function_name not in FUNCTION_REGISTRY:
+                logger.warning(f"Ignoring {msg_type} for unknown form: {msg_data!r}")
+                return
+            if msg_type == "state-resync":
+                await push_state(self.rtvi, function_name, "resync", self.state_store.resync(function_name))
+                return
+            try:
+                version = int(data.get("version"))
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring state-ack without a valid version: {msg_data!r}")
+                return
+            self.state_store.ack(function_name, version)
+
+    def reset(self) -> None:
+        """Start the next workflow from a clean context."""
+        self.context_window.reset()
+        self.coalescer.reset()
+        self.state_store.reset()
+        self.workflow.reset()
+
+
+async def run_bot(transport, session_id: str = ""):
+    """Main bot function that creates and runs the pipeline."""
+
+    from prefix_cache import PREFIX_CACHE
+    from services import LLM_BACKEND, create_llm_service, create_stt_service
+
+    # Initialize STT service (Whisper on MLX or faster-whisper, model shared across
+    # sessions; None with STT_BACKEND=none for text-only sessions)
+    stt = create_stt_service()
+
+    # Initialize LLM service (Ollama, client pool shared across sessions)
+    llm = create_llm_service()
+
+    # Keep the model resident so the cached system prompt prefix is reused
+    if LLM_BACKEND == "ollama":
+        PREFIX_CACHE.keep_pinned()
+
+    desk = DeskPipeline(llm, stt)
+    rtvi = desk.rtvi
+    pipeline = desk.pipeline(transport.input(), transport.output())
 
-    # Create context aggregator
-    context = LLMContext(messages, tools)
-    context_aggregator = LLMContextAggregatorPair(context)
-
-    # Create pipeline (NO TTS - skip directly to context aggregator)
-    pipeline = Pipeline(
-        [
-            transport.input(),
-            stt,  # Whisper STT
-            rtvi,
-            context_aggregator.user(),
-            llm,  # LLM with function calling
-            # NO TTS HERE - skip directly to output
-            transport.output(),
-            context_aggregator.assistant(),
-        ]
-    )
-    
     # Create task with RTVI observer
     task = PipelineTask(
         pipeline,
@@ -230,11 +345,13 @@ async def run_bot(transport):
             enable_metrics=True,
             enable_usage_metrics=True,
         ),
-        observers=[RTVIObserver(rtvi)],
+        observers=[RTVIObserver(rtvi), LatencyObserver(session_id)],
     )
     
     @rtvi.event_handler("on_client_ready")
     async def on_client_ready(rtvi):
+        # Only report ready once the models are warm
+        await MODEL_WARMUP.wait_ready(SYSTEM_INSTRUCTION, TOOLS)
         await rtvi.set_bot_ready()
         logger.info("Hotel AI Assistant ready - listening for conversations")
     
@@ -242,25 +359,7 @@ async def run_bot(transport):
     async def on_client_message(rtvi, message):
         """Handle custom messages from the client."""
         logger.info(f"Received client message: {message}")
-        
-        # Extract message type and data
-        msg_type = message.type
-        msg_data = message.data if hasattr(message, "data") else {}
-        
-        if msg_type == "custom-message":
-            text = msg_data.get("text", "") if isinstance(msg_data, dict) else ""
-            if text:
-                logger.info(f"Processing custom message: {text}")
-                # Send the text as a TranscriptionFrame
-                await task.queue_frames(
-                    [
-                        TranscriptionFrame(
-                            text=text,
-                            user_id="text-input",
-                            timestamp="",
-                        ),
-                    ]
-                )
+        await desk.handle_client_message(task, message)
     
     @transport.event_handler("on_client_connected")
     async def on_client_connected(transport, client):
@@ -272,6 +371,11 @@ async def run_bot(transport):
         """Handle disconnection."""
         logger.info("Client disconnected from Hotel AI Assistant")
         await task.cancel()
+        logger.info(f"Function call updates: {desk.coalescer.stats()}, state: {desk.state_store.stats()}")
+        LATENCY_STATS.log_report()
+        logger.info(f"Availability cache: {AVAILABILITY_CACHE.stats()}")
+        logger.info(f"Vocabulary correction: {HOTEL_VOCABULARY.stats()}")
+        logger.info(f"Write-behind queue: {WRITE_BEHIND.stats()}")
         logger.info("Hotel AI Assistant stopped")
     
     # Create runner and run the task
@@ -279,71 +383,32 @@ async def run_bot(transport):
     await runner.run(task)
 
 
-async def bot(runner_args: RunnerArguments):
+async def bot(runner_args: "RunnerArguments"):
     """Main bot entry point compatible with standard bot starters."""
+    from pipecat.runner.utils import create_transport
 
-    transport_params = {}
-
-    # Get the URL for the remote Smart Turn service
-    remote_smart_turn_url = os.getenv("REMOTE_SMART_TURN_URL")
-
-    # Add Daily transport if available
-    if DailyParams:
-        transport_params["daily"] = lambda: DailyParams(
-            audio_in_enabled=True,
-            audio_out_enabled=False,
-            vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=0.2)),
-            turn_analyzer=FalSmartTurnAnalyzer(
-                url=remote_smart_turn_url,
-                params=SmartTurnParams(
-                    stop_secs=3.0,
-                    pre_speech_ms=0.0,
-                    max_duration_secs=8.0
-                )
-            ) if remote_smart_turn_url else None,
-        )
-
-    # Add Twilio/FastAPI WebSocket transport if available
-    if FastAPIWebsocketParams:
-        transport_params["twilio"] = lambda: FastAPIWebsocketParams(
-            audio_in_enabled=True,
-            audio_out_enabled=False,
-            vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=0.2)),
-            turn_analyzer=FalSmartTurnAnalyzer(
-                url=remote_smart_turn_url,
-                params=SmartTurnParams(
-                    stop_secs=3.0,
-                    pre_speech_ms=0.0,
-                    max_duration_secs=8.0
-                )
-            ) if remote_smart_turn_url else None,
-        )
+    # Admit the desk before creating its transport so a full process rejects early
+    try:
+        async with SESSION_MANAGER.session(transport=type(runner_args).__name__) as desk:
+            transport = await create_transport(runner_args, transport_params())
+            await run_bot(transport, desk.session_id)
+    except SessionLimitError as e:
+        logger.warning(f"Rejected desk connection: {e}")
 
-    # Always add webrtc transport (base transport)
-    webrtc_params = {
-        "audio_in_enabled": True,
-        "audio_out_enabled": False,
-        "vad_analyzer": SileroVADAnalyzer(params=VADParams(stop_secs=0.2)),
-    }
-
-    # Add turn analyzer if remote URL is available
-    if remote_smart_turn_url:
-        webrtc_params["turn_analyzer"] = FalSmartTurnAnalyzer(
-            url=remote_smart_turn_url,
-            params=SmartTurnParams(
-                stop_secs=3.0,
-                pre_speech_ms=0.0,
-                max_duration_secs=8.0
-            )
-        )
 
-    transport_params["webrtc"] = lambda: TransportParams(**webrtc_params)
+if __name__ == "__main__":
+    from pipecat.runner.run import main
 
-    transport = await create_transport(runner_args, transport_params)
-    await run_bot(transport)
+    # Commit the writes a previous process left in the journal, then load the saved bookings
+    asyncio.run(WRITE_BEHIND.recover())
+    asyncio.run(load_saved_reservations())
 
+    # Load and exercise STT, VAD and the LLM before accepting connections
+    MODEL_WARMUP.run(SYSTEM_INSTRUCTION, TOOLS)
 
-if __name__ == "__main__":
-    from pipecat.runner.run import main
-    
-    main()
+    try:
+        main()
+    finally:
+        # Persist what the sessions left queued before the process exits
+        asyncio.run(WRITE_BEHIND.close())
+        STORAGE.close()
@@ -0,0 +1,132 @@
+"""
+Coalescing of function-call updates sent to the client.
+
+The LLM often calls the same tool several times in one response, or again on
+the next turn with only one argument changed, and every call used to push a
+full llm-function-call message and re-render the form. The coalescer sits
+between the dispatcher and RTVI and, per function (one function per
+workflow form):
+
+- sends only the fields that differ from what the client already has,
+- drops calls that change nothing,
+- throttles: the first call goes out immediately, later calls within
+  FUNCTION_COALESCE_MS are merged into one trailing update.
+
+Pending updates for another workflow are flushed before a new workflow's
+update is sent, so the client always ends on the workflow called last.
+The client merges the partial updates into its form state (updateAI).
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+# Window in which repeated calls to the same function are merged (0 disables merging)
+FUNCTION_COALESCE_MS = float(os.getenv("FUNCTION_COALESCE_MS", "150"))
+
+# (function_name, tool_call_id, changed_fields) -> pushes the update to the client
+SendUpdate = Callable[[str, str, Dict[str, Any]], Awaitable[None]]
+
+_MISSING = object()
+
+
+def field_diff(known: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of ``update`` whose values differ from ``known``."""
+    return {key: value for key, value in update.items() if known.get(key, _MISSING) != value}
+
+
+class FunctionCallCoalescer:
+    """Per-session diffing and throttling of function-call updates."""
+
+    def __init__(self, send: SendUpdate, window_secs: float = FUNCTION_COALESCE_MS / 1000):
+        self._send = send
+        self._window_secs = window_secs
+        # Function name -> fields the client has received
+        self._sent: Dict[str, Dict[str, Any]] = {}
+        # Function name -> (latest tool_call_id, merged fields not yet sent)
+        self._pending: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        # Function name -> monotonic time until which updates are merged
+        self._window_end: Dict[str, float] = {}
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+
+    async def submit(self, function_name: str, tool_call_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Queue a function call's processed data for the client.
+
+        Args:
+            function_name: Function that produced the data
+            tool_call_id: Tool call ID reported with the update
+            data: Full processed data for the form
+
+        Returns:
+            The changed fields, or None when the call changed nothing
+        """
+        self.calls += 1
+        pending = self._pending.get(function_name)
+        known = {**self._sent.get(function_name, {}), **(pending[1] if pending else {})}
+        changes = field_diff(known, data)
+        if not changes:
+            self.dropped += 1
+            logger.debug(f"Dropped no-op {function_name} update")
+            return None
+
+        # Keep workflow order: anything pending for other forms goes out first
+        for other in [name for name in self._pending if name != function_name]:
+            await self._flush(other)
+
+        if pending:
+            self.merged += 1
+            self._pending[function_name] = (tool_call_id, {**pending[1], **changes})
+        elif time.monotonic() < self._window_end.get(function_name, 0.0):
+            self._pending[function_name] = (tool_call_id, changes)
+            self._flush_tasks[function_name] = asyncio.create_task(self._flush_later(function_name))
+        else:
+            await self._push(function_name, tool_call_id, changes)
+        return changes
+
+    async def flush(self) -> None:
+        """Send every pending update now."""
+        for function_name in list(self._pending):
+            await self._flush(function_name)
+
+    def reset(self) -> None:
+        """Forget what the client has (it reset its forms); pending updates are discarded."""
+        for task in self._flush_tasks.values():
+            task.cancel()
+        self._flush_tasks.clear()
+        self._pending.clear()
+        self._sent.clear()
+        self._window_end.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "sent": self.sent, "merged": self.merged, "dropped": self.dropped}
+
+    async def _flush_later(self, function_name: str) -> None:
+        await asyncio.sleep(max(0.0, self._window_end[function_name] - time.monotonic()))
+        self._flush_tasks.pop(function_name, None)
+        try:
+            await self._flush(function_name)
+        except Exception as e:
+            logger.error(f"Failed to send coalesced {function_name} update: {e}")
+
+    async def _flush(self, function_name: str) -> None:
+        task = self._flush_tasks.pop(function_name, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+        pending = self._pending.pop(function_name, None)
+        if pending:
+            await self._push(function_name, *pending)
+
+    async def _push(self, function_name: str, tool_call_id: str, changes: Dict[str, Any]) -> None:
+        self._sent.setdefault(function_name, {}).update(changes)
+        self._window_end[function_name] = time.monotonic() + self._window_secs
+        self.sent += 1
+        await self._send(function_name, tool_call_id, changes)
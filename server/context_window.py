@@ -0,0 +1,149 @@
+"""
+Bounded LLM context for long-running desk sessions.
+
+A desk connection stays open for a whole shift, and the context aggregators
+append every turn to the same LLMContext. ContextWindowProcessor sits between
+the user aggregator and the LLM and rewrites that context before each
+inference so it holds only:
+
+    1. the system instruction
+    2. a compact state message with the workflow in progress (guest, dates,
+       room, ...), built from the processed function call results
+    3. the most recent turns (CONTEXT_MAX_TURNS)
+
+Older turns are dropped once their information is captured in the state
+message. When the desk moves on to a different workflow, or the client
+reports the workflow complete, the previous workflow's turns are dropped
+entirely, so prompt size stays flat over the session.
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from pipecat.frames.frames import Frame, LLMContextFrame
+from pipecat.processors.aggregators.llm_context import LLMContext
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+
+# Recent user turns (with their tool calls and results) kept verbatim
+CONTEXT_MAX_TURNS = int(os.getenv("CONTEXT_MAX_TURNS", "6"))
+
+STATE_HEADER = "## CURRENT WORKFLOW STATE"
+
+# UI-only and status fields of the function results
+_STATE_SKIP_FIELDS = {
+    "editMode", "request_created", "guest_found", "reservation_found", "checked_in", "modification_applied",
+}
+
+
+def _role(message: Any) -> Optional[str]:
+    return message.get("role") if isinstance(message, dict) else None
+
+
+def _is_state_message(message: Any) -> bool:
+    return (
+        _role(message) == "system"
+        and isinstance(message.get("content"), str)
+        and message["content"].startswith(STATE_HEADER)
+    )
+
+
+def summarize_result(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep the scalar, non-empty form fields of a function result."""
+    summary = {}
+    for key, value in data.items():
+        if key in _STATE_SKIP_FIELDS or value in ("", None):
+            continue
+        if isinstance(value, (str, int, float, bool)):
+            summary[key] = value
+    selected = data.get("selectedReservation")
+    if isinstance(selected, dict) and selected.get("id"):
+        summary["selected_reservation_id"] = selected["id"]
+    return summary
+
+
+class ContextWindowProcessor(FrameProcessor):
+    """Keeps a session's LLM context to the system prompt, workflow state and recent turns."""
+
+    def __init__(self, context: LLMContext, max_turns: int = CONTEXT_MAX_TURNS, **kwargs):
+        super().__init__(**kwargs)
+        self._context = context
+        self._max_turns = max_turns
+        self._workflow: Optional[str] = None
+        self._state: Dict[str, Any] = {}
+        self._state_changed = False
+        self._reset_pending = False
+        self.compactions = 0
+        self.dropped_messages = 0
+
+    @property
+    def workflow_state(self) -> Dict[str, Any]:
+        return {"workflow": self._workflow, **self._state}
+
+    def record_result(self, result: Dict[str, Any]) -> None:
+        """Fold a processed function call result into the workflow state."""
+        workflow = result.get("workflow")
+        data = result.get("data")
+        if not workflow or not isinstance(data, dict):
+            return
+
+        if workflow != self._workflow:
+            # Moving to another workflow completes the previous one
+            if self._workflow is not None:
+                self._reset_pending = True
+            self._workflow = workflow
+            self._state = {}
+        self._state.update(summarize_result(data))
+        self._state_changed = True
+
+    def reset(self) -> None:
+        """Workflow completed: forget its state and drop its turns at the next inference."""
+        self._workflow = None
+        self._state = {}
+        self._state_changed = True
+        self._reset_pending = True
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, LLMContextFrame) and frame.context is self._context:
+            self._compact()
+
+        await self.push_frame(frame, direction)
+
+    def _compact(self) -> None:
+        messages = self._context.get_messages()
+        if not messages:
+            return
+
+        system = [messages[0]] if _role(messages[0]) == "system" else []
+        conversation = [m for m in messages[len(system):] if not _is_state_message(m)]
+
+        # Split the conversation into turns, each starting at a user message
+        turn_starts = [i for i, m in enumerate(conversation) if _role(m) == "user"]
+        keep_turns = 1 if self._reset_pending else self._max_turns
+        if len(turn_starts) > keep_turns:
+            conversation = conversation[turn_starts[-keep_turns]:]
+        elif not self._state_changed:
+            return
+
+        state = [self._state_message()] if self._workflow else []
+        compacted = system + state + conversation
+        dropped = len(messages) - len(compacted)
+        self._context.set_messages(compacted)
+
+        self._state_changed = False
+        self._reset_pending = False
+        if dropped > 0:
+            self.compactions += 1
+            self.dropped_messages += dropped
+            logger.debug(f"Context compacted: dropped {dropped} messages, {len(compacted)} remain")
+
+    def _state_message(self) -> Dict[str, Any]:
+        return {
+            "role": "system",
+            "content": f"{STATE_HEADER}\n{json.dumps(self.workflow_state, separators=(',', ':'))}",
+        }
@@ -0,0 +1,287 @@
+"""
+Batch date resolution for offline transcript replay.
+
+Resolves many date expressions at once with NumPy datetime64 arithmetic,
+following the same grammar and defaulting rules as date_utils. Each distinct
+expression is parsed once into a small rule (kind plus integer operands); the
+rules are then applied to every row with array operations, so the per-row cost
+does not go through the Python parser at all.
+
+Results are datetime64[D] arrays with NaT where an expression is unparseable.
+Use numpy.datetime_as_string to get YYYY-MM-DD strings back.
+"""
+
+from datetime import date
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from date_utils import (
+    KEYWORD_OFFSETS,
+    MONTH_MAP,
+    WEEKDAY_MAP,
+    _DATE_RE,
+    _count,
+    _normalize,
+)
+
+
+ReferenceDates = Union[str, date, np.datetime64, Sequence]
+
+# Rule kinds
+_INVALID = 0
+_ABSOLUTE = 1       # a = days since epoch
+_OFFSET = 2         # reference + a days
+_WEEKDAY = 3        # next weekday a (b = 1 if today counts) plus c weeks
+_WEEK_START = 4     # Monday of the reference week
+_MONTH_DAY = 5      # next occurrence of month a, day b
+_DAY_OF_MONTH = 6   # next occurrence of day b
+
+# 1970-01-01 was a Thursday
+_EPOCH_WEEKDAY = 3
+
+# Rule: (kind, a, b, c, stay length in days or -1)
+_Rule = Tuple[int, int, int, int, int]
+_INVALID_RULE: _Rule = (_INVALID, 0, 0, 0, -1)
+
+
+def _days_since_epoch(value: date) -> int:
+    return int(np.datetime64(value, "D").astype(np.int64))
+
+
+def _compile_rule(text: str) -> _Rule:
+    """Translate one normalized expression into a vectorizable rule."""
+    match = _DATE_RE.match(text)
+    if not match:
+        return _INVALID_RULE
+
+    kind = match.lastgroup
+    if kind == "iso":
+        try:
+            return (_ABSOLUTE, _days_since_epoch(date.fromisoformat(match.group("iso"))), 0, 0, -1)
+        except ValueError:
+            return _INVALID_RULE
+    if kind == "offset":
+        return (_OFFSET, int(match.group("offset")), 0, 0, -1)
+    if kind == "keyword":
+        return (_OFFSET, KEYWORD_OFFSETS[match.group("keyword")], 0, 0, -1)
+    if kind == "in_span":
+        count = _count(match.group("in_count"))
+        return (_OFFSET, count * 7 if match.group("in_unit").startswith("week") else count, 0, 0, -1)
+    if kind == "span":
+        count = _count(match.group("span_count"))
+        days = count * 7 if match.group("span_unit").startswith("week") else count
+        if match.group("span_from"):
+            return (_OFFSET, days, 0, 0, -1)
+        # A length of stay is not a date; only resolve_date_pairs applies it
+        return (_INVALID, 0, 0, 0, days or -1)
+    if kind == "weeks_from":
+        weekday = WEEKDAY_MAP[match.group("from_weekday")]
+        return (_WEEKDAY, weekday, 1, _count(match.group("from_count")), -1)
+    if kind == "ref_weekday":
+        weekday = WEEKDAY_MAP[match.group("ref_day")]
+        return (_WEEKDAY, weekday, int(match.group("ref") == "this"), 0, -1)
+    if kind == "weekday":
+        return (_WEEKDAY, WEEKDAY_MAP[match.group("weekday")], 1, 0, -1)
+    if kind == "week_ref":
+        if match.group("week_which") == "next":
+            return (_OFFSET, 7, 0, 0, -1)
+        return (_WEEK_START, 0, 0, 0, -1)
+    if kind == "month_first":
+        return _month_day_rule(MONTH_MAP[match.group("month")], int(match.group("month_day")), match.group("month_year"))
+    if kind == "day_first":
+        day = int(match.group("day"))
+        if match.group("day_month"):
+            return _month_day_rule(MONTH_MAP[match.group("day_month")], day, match.group("day_year"))
+        if not 1 <= day <= 31:
+            return _INVALID_RULE
+        return (_DAY_OF_MONTH, 0, day, 0, -1)
+    return _INVALID_RULE
+
+
+def _month_day_rule(month: int, day: int, year: Optional[str]) -> _Rule:
+    if year:
+        try:
+            return (_ABSOLUTE, _days_since_epoch(date(int(year), month, day)), 0, 0, -1)
+        except ValueError:
+            return _INVALID_RULE
+    # Reject days that never exist in this month (Feb 29 is allowed)
+    try:
+        date(2000, month, day)
+    except ValueError:
+        return _INVALID_RULE
+    return (_MONTH_DAY, month, day, 0, -1)
+
+
+def _compile(expressions: Sequence[Optional[str]]) -> Tuple[np.ndarray, ...]:
+    """Build per-row rule operand arrays, parsing each distinct expression once."""
+    # Hash-based dedupe: one dict probe per row, no string sorting
+    row_ids: Dict[Optional[str], int] = {}
+    inverse = np.fromiter(
+        (row_ids.setdefault(expression, len(row_ids)) for expression in expressions),
+        dtype=np.int64,
+        count=len(expressions),
+    )
+
+    rules_by_text: Dict[str, _Rule] = {}
+    rules = []
+    for expression in row_ids:
+        if not expression:
+            rules.append(_INVALID_RULE)
+            continue
+        normalized = _normalize(expression)
+        if normalized not in rules_by_text:
+            rules_by_text[normalized] = _compile_rule(normalized)
+        rules.append(rules_by_text[normalized])
+
+    table = np.array(rules, dtype=np.int64).reshape(-1, 5)[inverse]
+    return table[:, 0], table[:, 1], table[:, 2], table[:, 3], table[:, 4]
+
+
+def _reference_days(reference: ReferenceDates, size: int) -> np.ndarray:
+    """Reference dates as int64 days since epoch, broadcast to size rows."""
+    if isinstance(reference, (str, date, np.datetime64)):
+        reference = [reference]
+    days = np.asarray(reference, dtype="datetime64[D]").astype(np.int64)
+    return np.broadcast_to(days, (size,)) if days.size == 1 else days
+
+
+def _month_day_number(years: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """Day numbers of year/month/day (years since epoch), -1 where the day does not exist."""
+    months = years * 12 + month - 1
+    month_start = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    next_month_start = (months + 1).astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    day_number = month_start + day - 1
+    return np.where(day_number < next_month_start, day_number, -1)
+
+
+def _next_date_on(ref: np.ndarray, months: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """
+    Day number of the first date >= ref with the given day of month, searching
+    from the month offsets in ``months`` (months since epoch). -1 where none is found.
+    """
+    result = np.full(ref.shape, -1, dtype=np.int64)
+    pending = np.ones(ref.shape, dtype=bool)
+    # Same 13-month search window as date_utils
+    for _ in range(13):
+        if not pending.any():
+            break
+        month_start = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+        next_month_start = (months + 1).astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+        candidate = month_start + day - 1
+        found = pending & (candidate < next_month_start) & (candidate >= ref)
+        result[found] = candidate[found]
+        pending &= ~found
+        months = months + np.where(pending, 1, 0)
+    return result
+
+
+def _apply(
+    ref: np.ndarray, kind: np.ndarray, a: np.ndarray, b: np.ndarray, c: np.ndarray
+) -> np.ndarray:
+    """Evaluate rules against reference day numbers; NaT (as int64 min) where invalid."""
+    nat = np.iinfo(np.int64).min
+    result = np.full(ref.shape, nat, dtype=np.int64)
+
+    mask = kind == _ABSOLUTE
+    result[mask] = a[mask]
+
+    mask = kind == _OFFSET
+    result[mask] = ref[mask] + a[mask]
+
+    mask = kind == _WEEKDAY
+    if mask.any():
+        ref_weekday = (ref[mask] + _EPOCH_WEEKDAY) % 7
+        days_ahead = (a[mask] - ref_weekday) % 7
+        days_ahead = np.where((days_ahead == 0) & (b[mask] == 0), 7, days_ahead)
+        result[mask] = ref[mask] + days_ahead + 7 * c[mask]
+
+    mask = kind == _WEEK_START
+    result[mask] = ref[mask] - (ref[mask] + _EPOCH_WEEKDAY) % 7
+
+    mask = kind == _MONTH_DAY
+    if mask.any():
+        ref_m = ref[mask]
+        year = ref_m.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64)
+        # This year's date if still ahead, otherwise next year's; a date that
+        # does not exist in the chosen year (Feb 29) is unparseable
+        this_year = _month_day_number(year, a[mask], b[mask])
+        next_year = _month_day_number(year + 1, a[mask], b[mask])
+        chosen = np.where((this_year >= 0) & (this_year < ref_m), next_year, this_year)
+        result[mask] = np.where(chosen >= 0, chosen, nat)
+
+    mask = kind == _DAY_OF_MONTH
+    if mask.any():
+        ref_m = ref[mask]
+        months = ref_m.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        found = _next_date_on(ref_m, months, b[mask])
+        result[mask] = np.where(found >= 0, found, nat)
+
+    return result
+
+
+def parse_relative_dates(expressions: Sequence[Optional[str]], reference: ReferenceDates) -> np.ndarray:
+    """
+    Vectorized parse_relative_date.
+
+    Args:
+        expressions: Date expressions (relative or YYYY-MM-DD); empty or None entries give NaT
+        reference: Reference date, or one reference date per expression
+
+    Returns:
+        datetime64[D] array with NaT where the expression is missing or unparseable
+    """
+    kind, a, b, c, _ = _compile(expressions)
+    ref = _reference_days(reference, len(expressions))
+    return _apply(ref, kind, a, b, c).astype("datetime64[D]")
+
+
+def resolve_date_pairs(
+    pairs: Sequence[Tuple[Optional[str], Optional[str]]], reference: ReferenceDates
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized resolve_date_pair.
+
+    Applies the same defaults as date_utils.resolve_date_pair: a missing or
+    unparseable side is filled in as the other side ±1 day, both missing
+    defaults to the reference date and the day after, and a check-out stay
+    length ("two nights") is counted from the check-in date, or from the
+    reference date (also the check-in date) without one.
+
+    Args:
+        pairs: (check_in, check_out) expressions
+        reference: Reference date ("today" for each conversation), scalar or per pair
+
+    Returns:
+        Tuple of (check_in_dates, check_out_dates) as datetime64[D] arrays
+    """
+    size = len(pairs)
+    check_ins = [pair[0] for pair in pairs]
+    check_outs = [pair[1] for pair in pairs]
+    ref = _reference_days(reference, size)
+
+    in_kind, in_a, in_b, in_c, _ = _compile(check_ins)
+    out_kind, out_a, out_b, out_c, out_stay = _compile(check_outs)
+    check_in = _apply(ref, in_kind, in_a, in_b, in_c)
+    check_out = _apply(ref, out_kind, out_a, out_b, out_c)
+
+    nat = np.iinfo(np.int64).min
+    has_in = check_in != nat
+    has_out = check_out != nat
+
+    has_stay = out_stay >= 0
+    check_in = np.where(has_stay & ~has_in, ref, check_in)
+    check_out = np.where(has_stay, check_in + out_stay, check_out)
+    has_in |= has_stay
+    has_out |= has_stay
+
+    only_in = has_in & ~has_out
+    only_out = ~has_in & has_out
+    neither = ~has_in & ~has_out
+
+    check_out = np.where(only_in, check_in + 1, check_out)
+    check_in = np.where(only_out, check_out - 1, check_in)
+    check_in = np.where(neither, ref, check_in)
+    check_out = np.where(neither, ref + 1, check_out)
+
+    return check_in.astype("datetime64[D]"), check_out.astype("datetime64[D]")
@@ -3,25 +3,376 @@ Date parsing utilities for handling relative date expressions.
 
 Converts natural language date expressions (e.g., "tomorrow", "next Friday", "+2")
 into YYYY-MM-DD formatted strings for the frontend.
+
+All supported forms are matched by a single precompiled regular expression;
+the named group that matched selects the resolver, so each call is one regex
+match plus a little date arithmetic.
 """
 
+import os
 import re
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Hashable, Optional, Tuple
+from zoneinfo import ZoneInfo
 from loguru import logger
 
 
-def parse_relative_date(relative_str: str) -> str:
+# Property timezone used to decide what "today" is (defaults to server local time)
+HOTEL_TIMEZONE = os.getenv("HOTEL_TIMEZONE", "")
+
+# Maximum number of memoized date resolutions
+DATE_CACHE_SIZE = int(os.getenv("DATE_CACHE_SIZE", "1024"))
+
+# Upper bound between clock reads, so wall-clock adjustments are picked up too
+_MAX_DAY_CHECK_INTERVAL_SECS = 60.0
+
+
+WEEKDAY_MAP = {
+    "monday": 0, "mon": 0,
+    "tuesday": 1, "tue": 1, "tues": 1,
+    "wednesday": 2, "wed": 2,
+    "thursday": 3, "thu": 3, "thur": 3, "thurs": 3,
+    "friday": 4, "fri": 4,
+    "saturday": 5, "sat": 5,
+    "sunday": 6, "sun": 6,
+}
+
+MONTH_MAP = {
+    "january": 1, "jan": 1,
+    "february": 2, "feb": 2,
+    "march": 3, "mar": 3,
+    "april": 4, "apr": 4,
+    "may": 5,
+    "june": 6, "jun": 6,
+    "july": 7, "jul": 7,
+    "august": 8, "aug": 8,
+    "september": 9, "sep": 9, "sept": 9,
+    "october": 10, "oct": 10,
+    "november": 11, "nov": 11,
+    "december": 12, "dec": 12,
+}
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19, "twenty": 20,
+}
+
+KEYWORD_OFFSETS = {
+    "today": 0,
+    "tonight": 0,
+    "tomorrow": 1,
+    "tomorrow night": 1,
+    "day after tomorrow": 2,
+    "the day after tomorrow": 2,
+    "yesterday": -1,
+}
+
+
+def _alternation(words) -> str:
+    # Longest first so "thurs" wins over "thu"
+    return "|".join(sorted((re.escape(w) for w in words), key=len, reverse=True))
+
+
+_WEEKDAY = _alternation(WEEKDAY_MAP)
+_MONTH = _alternation(MONTH_MAP)
+_COUNT = r"\d+|" + _alternation(NUMBER_WORDS)
+_ORDINAL = r"(?:st|nd|rd|th)?"
+
+# Each alternative is wrapped in an outer named group, which is the last group
+# to close when it matches, so match.lastgroup names the resolver to dispatch to.
+# A day of the month needs "the", an ordinal or "of <month>": a bare number
+# ("for 2") is not a date. A span is a length of stay unless it says "from now".
+_DATE_RE = re.compile(
+    rf"""
+    ^(?:on\ |for\ )?(?:
+        (?P<iso>\d{{4}}-\d{{2}}-\d{{2}})
+      | (?P<offset>[+-]\d+)
+      | (?P<keyword>{_alternation(KEYWORD_OFFSETS)})
+      | (?P<in_span>in\ (?P<in_count>{_COUNT})\ (?P<in_unit>days?|nights?|weeks?))
+      | (?P<weeks_from>(?P<from_count>{_COUNT})\ weeks?\ from\ (?P<from_weekday>{_WEEKDAY}))
+      | (?P<span>(?P<span_count>{_COUNT})\ (?P<span_unit>days?|nights?|weeks?)(?P<span_from>\ from\ (?:now|today))?)
+      | (?P<ref_weekday>(?P<ref>next|this|coming|this\ coming)\ (?P<ref_day>{_WEEKDAY}))
+      | (?P<weekday>{_WEEKDAY})
+      | (?P<week_ref>(?P<week_which>next|this)\ week)
+      | (?P<month_first>(?P<month>{_MONTH})\ (?:the\ )?(?P<month_day>\d{{1,2}}){_ORDINAL}(?:,?\ (?P<month_year>\d{{4}}))?)
+      | (?P<day_first>(?=the\ |\d+(?:st|nd|rd|th)|\d+\ of\ )(?:the\ )?(?P<day>\d{{1,2}}){_ORDINAL}(?:\ of\ (?P<day_month>{_MONTH})(?:,?\ (?P<day_year>\d{{4}}))?)?)
+    )$
+    """,
+    re.VERBOSE,
+)
+
+# Resolved value: (date, stay length in days for duration expressions)
+_Resolved = Tuple[Optional[date], Optional[int]]
+
+
+def _count(value: str) -> int:
+    return int(value) if value.isdigit() else NUMBER_WORDS[value]
+
+
+def _days_until(today: date, weekday: int, allow_today: bool) -> int:
+    days_ahead = weekday - today.weekday()
+    if days_ahead < 0 or (days_ahead == 0 and not allow_today):
+        days_ahead += 7
+    return days_ahead
+
+
+def _next_month_day(today: date, day: int) -> Optional[date]:
+    """The next date (today or later) falling on the given day of the month."""
+    year, month = today.year, today.month
+    for _ in range(13):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:
+            candidate = None
+        if candidate and candidate >= today:
+            return candidate
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return None
+
+
+def _month_day(today: date, month: int, day: int, year: Optional[str]) -> Optional[date]:
+    """A month/day date; without an explicit year, the next occurrence from today."""
+    try:
+        if year:
+            return date(int(year), month, day)
+        candidate = date(today.year, month, day)
+        if candidate < today:
+            candidate = date(today.year + 1, month, day)
+        return candidate
+    except ValueError:
+        return None
+
+
+def _resolve_iso(match: re.Match, today: date) -> _Resolved:
+    try:
+        return date.fromisoformat(match.group("iso")), None
+    except ValueError:
+        return None, None
+
+
+def _resolve_offset(match: re.Match, today: date) -> _Resolved:
+    return today + timedelta(days=int(match.group("offset"))), None
+
+
+def _resolve_keyword(match: re.Match, today: date) -> _Resolved:
+    return today + timedelta(days=KEYWORD_OFFSETS[match.group("keyword")]), None
+
+
+def _resolve_in_span(match: re.Match, today: date) -> _Resolved:
+    count = _count(match.group("in_count"))
+    days = count * 7 if match.group("in_unit").startswith("week") else count
+    return today + timedelta(days=days), None
+
+
+def _resolve_weeks_from(match: re.Match, today: date) -> _Resolved:
+    weekday = WEEKDAY_MAP[match.group("from_weekday")]
+    anchor = today + timedelta(days=_days_until(today, weekday, allow_today=True))
+    return anchor + timedelta(weeks=_count(match.group("from_count"))), None
+
+
+def _resolve_span(match: re.Match, today: date) -> _Resolved:
+    count = _count(match.group("span_count"))
+    days = count * 7 if match.group("span_unit").startswith("week") else count
+    if match.group("span_from"):
+        return today + timedelta(days=days), None
+    # "three nights": a length of stay, not a calendar date
+    return None, days or None
+
+
+def _resolve_ref_weekday(match: re.Match, today: date) -> _Resolved:
+    weekday = WEEKDAY_MAP[match.group("ref_day")]
+    # "this [weekday]" may be today; "next [weekday]" is always in the future
+    allow_today = match.group("ref") == "this"
+    return today + timedelta(days=_days_until(today, weekday, allow_today)), None
+
+
+def _resolve_weekday(match: re.Match, today: date) -> _Resolved:
+    weekday = WEEKDAY_MAP[match.group("weekday")]
+    return today + timedelta(days=_days_until(today, weekday, allow_today=True)), None
+
+
+def _resolve_week_ref(match: re.Match, today: date) -> _Resolved:
+    if match.group("week_which") == "next":
+        # 7 days from today
+        return today + timedelta(weeks=1), None
+    # Start of current week (Monday)
+    return today - timedelta(days=today.weekday()), None
+
+
+def _resolve_month_first(match: re.Match, today: date) -> _Resolved:
+    month = MONTH_MAP[match.group("month")]
+    return _month_day(today, month, int(match.group("month_day")), match.group("month_year")), None
+
+
+def _resolve_day_first(match: re.Match, today: date) -> _Resolved:
+    day = int(match.group("day"))
+    if match.group("day_month"):
+        return _month_day(today, MONTH_MAP[match.group("day_month")], day, match.group("day_year")), None
+    return _next_month_day(today, day), None
+
+
+_RESOLVERS = {
+    "iso": _resolve_iso,
+    "offset": _resolve_offset,
+    "keyword": _resolve_keyword,
+    "in_span": _resolve_in_span,
+    "weeks_from": _resolve_weeks_from,
+    "span": _resolve_span,
+    "ref_weekday": _resolve_ref_weekday,
+    "weekday": _resolve_weekday,
+    "week_ref": _resolve_week_ref,
+    "month_first": _resolve_month_first,
+    "day_first": _resolve_day_first,
+}
+
+
+def _parse(text: str, today: date) -> _Resolved:
+    """
+    Resolve a normalized date expression.
+
+    Returns:
+        Tuple of (resolved date, stay length in days). Duration expressions
+        such as "two nights" resolve to (None, stay length): callers apply
+        them to a check-in date rather than treating them as a date.
+    """
+    match = _DATE_RE.match(text)
+    if not match:
+        return None, None
+    return _RESOLVERS[match.lastgroup](match, today)
+
+
+def _normalize(relative_str: str) -> str:
+    return " ".join(relative_str.lower().split()).rstrip(".!?")
+
+
+def current_date(tz: Optional[str] = None) -> date:
+    """
+    Return today's date in the given (or the property's) timezone.
+
+    Args:
+        tz: IANA timezone name, e.g. "America/New_York". Defaults to
+            HOTEL_TIMEZONE, or server local time when that is unset.
+    """
+    tz = tz or HOTEL_TIMEZONE
+    if tz:
+        return datetime.now(ZoneInfo(tz)).date()
+    return datetime.now().date()
+
+
+class DateResolutionCache:
+    """
+    Bounded LRU cache for date resolutions, keyed on normalized input plus the reference date.
+
+    Because the reference date is part of every key, an entry can never be
+    served for the wrong day. Entries for days that are no longer current in
+    any timezone are purged on first access after midnight.
+    """
+
+    def __init__(self, maxsize: int = DATE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[Hashable, date], Any]" = OrderedDict()
+        # Current date per timezone seen by callers
+        self._current_days: Dict[str, date] = {}
+        # Monotonic time at which each timezone's date must be re-read (next midnight)
+        self._day_deadlines: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def today(self, tz: Optional[str] = None) -> date:
+        """Return the current date for tz, purging stale entries when the day rolled over."""
+        tz = tz or HOTEL_TIMEZONE
+        now = time.monotonic()
+        if now < self._day_deadlines.get(tz, 0.0):
+            return self._current_days[tz]
+
+        local_now = datetime.now(ZoneInfo(tz)) if tz else datetime.now()
+        today = local_now.date()
+        midnight = datetime.combine(today + timedelta(days=1), datetime.min.time(), local_now.tzinfo)
+        self._day_deadlines[tz] = now + min((midnight - local_now).total_seconds(), _MAX_DAY_CHECK_INTERVAL_SECS)
+
+        if self._current_days.get(tz) != today:
+            self._current_days[tz] = today
+            self._purge_stale_days()
+        return today
+
+    def get(self, key: Hashable, today: date) -> Tuple[bool, Any]:
+        """Return (found, value) for key on the given day."""
+        entry_key = (key, today)
+        if entry_key in self._entries:
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            return True, self._entries[entry_key]
+        self.misses += 1
+        return False, None
+
+    def put(self, key: Hashable, today: date, value: Any) -> None:
+        self._entries[(key, today)] = value
+        self._entries.move_to_end((key, today))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _purge_stale_days(self) -> None:
+        current = set(self._current_days.values())
+        stale = [entry_key for entry_key in self._entries if entry_key[1] not in current]
+        for entry_key in stale:
+            del self._entries[entry_key]
+        if stale:
+            self.invalidations += 1
+            logger.debug(f"Date cache rolled over: dropped {len(stale)} entries")
+
+
+_date_cache = DateResolutionCache()
+
+
+def date_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the date resolution cache."""
+    return _date_cache.stats()
+
+
+def parse_relative_date(relative_str: str, today: Optional[date] = None, tz: Optional[str] = None) -> str:
     """
     Parse a relative date string into YYYY-MM-DD format.
 
     Supports:
     - Numeric offsets: "+1", "+2", "-1" (days from today)
-    - Text patterns: "tomorrow", "today", "tonight", "next [weekday]", "this [weekday]"
-    - Relative expressions: "in X days", "in X weeks"
+    - Text patterns: "tomorrow", "today", "tonight", "next [weekday]", "this [weekday]", "[weekday]"
+    - Relative expressions: "in X days", "in X weeks", "a week from Friday", "two days from now"
+    - Calendar dates: "the 15th", "March 3rd", "3rd of March", "March 3, 2025"
+
+    Lengths of stay ("two nights", "for a week") and bare numbers are not
+    dates and return an empty string; resolve_date_pair applies stay lengths.
+
+    Results are memoized per (input, reference date).
 
     Args:
         relative_str: Relative date expression or YYYY-MM-DD date
+        today: Reference date (defaults to the current date in tz)
+        tz: Property timezone used to determine today (defaults to HOTEL_TIMEZONE)
 
     Returns:
         Date in YYYY-MM-DD format, or empty string if unparseable
@@ -29,97 +380,31 @@ def parse_relative_date(relative_str: str) -> str:
     if not relative_str:
         return ""
 
-    relative_str = relative_str.strip().lower()
-    today = datetime.now().date()
+    normalized = _normalize(relative_str)
+    today = today or _date_cache.today(tz)
 
-    # Already in YYYY-MM-DD format
-    if re.match(r'^\d{4}-\d{2}-\d{2}$', relative_str):
-        return relative_str
+    found, cached = _date_cache.get(normalized, today)
+    if found:
+        return cached
 
-    # Numeric offset: +1, +2, -1, etc.
-    if re.match(r'^[+-]\d+$', relative_str):
-        try:
-            days = int(relative_str)
-            result_date = today + timedelta(days=days)
-            return result_date.strftime("%Y-%m-%d")
-        except ValueError:
-            logger.warning(f"Invalid numeric offset: {relative_str}")
-            return ""
-
-    # "today" or "tonight"
-    if relative_str in ["today", "tonight"]:
-        return today.strftime("%Y-%m-%d")
-
-    # "tomorrow"
-    if relative_str == "tomorrow":
-        return (today + timedelta(days=1)).strftime("%Y-%m-%d")
-
-    # "yesterday"
-    if relative_str == "yesterday":
-        return (today - timedelta(days=1)).strftime("%Y-%m-%d")
-
-    # "in X days" or "in X day"
-    match = re.match(r'^in (\d+) days?$', relative_str)
-    if match:
-        days = int(match.group(1))
-        result_date = today + timedelta(days=days)
-        return result_date.strftime("%Y-%m-%d")
-
-    # "in X weeks" or "in X week"
-    match = re.match(r'^in (\d+) weeks?$', relative_str)
-    if match:
-        weeks = int(match.group(1))
-        result_date = today + timedelta(weeks=weeks)
-        return result_date.strftime("%Y-%m-%d")
-
-    # "next [weekday]" or "this [weekday]"
-    weekday_map = {
-        "monday": 0, "mon": 0,
-        "tuesday": 1, "tue": 1, "tues": 1,
-        "wednesday": 2, "wed": 2,
-        "thursday": 3, "thu": 3, "thur": 3, "thurs": 3,
-        "friday": 4, "fri": 4,
-        "saturday": 5, "sat": 5,
-        "sunday": 6, "sun": 6,
-    }
-
-    for prefix in ["next ", "this "]:
-        if relative_str.startswith(prefix):
-            weekday_str = relative_str[len(prefix):].strip()
-            if weekday_str in weekday_map:
-                target_weekday = weekday_map[weekday_str]
-                current_weekday = today.weekday()
-
-                if prefix == "this ":
-                    # "this [weekday]" - find the next occurrence this week or today
-                    days_ahead = target_weekday - current_weekday
-                    if days_ahead < 0:
-                        days_ahead += 7
-                else:
-                    # "next [weekday]" - find the next occurrence (always in the future)
-                    days_ahead = target_weekday - current_weekday
-                    if days_ahead <= 0:
-                        days_ahead += 7
-
-                result_date = today + timedelta(days=days_ahead)
-                return result_date.strftime("%Y-%m-%d")
-
-    # "next week" - 7 days from today
-    if relative_str == "next week":
-        return (today + timedelta(weeks=1)).strftime("%Y-%m-%d")
-
-    # "this week" - start of current week (Monday)
-    if relative_str == "this week":
-        days_since_monday = today.weekday()
-        monday = today - timedelta(days=days_since_monday)
-        return monday.strftime("%Y-%m-%d")
-
-    # If we couldn't parse it, log and return empty
-    logger.warning(f"Unable to parse relative date: {relative_str}")
-    return ""
-
-
-def resolve_date_pair(check_in: Optional[str], check_out: Optional[str]) -> Tuple[str, str]:
+    resolved, stay = _parse(normalized, today)
+    if resolved is None:
+        # If we couldn't parse it, log and return empty
+        if stay is not None:
+            logger.info(f"Not a date but a {stay}-night stay: {normalized}")
+        else:
+            logger.warning(f"Unable to parse relative date: {normalized}")
+        result = ""
+    else:
+        result = resolved.isoformat()
+
+    _date_cache.put(normalized, today, result)
+    return result
+
+
+def resolve_date_pair(
+    check_in: Optional[str], check_out: Optional[str], tz: Optional[str] = None
+) -> Tuple[str, str]:
     """
     Resolve a pair of check-in/check-out dates with smart defaults.
 
@@ -127,18 +412,47 @@ def resolve_date_pair(check_in: Optional[str], check_out: Optional[str]) -> Tupl
     - Only check_in: check_out defaults to check_in + 1 day (1-night stay)
     - Only check_out: check_in defaults to check_out - 1 day
     - Both provided: parse both
+    - A stay length as check_out ("two nights") is counted from check_in, or
+      from today (also the check-in date) when no check_in is given
     - Neither provided: defaults to today (check-in) and tomorrow (check-out)
 
+    Results are memoized per (input pair, current date in tz).
+
     Args:
         check_in: Check-in date (relative or YYYY-MM-DD)
         check_out: Check-out date (relative or YYYY-MM-DD)
+        tz: Property timezone used to determine today (defaults to HOTEL_TIMEZONE)
 
     Returns:
         Tuple of (check_in_date, check_out_date) in YYYY-MM-DD format
     """
+    today = _date_cache.today(tz)
+    key = ("pair", _normalize(check_in or ""), _normalize(check_out or ""))
+
+    found, cached = _date_cache.get(key, today)
+    if found:
+        return cached
+
+    result = _resolve_date_pair(check_in, check_out, today)
+    _date_cache.put(key, today, result)
+    return result
+
+
+def _resolve_date_pair(check_in: Optional[str], check_out: Optional[str], today: date) -> Tuple[str, str]:
+    """Uncached implementation of resolve_date_pair for a given reference date."""
     # Parse what we have
-    parsed_check_in = parse_relative_date(check_in) if check_in else ""
-    parsed_check_out = parse_relative_date(check_out) if check_out else ""
+    parsed_check_in = parse_relative_date(check_in, today) if check_in else ""
+    parsed_check_out = ""
+    if check_out:
+        check_out_date, stay = _parse(_normalize(check_out), today)
+        if stay is not None:
+            parsed_check_in = parsed_check_in or today.isoformat()
+            check_out_date = date.fromisoformat(parsed_check_in) + timedelta(days=stay)
+            logger.info(f"Resolved check_out as a {stay}-night stay from {parsed_check_in}")
+        if check_out_date is None:
+            logger.warning(f"Unable to parse relative date: {check_out}")
+        else:
+            parsed_check_out = check_out_date.isoformat()
 
     # Both provided - return as-is
     if parsed_check_in and parsed_check_out:
@@ -168,7 +482,6 @@ def resolve_date_pair(check_in: Optional[str], check_out: Optional[str]) -> Tupl
 
     # Neither provided - default to today (check-in) and tomorrow (check-out)
     if not parsed_check_in and not parsed_check_out:
-        today = datetime.now().date()
         parsed_check_in = today.strftime("%Y-%m-%d")
         parsed_check_out = (today + timedelta(days=1)).strftime("%Y-%m-%d")
         logger.info(f"No dates provided - defaulting to today check-in ({parsed_check_in}) and tomorrow check-out ({parsed_check_out})")
@@ -0,0 +1,384 @@
+"""
+Rule-based fast path for simple front-desk utterances.
+
+Many utterances map directly onto one function call:
+
+    "I have a reservation under John Smith"       -> update_checkin_form
+    "Can I get a late checkout at 2 PM?"          -> create_special_request
+    "Do you have a suite available tomorrow?"     -> search_availability
+
+FastPathProcessor sits right after STT. It runs a handful of precompiled
+rules on each final transcription and, when exactly one rule matches with
+high confidence, dispatches the function call itself and consumes the
+transcription. Anything else (no match, several matches, corrections or
+modification requests) falls through to the LLM unchanged.
+
+With SPECULATIVE_EXTRACTION=true the rules also run on interim transcripts
+(see services.py) and push tentative form updates that the final
+transcription commits or rolls back. Speculative calls are dry runs: nothing
+is saved or booked until the final transcription commits the call.
+
+Rules are deliberately conservative: a wrong form update costs the desk more
+than a slower correct one.
+"""
+
+import os
+import re
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from pipecat.frames.frames import (
+    Frame,
+    InterimTranscriptionFrame,
+    TranscriptionFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.processors.frameworks.rtvi import RTVIServerMessageFrame
+
+from date_utils import _DATE_RE, _normalize, resolve_date_pair
+from functions import RESERVATION_INDEX, WorkflowSession, execute_function_call
+from reservation_index import normalize_text
+
+
+# Set to "false" to send every utterance to the LLM
+FAST_PATH_ENABLED = os.getenv("FAST_PATH", "true").lower() != "false"
+
+# Apply the rules to interim transcripts and push tentative form updates
+SPECULATIVE_EXTRACTION = os.getenv("SPECULATIVE_EXTRACTION", "false").lower() == "true"
+
+# (function_name, arguments)
+FastPathCall = Tuple[str, Dict[str, Any]]
+
+# Dispatches a function call: (function_name, tool_call_id, arguments) -> result
+FunctionDispatcher = Callable[..., Awaitable[Dict[str, Any]]]
+
+# Utterances that revise or add to earlier information need the LLM
+_DEFER_RE = re.compile(
+    r"\b(?:change|modify|extend|cancel|move|switch|instead|actually|not|don't|dont|no|but|also|and then)\b"
+)
+
+_CHECKIN_INTENT_RE = re.compile(
+    r"\b(?:reservation|booking|booked|checking in|check in|check-in)\b.*?"
+    r"\b(?:under|for|name is|name's)\s+(?:the name\s+)?(?:of\s+)?"
+    r"(?P<name>[a-z][a-z'-]+(?:\s+[a-z][a-z'-]+){1,2})"
+)
+_RESERVATION_NUMBER_RE = re.compile(r"\breservation (?:number|id)\s+(?:is\s+)?(?P<number>res)[\s-]?(?P<digits>\d+)\b")
+
+_LATE_CHECKOUT_RE = re.compile(r"\blate check[\s-]?out\b")
+_CHECKOUT_TIME_RE = re.compile(
+    r"\b(?:at|until|till|by|around)\s+(?P<time>noon|\d{1,2}(?::\d{2})?\s*(?:[ap]\.?\s?m\b\.?)?)"
+)
+_TOWELS_RE = re.compile(r"\b(?:extra|more|additional|fresh)\s+towels?\b")
+_ROOM_NUMBER_RE = re.compile(r"\broom\s+(?:number\s+)?(?P<room>\d{3,4})\b")
+
+_AVAILABILITY_INTENT_RE = re.compile(
+    r"\b(?:available|availability|vacancy|vacancies|do you have (?:a|an|any)\b|"
+    r"(?:looking for|need|book) (?:a|an)\b.*?\b(?:room|suite))"
+)
+_ROOM_TYPE_RE = re.compile(r"\b(?P<room_type>standard|deluxe|suite)s?\b")
+_DATE_RANGE_RE = re.compile(r"\bfrom (?P<check_in>.+?) (?:to|until|till|through) (?P<check_out>.+?)(?:[.?!,]|$)")
+
+# Longest date phrase tried when scanning an utterance ("the day after tomorrow")
+_MAX_DATE_WORDS = 4
+
+_WORD_RE = re.compile(r"[a-z0-9+'-]+")
+
+
+def _date_phrase_kind(phrase: str) -> Optional[str]:
+    """
+    Classify a phrase the date parser accepts in full.
+
+    Returns:
+        "date" for a calendar date, "stay" for a length of stay ("three
+        nights"), None for anything else
+    """
+    normalized = _normalize(phrase)
+    match = _DATE_RE.match(normalized)
+    # Short weekday forms ("I sat") are too ambiguous
+    if not match or len(re.sub(r"^(?:on |for )?(?:the )?", "", normalized)) <= 3:
+        return None
+    if match.lastgroup == "span" and not match.group("span_from"):
+        return "stay"
+    return "date"
+
+
+def _find_dates(text: str) -> List[Tuple[str, str]]:
+    """(phrase, kind) of the date phrases in an utterance, in order, longest match first at each position."""
+    range_match = _DATE_RANGE_RE.search(text)
+    if (
+        range_match
+        and _date_phrase_kind(range_match["check_in"]) == "date"
+        and _date_phrase_kind(range_match["check_out"]) == "date"
+    ):
+        return [(range_match["check_in"], "date"), (range_match["check_out"], "date")]
+
+    words = _WORD_RE.findall(text)
+    dates = []
+    i = 0
+    while i < len(words):
+        for length in range(min(_MAX_DATE_WORDS, len(words) - i), 0, -1):
+            phrase = " ".join(words[i:i + length])
+            kind = _date_phrase_kind(phrase)
+            if kind:
+                dates.append((phrase, kind))
+                i += length
+                break
+        else:
+            i += 1
+    return dates
+
+
+def _checkin_rule(text: str) -> Optional[FastPathCall]:
+    number_match = _RESERVATION_NUMBER_RE.search(text)
+    if number_match:
+        number = f"{number_match['number']}-{number_match['digits']}"
+        if RESERVATION_INDEX.find_by_number(number):
+            return "update_checkin_form", {"reservation_number": number}
+
+    name_match = _CHECKIN_INTENT_RE.search(text)
+    if not name_match:
+        return None
+
+    # Only act when the spoken name is exactly a booked guest's name
+    words = name_match["name"].split()
+    for length in range(len(words), 1, -1):
+        name = " ".join(words[:length])
+        for reservation in RESERVATION_INDEX.search(name, limit=5):
+            guest_name = (reservation.get("guest") or {}).get("name", "")
+            if normalize_text(guest_name) == normalize_text(name):
+                return "update_checkin_form", {"guest_name": guest_name}
+    return None
+
+
+def _special_request_rule(text: str) -> Optional[FastPathCall]:
+    if _LATE_CHECKOUT_RE.search(text):
+        time_match = _CHECKOUT_TIME_RE.search(text)
+        if time_match:
+            spoken_time = time_match["time"].replace(".", "").replace(" ", "").upper()
+            spoken_time = re.sub(r"(\d)([AP]M)$", r"\1 \2", spoken_time)
+            details = f"{spoken_time.lower() if spoken_time == 'NOON' else spoken_time} checkout requested"
+        else:
+            details = "Late checkout requested"
+        args = {"request_type": "late_checkout", "details": details}
+    elif _TOWELS_RE.search(text):
+        args = {"request_type": "extra_towels", "details": "Extra towels requested"}
+    else:
+        return None
+
+    room_match = _ROOM_NUMBER_RE.search(text)
+    if room_match:
+        args["room_number"] = room_match["room"]
+    return "create_special_request", args
+
+
+def _availability_rule(text: str) -> Optional[FastPathCall]:
+    if not _AVAILABILITY_INTENT_RE.search(text):
+        return None
+
+    phrases = _find_dates(text)
+    dates = [phrase for phrase, kind in phrases if kind == "date"]
+    stays = [phrase for phrase, kind in phrases if kind == "stay"]
+    # A check-in date, optionally followed by a check-out date or a length of stay
+    if not dates or len(phrases) > 2:
+        return None
+
+    room_type_match = _ROOM_TYPE_RE.search(text)
+    args = {
+        "check_in_date": dates[0],
+        "room_type": room_type_match["room_type"] if room_type_match else "any",
+    }
+    if len(dates) == 2:
+        args["check_out_date"] = dates[1]
+    elif stays:
+        # Counted from the check-in date by resolve_date_pair
+        args["check_out_date"] = stays[0]
+
+    # A stay that ends before it starts means the dates were misread
+    check_in, check_out = resolve_date_pair(args["check_in_date"], args.get("check_out_date", ""))
+    if not check_in or not check_out or check_out <= check_in:
+        return None
+    return "search_availability", args
+
+
+_RULES = (_checkin_rule, _special_request_rule, _availability_rule)
+
+
+def match_rules(text: str) -> List[FastPathCall]:
+    """
+    Every rule match in an utterance, without the fast path's certainty checks.
+
+    Args:
+        text: Transcription of one utterance
+
+    Returns:
+        One (function_name, arguments) per matching rule
+    """
+    text = " ".join(text.lower().split())
+    return [call for call in (rule(text) for rule in _RULES) if call]
+
+
+def extract_call(text: str) -> Optional[FastPathCall]:
+    """
+    Map an utterance onto a single function call when the rules are certain.
+
+    Args:
+        text: Final transcription of one utterance
+
+    Returns:
+        (function_name, arguments), or None to defer to the LLM
+    """
+    text = " ".join(text.lower().split())
+    if not text or _DEFER_RE.search(text):
+        return None
+
+    calls = match_rules(text)
+    # Utterances touching more than one workflow are left to the LLM
+    return calls[0] if len(calls) == 1 else None
+
+
+class FastPathStats:
+    """Process-wide fast-path hit rate, extraction cost and speculation outcomes."""
+
+    def __init__(self):
+        self.utterances = 0
+        self.hits: Dict[str, int] = {}
+        self.total_extract_secs = 0.0
+        self.speculations = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    def record(self, call: Optional[FastPathCall], elapsed: float) -> None:
+        self.utterances += 1
+        self.total_extract_secs += elapsed
+        if call:
+            self.hits[call[0]] = self.hits.get(call[0], 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        hits = sum(self.hits.values())
+        return {
+            "utterances": self.utterances,
+            "hits": hits,
+            "fallthroughs": self.utterances - hits,
+            "hit_rate": hits / self.utterances if self.utterances else 0.0,
+            "hits_by_function": dict(self.hits),
+            "avg_extract_us": self.total_extract_secs / self.utterances * 1e6 if self.utterances else 0.0,
+            "speculations": self.speculations,
+            "commits": self.commits,
+            "rollbacks": self.rollbacks,
+        }
+
+
+FAST_PATH_STATS = FastPathStats()
+
+
+class Speculation:
+    """A provisional form update made from an interim transcript."""
+
+    __slots__ = ("speculation_id", "call", "result")
+
+    def __init__(self, call: FastPathCall, result: Dict[str, Any]):
+        self.speculation_id = f"spec-{uuid.uuid4().hex[:12]}"
+        self.call = call
+        self.result = result
+
+
+class FastPathProcessor(FrameProcessor):
+    """
+    Handles high-confidence utterances without the LLM.
+
+    With speculation enabled, interim transcripts are run through the same
+    rules and matching updates are pushed to the client as tentative
+    (RTVI server message "speculative-update"), built by a dry run of the
+    handler. The final transcription then either commits the update (the
+    call runs for real and is sent as the regular llm-function-call, followed
+    by "speculative-commit") or rolls it back ("speculative-rollback") and
+    continues through the fast path or the LLM as usual.
+
+    The dry run sees the desk's workflow session (the one ``dispatch`` uses),
+    so the tentative update shows the same record IDs as the committed call.
+    """
+
+    def __init__(
+        self,
+        dispatch: FunctionDispatcher,
+        session: Optional[WorkflowSession] = None,
+        enabled: bool = FAST_PATH_ENABLED,
+        speculative: bool = SPECULATIVE_EXTRACTION,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self._dispatch = dispatch
+        self._session = session
+        self._enabled = enabled
+        self._speculative = enabled and speculative
+        self._speculation: Optional[Speculation] = None
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if direction == FrameDirection.DOWNSTREAM and self._enabled:
+            # The STT service cancels interim work before producing the final
+            # transcription, so interims always precede the final of their turn
+            if isinstance(frame, InterimTranscriptionFrame):
+                if self._speculative:
+                    await self._speculate(frame.text)
+            elif isinstance(frame, TranscriptionFrame):
+                if await self._handle_final(frame.text):
+                    # Handled; the LLM never sees this utterance
+                    return
+
+        await self.push_frame(frame, direction)
+
+    async def _handle_final(self, text: str) -> bool:
+        start = time.perf_counter()
+        call = extract_call(text)
+        FAST_PATH_STATS.record(call, time.perf_counter() - start)
+
+        speculation, self._speculation = self._speculation, None
+        if speculation and call == speculation.call:
+            FAST_PATH_STATS.commits += 1
+            function_name, arguments = call
+            # Only now is the call executed with its side effects (saving, booking)
+            await self._dispatch(function_name, speculation.speculation_id, arguments)
+            await self._send_speculation("speculative-commit", speculation)
+            return True
+
+        if speculation:
+            FAST_PATH_STATS.rollbacks += 1
+            await self._send_speculation("speculative-rollback", speculation)
+
+        if call:
+            function_name, arguments = call
+            logger.info(f"Fast path: {function_name} with args: {arguments}")
+            await self._dispatch(function_name, f"fast-{uuid.uuid4().hex[:12]}", arguments)
+            return True
+        return False
+
+    async def _speculate(self, text: str) -> None:
+        call = extract_call(text)
+        if not call or (self._speculation and call == self._speculation.call):
+            return
+
+        # Discarded interims must not leave anything behind
+        result = await execute_function_call(*call, dry_run=True, session=self._session)
+        if "error" in result or result.get("status") == "error":
+            return
+
+        self._speculation = Speculation(call, result)
+        FAST_PATH_STATS.speculations += 1
+        logger.debug(f"Speculative {call[0]} from interim transcript: {call[1]}")
+        await self._send_speculation("speculative-update", self._speculation)
+
+    async def _send_speculation(self, message_type: str, speculation: Speculation) -> None:
+        data = {"type": message_type, "speculation_id": speculation.speculation_id}
+        if message_type == "speculative-update":
+            data.update({
+                "status": "tentative",
+                "function_name": speculation.call[0],
+                "workflow": speculation.result.get("workflow"),
+                "args": speculation.result.get("data", {}),
+            })
+        await self.push_frame(RTVIServerMessageFrame(data=data))
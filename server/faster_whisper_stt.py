@@ -0,0 +1,233 @@
+"""
+CPU speech-to-text on faster-whisper (CTranslate2) for x86 servers.
+
+The MLX backend only runs on Apple Silicon. This backend runs Whisper through
+CTranslate2 with int8 weights (STT_COMPUTE_TYPE), which is the fastest
+option on commodity CPUs.
+
+One model is loaded per process and shared by every desk session. Requests
+from all sessions go through a batcher: while the model is busy decoding,
+new utterances queue up and are then decoded together in one batched
+encoder/decoder pass (up to STT_BATCH_SIZE), so N desks talking at once cost
+far less than N sequential decodes. A single pending utterance, or one
+longer than Whisper's 30 second window, is decoded on its own with the
+regular transcribe() path. STT_BATCH_MS optionally holds the first request
+briefly so concurrent ones can join its batch (0 = never wait).
+
+An optional text prompt (the hotel vocabulary, see vocabulary.py) is fed to
+the decoder as hotwords; only requests with the same language and prompt
+share a batch.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+
+# faster-whisper model name or path (CTranslate2 format)
+STT_FASTER_WHISPER_MODEL = os.getenv("STT_FASTER_WHISPER_MODEL", "deepdml/faster-whisper-large-v3-turbo-ct2")
+
+# CTranslate2 compute type: int8 for CPU, int8_float16/float16 for GPU
+STT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "int8")
+
+# cpu, cuda or auto
+STT_DEVICE = os.getenv("STT_DEVICE", "cpu")
+
+# CPU threads used by one decode (0 = CTranslate2 default)
+STT_CPU_THREADS = int(os.getenv("STT_CPU_THREADS", "0"))
+
+# Maximum utterances decoded together
+STT_BATCH_SIZE = int(os.getenv("STT_BATCH_SIZE", "8"))
+
+# How long the first queued utterance waits for others to batch with
+STT_BATCH_MS = float(os.getenv("STT_BATCH_MS", "0"))
+
+# Beam width (1 = greedy, fastest)
+STT_BEAM_SIZE = int(os.getenv("STT_BEAM_SIZE", "1"))
+
+# Segments more likely silence than this are dropped (matches pipecat's default)
+NO_SPEECH_THRESHOLD = 0.4
+
+SAMPLE_RATE = 16000
+
+# Whisper's fixed input window
+_WINDOW_SAMPLES = 30 * SAMPLE_RATE
+_WINDOW_FRAMES = 3000
+_MAX_DECODE_TOKENS = 224
+# Longest prompt the decoder context leaves room for
+_MAX_PROMPT_TOKENS = 223
+
+_shared_model = None
+_shared_model_lock = threading.Lock()
+
+
+def shared_whisper_model():
+    """Load the faster-whisper model once per process."""
+    global _shared_model
+    with _shared_model_lock:
+        if _shared_model is None:
+            from faster_whisper import WhisperModel
+
+            start = time.perf_counter()
+            _shared_model = WhisperModel(
+                STT_FASTER_WHISPER_MODEL,
+                device=STT_DEVICE,
+                compute_type=STT_COMPUTE_TYPE,
+                cpu_threads=STT_CPU_THREADS,
+            )
+            logger.info(
+                f"Loaded faster-whisper {STT_FASTER_WHISPER_MODEL} ({STT_COMPUTE_TYPE}) "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+        return _shared_model
+
+
+class TranscriptionBatcher:
+    """Collects concurrent transcription requests and decodes them in batches."""
+
+    def __init__(self, max_batch: int = STT_BATCH_SIZE, window_secs: float = STT_BATCH_MS / 1000):
+        self.max_batch = max_batch
+        self.window_secs = window_secs
+        # (audio, language, prompt, future)
+        self._pending: List[Tuple[np.ndarray, Optional[str], Optional[str], asyncio.Future]] = []
+        self._worker: Optional[asyncio.Task] = None
+        self.requests = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.fallbacks = 0
+        self.total_decode_secs = 0.0
+
+    async def transcribe(
+        self, audio: np.ndarray, language: Optional[str] = "en", prompt: Optional[str] = None
+    ) -> str:
+        """
+        Transcribe one utterance, batched with any others pending.
+
+        Args:
+            audio: Mono float32 samples at 16 kHz
+            language: Whisper language code
+            prompt: Words to bias the decoder towards (names, room types)
+
+        Returns:
+            The transcript ("" when the audio holds no speech)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((audio, language, prompt, future))
+        self.requests += 1
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": self.batched_requests / self.batches if self.batches else 0.0,
+            "fallbacks": self.fallbacks,
+            "avg_decode_ms": self.total_decode_secs / self.batches * 1000 if self.batches else 0.0,
+            "waiting": len(self._pending),
+        }
+
+    async def _run(self) -> None:
+        if self.window_secs > 0 and len(self._pending) < self.max_batch:
+            await asyncio.sleep(self.window_secs)
+
+        # Requests arriving during a decode are picked up by the next iteration
+        while self._pending:
+            batch, language, prompt = self._next_batch()
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                texts = await asyncio.to_thread(self._decode, [audio for audio, _ in batch], language, prompt)
+            except Exception as e:
+                logger.error(f"faster-whisper transcription failed: {e}")
+                texts = e
+            self.batches += 1
+            self.batched_requests += len(batch)
+            self.total_decode_secs += time.perf_counter() - start
+
+            for index, (_, future) in enumerate(batch):
+                if future.done():
+                    continue  # Caller gave up (e.g. a superseded interim transcription)
+                if isinstance(texts, Exception):
+                    future.set_exception(texts)
+                else:
+                    future.set_result(texts[index])
+
+    def _next_batch(self) -> Tuple[List[Tuple[np.ndarray, asyncio.Future]], Optional[str], Optional[str]]:
+        # Oldest request's language and prompt; later requests that differ wait their turn
+        _, language, prompt, _ = self._pending[0]
+        batch, remaining = [], []
+        for request in self._pending:
+            audio, request_language, request_prompt, future = request
+            if len(batch) < self.max_batch and (request_language, request_prompt) == (language, prompt):
+                if not future.done():
+                    batch.append((audio, future))
+            else:
+                remaining.append(request)
+        self._pending[:] = remaining
+        return batch, language, prompt
+
+    def _decode(self, audios: List[np.ndarray], language: Optional[str], prompt: Optional[str]) -> List[str]:
+        model = shared_whisper_model()
+        if len(audios) > 1 and all(len(audio) <= _WINDOW_SAMPLES for audio in audios):
+            try:
+                return _generate_batch(model, audios, language, prompt)
+            except Exception as e:
+                self.fallbacks += 1
+                logger.warning(f"Batched decode failed, decoding one by one: {e}")
+        return [_transcribe_one(model, audio, language, prompt) for audio in audios]
+
+
+def _transcribe_one(model, audio: np.ndarray, language: Optional[str], prompt: Optional[str]) -> str:
+    segments, _ = model.transcribe(audio, language=language, beam_size=STT_BEAM_SIZE, hotwords=prompt)
+    return " ".join(
+        segment.text.strip() for segment in segments if segment.no_speech_prob < NO_SPEECH_THRESHOLD
+    ).strip()
+
+
+def _generate_batch(model, audios: List[np.ndarray], language: Optional[str], prompt: Optional[str]) -> List[str]:
+    """Decode several utterances of up to 30 seconds in one CTranslate2 call."""
+    from faster_whisper.tokenizer import Tokenizer
+
+    tokenizer = Tokenizer(
+        model.hf_tokenizer,
+        model.model.is_multilingual,
+        task="transcribe",
+        language=language if model.model.is_multilingual else None,
+    )
+    features = np.stack([
+        model.feature_extractor(np.pad(audio, (0, _WINDOW_SAMPLES - len(audio))))[:, :_WINDOW_FRAMES]
+        for audio in audios
+    ])
+    encoder_output = model.encode(features)
+    # Same layout transcribe() uses for hotwords: previous-context tokens before the SOT sequence
+    tokens = []
+    if prompt:
+        tokens = [tokenizer.sot_prev] + tokenizer.encode(" " + prompt.strip())[-_MAX_PROMPT_TOKENS:]
+    tokens += list(tokenizer.sot_sequence) + [tokenizer.no_timestamps]
+    results = model.model.generate(
+        encoder_output,
+        [tokens] * len(audios),
+        beam_size=STT_BEAM_SIZE,
+        max_length=len(tokens) + _MAX_DECODE_TOKENS,
+        return_no_speech_prob=True,
+        suppress_blank=True,
+        suppress_tokens=[-1],
+    )
+    return [
+        tokenizer.decode(result.sequences_ids[0]).strip() if result.no_speech_prob < NO_SPEECH_THRESHOLD else ""
+        for result in results
+    ]
+
+
+# Process-wide batcher in front of the shared model
+STT_BATCHER = TranscriptionBatcher()
@@ -7,145 +7,229 @@ to minimize frontend logic and ensure consistent behavior.
 """
 
 import json
+import os
+import re
+import time
 from datetime import date, datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Awaitable, Callable, Optional, List
 from loguru import logger
 
 from date_utils import parse_relative_date, resolve_date_pair
+from availability_cache import AvailabilityCache
+from availability_index import AvailabilityIndex
+from mock_data import MOCK_RESERVATIONS, MOCK_ROOMS
+from reservation_index import ReservationIndex
+from storage import STORAGE, checkin_writes, modification_writes, new_id, special_request_writes
+from write_behind import WRITE_BEHIND
+
+
+# Longest stay a modification may produce; longer ones are assumed to be misheard dates
+MAX_STAY_NIGHTS = int(os.getenv("MAX_STAY_NIGHTS", "30"))
+
+# "+2" / "-1": days added to the reservation's current date
+_DAY_OFFSET_RE = re.compile(r"^\s*[+-]\s*\d+\s*$")
+
+# Lookup indexes, built once at startup and updated incrementally
+RESERVATION_INDEX = ReservationIndex(MOCK_RESERVATIONS)
+AVAILABILITY_INDEX = AvailabilityIndex(MOCK_ROOMS, MOCK_RESERVATIONS)
+
+# Repeated availability searches across desks, invalidated by booking changes
+AVAILABILITY_CACHE = AvailabilityCache(AVAILABILITY_INDEX)
+
+_ROOMS_BY_ID = {room["id"]: room for room in MOCK_ROOMS}
+
+# Reservation columns the workflows change, loaded back from storage at startup
+_SAVED_FIELDS = ("room_id", "check_in_date", "check_out_date", "status")
+
+# (arguments, dry_run=False, session=None) -> result; a dry run builds the result without saving anything
+FunctionHandler = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+class WorkflowSession:
+    """Records one desk keeps updating until its workflow is reset."""
+
+    __slots__ = (
+        "special_request_id", "special_request_type", "special_request_room", "_request_base", "_requests_created"
+    )
+
+    def __init__(self):
+        # Special request the latest calls refine, with its type and room
+        self.special_request_id: Optional[str] = None
+        self.special_request_type = ""
+        self.special_request_room = ""
+        # The desk's special request IDs are this base plus a sequence number,
+        # so a dry run can show the ID the real call will create
+        self._request_base = new_id("req")
+        self._requests_created = 0
+
+    def refines_special_request(self, request_type: str, room_number: str) -> bool:
+        """Whether a call adds to the current special request rather than making another."""
+        if not self.special_request_id or request_type != self.special_request_type:
+            return False
+        # A room given for the first time fills in the request; a different room is another request
+        return not room_number or not self.special_request_room or room_number == self.special_request_room
+
+    def next_special_request_id(self) -> str:
+        """ID of the next special request created; unchanged until it is."""
+        return f"{self._request_base}-{self._requests_created + 1}"
+
+    def create_special_request(self, request_type: str, room_number: str) -> str:
+        """Start the next special request and make it the one later calls refine."""
+        self._requests_created += 1
+        self.special_request_id = f"{self._request_base}-{self._requests_created}"
+        self.special_request_type = request_type
+        self.special_request_room = room_number
+        return self.special_request_id
+
+    def record_result(self, result: Dict[str, Any]) -> None:
+        """Note a dispatched call; moving to another workflow completes the special request."""
+        workflow = result.get("workflow")
+        if workflow and workflow != "special_request":
+            self.reset()
+
+    def reset(self) -> None:
+        self.special_request_id = None
+        self.special_request_type = ""
+        self.special_request_room = ""
+
+
+class RegisteredFunction:
+    """A function exposed to the LLM: its JSON schema, handler and call timing."""
+
+    __slots__ = ("name", "definition", "handler", "calls", "errors", "total_secs", "max_secs")
+
+    def __init__(self, definition: Dict[str, Any], handler: FunctionHandler):
+        self.name = definition["name"]
+        self.definition = definition
+        self.handler = handler
+        self.calls = 0
+        self.errors = 0
+        self.total_secs = 0.0
+        self.max_secs = 0.0
+
+    def record(self, elapsed: float, failed: bool = False) -> None:
+        self.calls += 1
+        self.errors += failed
+        self.total_secs += elapsed
+        self.max_secs = max(self.max_secs, elapsed)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": self.total_secs / self.calls * 1000 if self.calls else 0.0,
+            "max_ms": self.max_secs * 1000,
+        }
 
 
-# Function definitions for LLM
-FUNCTION_DEFINITIONS = [
-    {
-        "name": "update_checkin_form",
-        "description": "Update check-in form with guest information extracted from conversation",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "guest_name": {
-                    "type": "string",
-                    "description": "Full name of the guest"
-                },
-                "reservation_number": {
-                    "type": "string", 
-                    "description": "Reservation number or guest name for lookup"
-                },
-                "id_type": {
-                    "type": "string",
-                    "description": "Type of identification (driver_license, passport, etc.)",
-                    "enum": ["driver_license", "passport", "state_id", "other"]
-                },
-                "room_number": {
-                    "type": "string",
-                    "description": "Assigned room number"
-                }
-            },
-            "required": ["guest_name"]
-        }
-    },
-    {
-        "name": "search_availability",
-        "description": "Search for available rooms based on guest requirements",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "check_in_date": {
-                    "type": "string",
-                    "description": "Check-in date - can be relative like 'tomorrow', '+1' (days from today), 'next Friday', or YYYY-MM-DD format. Extract guest's exact wording."
-                },
-                "check_out_date": {
-                    "type": "string",
-                    "description": "Check-out date - can be relative like 'next Sunday', '+3', or YYYY-MM-DD format. Extract guest's exact wording. If not specified, will default to check-in + 1 day."
-                },
-                "room_type": {
-                    "type": "string",
-                    "description": "Preferred room type",
-                    "enum": ["standard", "deluxe", "suite", "any"]
-                }
-            },
-            "required": []
-        }
-    },
-    {
-        "name": "modify_reservation",
-        "description": "Modify an existing reservation",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "reservation_id": {
-                    "type": "string",
-                    "description": "Reservation ID or guest name for lookup"
-                },
-                "new_check_in_date": {
-                    "type": "string",
-                    "description": "New check-in date - can be relative like 'tomorrow', '+2' (days from today), 'next Monday', or YYYY-MM-DD format. Extract guest's exact wording."
-                },
-                "new_check_out_date": {
-                    "type": "string",
-                    "description": "New check-out date - can be relative like '+2' (extend by 2 days), 'next Friday', or YYYY-MM-DD format. Extract guest's exact wording."
-                },
-                "new_room_type": {
-                    "type": "string",
-                    "description": "New room type preference",
-                    "enum": ["standard", "deluxe", "suite"]
-                },
-                "additional_services": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "description": "Additional services requested"
-                }
-            },
-            "required": ["reservation_id"]
-        }
-    },
-    {
-        "name": "create_special_request",
-        "description": "Create a special request for a guest",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "room_number": {
-                    "type": "string",
-                    "description": "Room number for the request"
-                },
-                "request_type": {
-                    "type": "string",
-                    "description": "Type of special request",
-                    "enum": ["late_checkout", "extra_towels", "room_service", "maintenance", "other"]
-                },
-                "details": {
-                    "type": "string",
-                    "description": "Detailed description of the request"
-                }
-            },
-            "required": ["request_type", "details"]
-        }
-    }
-]
+# Function name -> registered function, filled in by @register_function below
+FUNCTION_REGISTRY: Dict[str, RegisteredFunction] = {}
+
+
+def register_function(definition: Dict[str, Any]) -> Callable[[FunctionHandler], FunctionHandler]:
+    """Decorator registering a handler together with the function definition the LLM sees."""
+
+    def decorator(handler: FunctionHandler) -> FunctionHandler:
+        FUNCTION_REGISTRY[definition["name"]] = RegisteredFunction(definition, handler)
+        return handler
+
+    return decorator
+
+
+async def load_saved_reservations() -> int:
+    """
+    Apply the reservation changes saved by earlier processes to the lookup indexes.
 
+    Run once at startup, after the write-behind journal is replayed, so the
+    handlers know about earlier check-ins and modifications without reading
+    the database while populating a form.
 
-async def execute_function_call(function_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-    """Execute a function call and return the result."""
+    Returns:
+        The number of reservations updated
+    """
+    updated = 0
+    for row in await STORAGE.fetch("list_reservations"):
+        reservation = RESERVATION_INDEX.get(row["id"])
+        if reservation is None or all(row[field] == reservation.get(field) for field in _SAVED_FIELDS):
+            continue
+        saved = {**reservation, **{field: row[field] for field in _SAVED_FIELDS}}
+        saved["room"] = _ROOMS_BY_ID.get(saved["room_id"], reservation.get("room"))
+        RESERVATION_INDEX.update(saved)
+        AVAILABILITY_INDEX.update_booking(saved)
+        updated += 1
+    if updated:
+        logger.info(f"Loaded {updated} saved reservation changes from storage")
+    return updated
+
+
+def function_call_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-function call counts and handler latency."""
+    return {name: entry.stats() for name, entry in FUNCTION_REGISTRY.items()}
+
+
+async def execute_function_call(
+    function_name: str,
+    arguments: Dict[str, Any],
+    dry_run: bool = False,
+    session: Optional[WorkflowSession] = None,
+) -> Dict[str, Any]:
+    """
+    Execute a function call and return the result.
+
+    Args:
+        function_name: Registered function to run
+        arguments: Arguments from the LLM or the fast path
+        dry_run: Build the result without persisting or changing bookings
+            (speculative extraction from interim transcripts)
+        session: The desk's workflow state, for records updated across calls
+    """
+    entry = FUNCTION_REGISTRY.get(function_name)
+    if entry is None:
+        return {"error": f"Unknown function: {function_name}"}
+
+    logger.info(f"Executing function {function_name} with args: {arguments}")
+    start = time.perf_counter()
     try:
-        logger.info(f"Executing function {function_name} with args: {arguments}")
-        
-        if function_name == "update_checkin_form":
-            return await handle_checkin_form(arguments)
-        elif function_name == "search_availability":
-            return await handle_availability_search(arguments)
-        elif function_name == "modify_reservation":
-            return await handle_reservation_modification(arguments)
-        elif function_name == "create_special_request":
-            return await handle_special_request(arguments)
-        else:
-            return {"error": f"Unknown function: {function_name}"}
-            
+        result = await entry.handler(arguments, dry_run=dry_run, session=session)
     except Exception as e:
+        entry.record(time.perf_counter() - start, failed=True)
         logger.error(f"Error executing function {function_name}: {e}")
         return {"error": str(e)}
 
+    entry.record(time.perf_counter() - start)
+    return result
 
-async def handle_checkin_form(args: Dict[str, Any]) -> Dict[str, Any]:
+
+@register_function({
+    "name": "update_checkin_form",
+    "description": "Update check-in form with guest information extracted from conversation",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "guest_name": {
+                "type": "string",
+                "description": "Full name of the guest"
+            },
+            "reservation_number": {
+                "type": "string", 
+                "description": "Reservation number or guest name for lookup"
+            },
+            "id_type": {
+                "type": "string",
+                "description": "Type of identification (driver_license, passport, etc.)",
+                "enum": ["driver_license", "passport", "state_id", "other"]
+            },
+            "room_number": {
+                "type": "string",
+                "description": "Assigned room number"
+            }
+        },
+        "required": ["guest_name"]
+    }
+})
+async def handle_checkin_form(
+    args: Dict[str, Any], dry_run: bool = False, session: Optional[WorkflowSession] = None
+) -> Dict[str, Any]:
     """
     Handle check-in form updates with enriched data.
 
@@ -158,21 +242,53 @@ async def handle_checkin_form(args: Dict[str, Any]) -> Dict[str, Any]:
         reservation_number: Optional reservation ID for direct lookup
         id_type: Type of ID provided (driver_license, passport, etc.)
         room_number: Assigned room number
+        dry_run: Report the check-in without saving it
 
     Returns:
         Enriched data including:
         - Form data fields
-        - UI state (searchQuery, filteredReservations, selectedReservation)
-        - Metadata (guest_found, reservation_found)
+        - UI state (filteredReservations, selectedReservation)
+        - Metadata (guest_found, reservation_found, checked_in)
     """
     guest_name = args.get("guest_name", "")
     reservation_number = args.get("reservation_number", "")
     id_type = args.get("id_type", "")
     room_number = args.get("room_number", "")
 
-    # NOTE: Frontend has mock data for reservations
-    # This backend will return search parameters, and frontend will do the actual filtering
-    # For a production system, you would do DB lookups here
+    # Look up reservations in the server-side index (ranked best match first)
+    filtered_reservations = RESERVATION_INDEX.search(guest_name) if guest_name else []
+    # Only an exact reservation number (spoken, or the row the receptionist
+    # selected) identifies the booking; name matches may be misheard guests
+    confirmed_reservation = RESERVATION_INDEX.find_by_number(reservation_number) if reservation_number else None
+    selected_reservation = confirmed_reservation
+
+    if selected_reservation and selected_reservation not in filtered_reservations:
+        filtered_reservations.insert(0, selected_reservation)
+    if not selected_reservation and filtered_reservations:
+        # Pre-select the best match still awaiting arrival
+        selected_reservation = next(
+            (r for r in filtered_reservations if r.get("status") == "confirmed"), filtered_reservations[0]
+        )
+
+    # Save the check-in once the reservation number and the guest's ID are known;
+    # reservations already checked in (or cancelled) are left alone. The index
+    # includes check-ins saved by earlier processes (load_saved_reservations)
+    status = confirmed_reservation.get("status", "") if confirmed_reservation else ""
+    if status == "confirmed" and id_type:
+        if not dry_run:
+            WRITE_BEHIND.enqueue("check-in", checkin_writes(
+                confirmed_reservation["id"],
+                guest_name or confirmed_reservation.get("guest", {}).get("name", ""),
+                id_type,
+                room_number or confirmed_reservation.get("room", {}).get("room_number", ""),
+            ))
+        status = "checked_in"
+        updated = {**confirmed_reservation, "status": status, "updated_at": datetime.now().isoformat()}
+        if not dry_run:
+            RESERVATION_INDEX.update(updated)
+        filtered_reservations[filtered_reservations.index(confirmed_reservation)] = updated
+        selected_reservation = updated
+    checked_in = status == "checked_in"
 
     return {
         "workflow": "checkin",
@@ -182,37 +298,79 @@ async def handle_checkin_form(args: Dict[str, Any]) -> Dict[str, Any]:
             "reservation_number": reservation_number,
             "id_type": id_type,
             "room_number": room_number,
+            "guest_found": bool(filtered_reservations),
+            "reservation_found": selected_reservation is not None,
+            "checked_in": checked_in,
 
-            # UI state fields (maps to checkinUI in store)
+            # UI state fields (maps to checkinUI in store; the search box shows guest_name)
             # Frontend will use these to populate the UI immediately
-            "searchQuery": guest_name,  # Pre-populate search box
+            "filteredReservations": filtered_reservations,
+            "selectedReservation": selected_reservation,
         },
         "status": "completed",
         "timestamp": datetime.now().isoformat()
     }
 
 
-async def handle_availability_search(args: Dict[str, Any]) -> Dict[str, Any]:
+@register_function({
+    "name": "search_availability",
+    "description": "Search for available rooms based on guest requirements",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "check_in_date": {
+                "type": "string",
+                "description": "Check-in date - can be relative like 'tomorrow', '+1' (days from today), 'next Friday', or YYYY-MM-DD format. Extract guest's exact wording."
+            },
+            "check_out_date": {
+                "type": "string",
+                "description": "Check-out date - can be relative like 'next Sunday', '+3', a length of stay like 'three nights', or YYYY-MM-DD format. Extract guest's exact wording. If not specified, will default to check-in + 1 day."
+            },
+            "room_type": {
+                "type": "string",
+                "description": "Preferred room type",
+                "enum": ["standard", "deluxe", "suite", "any"]
+            },
+            "min_price": {
+                "type": "number",
+                "description": "Minimum nightly price, if the guest gave one"
+            },
+            "max_price": {
+                "type": "number",
+                "description": "Maximum nightly price (budget), if the guest gave one"
+            }
+        },
+        "required": []
+    }
+})
+async def handle_availability_search(
+    args: Dict[str, Any], dry_run: bool = False, session: Optional[WorkflowSession] = None
+) -> Dict[str, Any]:
     """
     Handle room availability search with enriched data.
 
-    Returns search parameters and filter state for the frontend to apply
-    against its mock room data.
+    Resolves the dates and looks up the rooms free for the whole stay in the
+    availability index, along with the filter state for the frontend.
 
     Args:
         check_in_date: Check-in date - can be relative or YYYY-MM-DD format
         check_out_date: Check-out date - can be relative or YYYY-MM-DD format
         room_type: Preferred room type (standard/deluxe/suite/any)
+        min_price: Minimum nightly price (optional)
+        max_price: Maximum nightly price (optional)
+        dry_run: Unused; searches have no side effects
 
     Returns:
         Enriched data including:
         - Search parameters (with resolved dates)
-        - Filter state for UI
+        - Available rooms for the date range and room type
         - Validation metadata
     """
     check_in_raw = args.get("check_in_date", "")
     check_out_raw = args.get("check_out_date", "")
     room_type = args.get("room_type", "any")
+    min_price = _price(args.get("min_price"))
+    max_price = _price(args.get("max_price"))
 
     try:
         # Parse relative dates with smart defaulting
@@ -224,8 +382,10 @@ async def handle_availability_search(args: Dict[str, Any]) -> Dict[str, Any]:
         if check_out_date:
             check_out = datetime.strptime(check_out_date, "%Y-%m-%d").date()
 
-        # NOTE: Frontend has mock room data
-        # We return filter parameters, frontend applies them to mock data
+        available_rooms = (
+            AVAILABILITY_CACHE.available_rooms(check_in_date, check_out_date, room_type, min_price, max_price)
+            if check_in_date and check_out_date else []
+        )
 
         return {
             "workflow": "availability",
@@ -234,16 +394,11 @@ async def handle_availability_search(args: Dict[str, Any]) -> Dict[str, Any]:
                 "check_in_date": check_in_date,
                 "check_out_date": check_out_date,
                 "room_type": room_type,
-
-                # UI state fields (maps to availabilityUI.filters in store)
-                # Pre-populate the filter form
-                "filters": {
-                    "check_in_date": check_in_date,
-                    "check_out_date": check_out_date,
-                    "room_type": room_type,
-                    "min_price": "",
-                    "max_price": "",
-                },
+                "min_price": "" if min_price is None else min_price,
+                "max_price": "" if max_price is None else max_price,
+                "available_rooms": available_rooms,
+                "total_available": len(available_rooms),
+                # The frontend builds availabilityUI.filters from the fields above
             },
             "status": "completed",
             "timestamp": datetime.now().isoformat()
@@ -262,7 +417,41 @@ async def handle_availability_search(args: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
-async def handle_reservation_modification(args: Dict[str, Any]) -> Dict[str, Any]:
+@register_function({
+    "name": "modify_reservation",
+    "description": "Modify an existing reservation",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "reservation_id": {
+                "type": "string",
+                "description": "Reservation ID or guest name for lookup"
+            },
+            "new_check_in_date": {
+                "type": "string",
+                "description": "New check-in date - can be relative like 'tomorrow', '+2' (move by 2 days), 'next Monday', or YYYY-MM-DD format. Extract guest's exact wording."
+            },
+            "new_check_out_date": {
+                "type": "string",
+                "description": "New check-out date - can be relative like '+2' (extend by 2 days), 'next Friday', or YYYY-MM-DD format. Extract guest's exact wording."
+            },
+            "new_room_type": {
+                "type": "string",
+                "description": "New room type preference",
+                "enum": ["standard", "deluxe", "suite"]
+            },
+            "additional_services": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Additional services requested"
+            }
+        },
+        "required": ["reservation_id"]
+    }
+})
+async def handle_reservation_modification(
+    args: Dict[str, Any], dry_run: bool = False, session: Optional[WorkflowSession] = None
+) -> Dict[str, Any]:
     """
     Handle reservation modifications with enriched data.
 
@@ -275,12 +464,14 @@ async def handle_reservation_modification(args: Dict[str, Any]) -> Dict[str, Any
         new_check_out_date: New check-out date - can be relative or YYYY-MM-DD (optional)
         new_room_type: New room type preference (optional)
         additional_services: Array of additional services (optional)
+        dry_run: Check the changes without moving or saving the reservation
 
     Returns:
         Enriched data including:
         - Modification parameters (with resolved dates)
         - UI state for search and edit mode
-        - Modification tracking flags
+        - Modification tracking flags (modification_applied when the changes
+          were saved)
     """
     reservation_id = args.get("reservation_id", "")
     new_check_in_raw = args.get("new_check_in_date", "")
@@ -288,12 +479,22 @@ async def handle_reservation_modification(args: Dict[str, Any]) -> Dict[str, Any
     new_room_type = args.get("new_room_type", "")
     additional_services = args.get("additional_services", [])
 
-    # Parse relative dates (no smart pairing for modifications)
-    new_check_in_date = parse_relative_date(new_check_in_raw) if new_check_in_raw else ""
-    new_check_out_date = parse_relative_date(new_check_out_raw) if new_check_out_raw else ""
-
-    # NOTE: Frontend has mock reservation data
-    # We return search parameters, frontend will lookup and populate
+    # Parse relative dates (no smart pairing for modifications); "+N" moves the
+    # reservation's current date rather than counting from today
+    reservation = _find_reservation(reservation_id)
+    new_check_in_date = _modification_date(new_check_in_raw, reservation, "check_in_date")
+    new_check_out_date = _modification_date(new_check_out_raw, reservation, "check_out_date")
+
+    # Apply the changes if a room is free for the resulting stay
+    modification_applied = False
+    if reservation and (new_check_in_date or new_check_out_date or new_room_type or additional_services):
+        updated = _modify(reservation, new_check_in_date, new_check_out_date, new_room_type, dry_run)
+        if updated:
+            if not dry_run:
+                WRITE_BEHIND.enqueue("modification", modification_writes(
+                    updated, new_check_in_date, new_check_out_date, new_room_type, additional_services
+                ))
+            modification_applied = True
 
     return {
         "workflow": "modification",
@@ -306,31 +507,48 @@ async def handle_reservation_modification(args: Dict[str, Any]) -> Dict[str, Any
             "additional_services": additional_services,
 
             # Modification tracking
+            "modification_applied": modification_applied,
             "modifications": {
                 "dates_changed": bool(new_check_in_date or new_check_out_date),
                 "room_type_changed": bool(new_room_type),
                 "services_added": len(additional_services) > 0
             },
 
-            # UI state fields (maps to modificationUI in store)
-            "searchQuery": reservation_id,  # Pre-populate search
+            # UI state fields (maps to modificationUI in store; the frontend
+            # searches by reservation_id and fills editedData from the new dates)
             "editMode": bool(new_check_in_date or new_check_out_date or new_room_type),  # Auto-enter edit mode if changes provided
-
-            # Pre-populate edited data (frontend will merge with found reservation)
-            "editedData": {
-                k: v for k, v in {
-                    "check_in_date": new_check_in_date,
-                    "check_out_date": new_check_out_date,
-                    "room_type": new_room_type,
-                }.items() if v
-            },
         },
         "status": "completed",
         "timestamp": datetime.now().isoformat()
     }
 
 
-async def handle_special_request(args: Dict[str, Any]) -> Dict[str, Any]:
+@register_function({
+    "name": "create_special_request",
+    "description": "Create a special request for a guest",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "room_number": {
+                "type": "string",
+                "description": "Room number for the request"
+            },
+            "request_type": {
+                "type": "string",
+                "description": "Type of special request",
+                "enum": ["late_checkout", "extra_towels", "room_service", "maintenance", "other"]
+            },
+            "details": {
+                "type": "string",
+                "description": "Detailed description of the request"
+            }
+        },
+        "required": ["request_type", "details"]
+    }
+})
+async def handle_special_request(
+    args: Dict[str, Any], dry_run: bool = False, session: Optional[WorkflowSession] = None
+) -> Dict[str, Any]:
     """
     Handle special request creation with enriched data.
 
@@ -340,6 +558,10 @@ async def handle_special_request(args: Dict[str, Any]) -> Dict[str, Any]:
         room_number: Room number for the request (optional)
         request_type: Type of request (late_checkout, extra_towels, etc.)
         details: Detailed description of the request
+        dry_run: Build the request without saving it
+        session: The desk's workflow state; follow-up calls for the same
+            request type and room refine that request instead of creating a
+            new one, until another workflow is called or the desk resets
 
     Returns:
         Enriched data including:
@@ -351,9 +573,21 @@ async def handle_special_request(args: Dict[str, Any]) -> Dict[str, Any]:
     request_type = args.get("request_type", "")
     details = args.get("details", "")
 
-    # Generate a request ID for tracking
-    # In production, this would come from database
-    request_id = f"req-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    # Saved in the background; the form is populated without waiting for storage
+    if session and session.refines_special_request(request_type, room_number):
+        request_id = session.special_request_id
+        if not dry_run:
+            session.special_request_room = session.special_request_room or room_number
+    elif session:
+        # A dry run shows the ID the real call will create, without creating it
+        request_id = (
+            session.next_special_request_id() if dry_run
+            else session.create_special_request(request_type, room_number)
+        )
+    else:
+        request_id = new_id("req")
+    if not dry_run:
+        WRITE_BEHIND.enqueue("special request", special_request_writes(request_id, room_number, request_type, details))
 
     return {
         "workflow": "special_request",
@@ -363,15 +597,103 @@ async def handle_special_request(args: Dict[str, Any]) -> Dict[str, Any]:
             "request_type": request_type,
             "details": details,
             "request_id": request_id,
-            "request_created": True,  # Optimistic - assume success
-
-            # UI state fields (maps to specialRequestUI in store)
-            # Pre-populate the form fields
-            "request_type": request_type,
-            "room_number": room_number,
-            "details": details,
+            "request_created": True,
+            # specialRequestUI is populated from the same fields
         },
         "status": "completed",
         "timestamp": datetime.now().isoformat()
     }
 
+
+def _price(value: Any) -> Optional[float]:
+    """Nightly price filter from the LLM (number or numeric string), None if absent."""
+    if value in (None, ""):
+        return None
+    try:
+        return float(str(value).lstrip("$").replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _find_reservation(reservation_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve an exact reservation number of a booking that can still change.
+
+    Guest names are not resolved: a misheard name could match another guest's
+    booking, so name lookups are left to the client's search.
+    """
+    reservation = RESERVATION_INDEX.find_by_number(reservation_id) if reservation_id else None
+    if reservation and reservation.get("status") in ("confirmed", "checked_in"):
+        return reservation
+    return None
+
+
+def _modification_date(raw: str, reservation: Optional[Dict[str, Any]], field: str) -> str:
+    """Resolve a new reservation date; day offsets ("+2") apply to the reservation's current date."""
+    if not raw:
+        return ""
+    if not _DAY_OFFSET_RE.match(raw):
+        return parse_relative_date(raw)
+    if not reservation:
+        # "+2" means nothing until we know whose stay it extends
+        logger.info(f"Cannot resolve {field} offset {raw!r} without a reservation")
+        return ""
+    return parse_relative_date(raw.replace(" ", ""), today=date.fromisoformat(reservation[field]))
+
+
+def _modify(
+    reservation: Dict[str, Any],
+    new_check_in_date: str,
+    new_check_out_date: str,
+    new_room_type: str,
+    dry_run: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    Apply new dates and room type to the lookup indexes (unless dry_run).
+
+    A new room type moves the reservation to the first room of that type free
+    for the whole (new) stay; otherwise its room must stay free for it.
+
+    Returns:
+        The updated reservation, or None if the dates are invalid or no room is free
+    """
+    check_in = new_check_in_date or reservation["check_in_date"]
+    check_out = new_check_out_date or reservation["check_out_date"]
+    if check_out <= check_in or check_out <= reservation["check_in_date"]:
+        logger.info(f"Rejected new dates for {reservation['id']}: {check_in} to {check_out} ends before the stay")
+        return None
+    nights = (date.fromisoformat(check_out) - date.fromisoformat(check_in)).days
+    if nights > MAX_STAY_NIGHTS:
+        logger.info(f"Rejected new dates for {reservation['id']}: {nights} nights exceeds {MAX_STAY_NIGHTS}")
+        return None
+    if reservation.get("status") == "checked_in" and check_in != reservation["check_in_date"]:
+        logger.info(f"Rejected new check-in date for {reservation['id']}: the guest is already checked in")
+        return None
+
+    room = reservation.get("room") or _ROOMS_BY_ID.get(reservation.get("room_id", ""), {})
+    if new_room_type and new_room_type != room.get("room_type"):
+        free_rooms = AVAILABILITY_INDEX.available_rooms(check_in, check_out, new_room_type)
+        if not free_rooms:
+            logger.info(f"No {new_room_type} room free for {reservation['id']} from {check_in} to {check_out}")
+            return None
+        room = free_rooms[0]
+    elif not AVAILABILITY_INDEX.room_free(reservation.get("room_id", ""), check_in, check_out, reservation["id"]):
+        logger.info(f"Room of {reservation['id']} is not free from {check_in} to {check_out}")
+        return None
+
+    updated = {
+        **reservation,
+        "check_in_date": check_in,
+        "check_out_date": check_out,
+        "room_id": room.get("id", reservation.get("room_id")),
+        "room": room,
+        "updated_at": datetime.now().isoformat(),
+    }
+    if not dry_run:
+        AVAILABILITY_INDEX.update_booking(updated)
+        RESERVATION_INDEX.update(updated)
+    return updated
+
+
+# Function definitions for LLM, in registration order
+FUNCTION_DEFINITIONS = [entry.definition for entry in FUNCTION_REGISTRY.values()]
@@ -0,0 +1,237 @@
+"""
+Per-turn latency instrumentation for the desk pipeline.
+
+LatencyObserver watches frames moving through a session's pipeline and
+timestamps each stage of a turn, from the guest finishing a sentence to the
+processed form data being pushed to the client:
+
+    vad_stop         VAD detected the end of speech
+    user_stop        turn analyzer / aggregator accepted the end of the turn
+    transcription    final STT transcription
+    context          user context handed to the LLM
+    llm_first_token  first LLM output (text or tool calls)
+    function_call    function call started
+    rtvi_push        llm-function-call message pushed to the client
+    function_result  function call result returned to the LLM
+    llm_end          final LLM response finished
+
+Text turns (custom-message) have no VAD marks and start at the transcription.
+Turns handled by the fast path (fast_path.py) end at the rtvi_push.
+Completed turns feed process-wide histograms (p50/p95/p99 per stage) and,
+when LATENCY_TRACE_PATH is set, are appended to that file as JSON lines.
+"""
+
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, TextIO
+
+from loguru import logger
+
+from pipecat.frames.frames import (
+    CancelFrame,
+    EndFrame,
+    FunctionCallInProgressFrame,
+    FunctionCallResultFrame,
+    FunctionCallsStartedFrame,
+    LLMContextFrame,
+    LLMFullResponseEndFrame,
+    LLMTextFrame,
+    OutputTransportMessageUrgentFrame,
+    TranscriptionFrame,
+    UserStoppedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.observers.base_observer import BaseObserver, FramePushed
+
+
+# Append one JSON line per turn to this file (disabled when unset)
+LATENCY_TRACE_PATH = os.getenv("LATENCY_TRACE_PATH", "")
+
+# Samples kept per stage for the histograms
+LATENCY_SAMPLE_SIZE = int(os.getenv("LATENCY_SAMPLE_SIZE", "5000"))
+
+PERCENTILES = (50, 95, 99)
+
+# Stage name -> (from mark, to mark)
+STAGES = {
+    "turn_detection": ("vad_stop", "user_stop"),
+    "stt": ("vad_stop", "transcription"),
+    "context": ("transcription", "context"),
+    "llm_first_token": ("context", "llm_first_token"),
+    "function_call": ("function_call", "function_result"),
+    "rtvi_push": ("function_call", "rtvi_push"),
+    "end_to_form": ("start", "rtvi_push"),
+    "end_to_end": ("start", "llm_end"),
+}
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+class LatencyStats:
+    """Process-wide latency histograms and trace export shared by all sessions."""
+
+    def __init__(self, sample_size: int = LATENCY_SAMPLE_SIZE, trace_path: str = LATENCY_TRACE_PATH):
+        self._samples: Dict[str, Deque[float]] = {stage: deque(maxlen=sample_size) for stage in STAGES}
+        self._trace_path = trace_path
+        self._trace_file: Optional[TextIO] = None
+        self.turns = 0
+
+    def record(self, trace: Dict[str, Any]) -> None:
+        """Add one completed turn trace."""
+        self.turns += 1
+        for stage, duration_ms in trace["stages_ms"].items():
+            self._samples[stage].append(duration_ms)
+        if self._trace_path:
+            self._write(trace)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """p50/p95/p99 (ms) and sample count per stage."""
+        report = {}
+        for stage, samples in self._samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            report[stage] = {f"p{pct}": round(percentile(ordered, pct), 1) for pct in PERCENTILES}
+            report[stage]["count"] = len(ordered)
+        return report
+
+    def log_report(self) -> None:
+        for stage, values in self.report().items():
+            logger.info(
+                f"Latency {stage}: p50={values['p50']}ms p95={values['p95']}ms "
+                f"p99={values['p99']}ms (n={values['count']})"
+            )
+
+    def _write(self, trace: Dict[str, Any]) -> None:
+        try:
+            if self._trace_file is None:
+                self._trace_file = open(self._trace_path, "a", buffering=1)
+            self._trace_file.write(json.dumps(trace) + "\n")
+        except OSError as e:
+            logger.warning(f"Disabling latency trace export to {self._trace_path}: {e}")
+            self._trace_path = ""
+
+
+# Frame types that mark a stage; everything else (audio above all) is ignored
+_TRACKED_FRAMES = (
+    VADUserStoppedSpeakingFrame,
+    UserStoppedSpeakingFrame,
+    TranscriptionFrame,
+    LLMContextFrame,
+    LLMTextFrame,
+    FunctionCallsStartedFrame,
+    FunctionCallInProgressFrame,
+    OutputTransportMessageUrgentFrame,
+    FunctionCallResultFrame,
+    LLMFullResponseEndFrame,
+    EndFrame,
+    CancelFrame,
+)
+
+
+class LatencyObserver(BaseObserver):
+    """Timestamps the stages of each turn in one session's pipeline."""
+
+    def __init__(self, session_id: str = "", stats: Optional["LatencyStats"] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._session_id = session_id
+        self._stats = stats or LATENCY_STATS
+        self._turn_index = 0
+        self._reset_turn()
+
+    def _reset_turn(self) -> None:
+        # Mark name -> pipeline clock time in ns (first occurrence wins)
+        self._marks: Dict[str, int] = {}
+        self._functions: List[str] = []
+        self._calls_expected = 0
+        self._results_seen = 0
+        # Frames are pushed once per processor hop; only the first push counts
+        self._seen_frames = set()
+
+    async def on_push_frame(self, data: FramePushed):
+        frame = data.frame
+        # Checked before the ID is remembered, so untracked frames never grow the set
+        if not isinstance(frame, _TRACKED_FRAMES) or frame.id in self._seen_frames:
+            return
+        self._seen_frames.add(frame.id)
+        timestamp = data.timestamp
+
+        if isinstance(frame, VADUserStoppedSpeakingFrame):
+            self._begin_turn(timestamp)
+            # Speech resumed before anything was transcribed: time from the last stop
+            if "transcription" not in self._marks:
+                self._marks["start"] = self._marks["vad_stop"] = timestamp
+        elif isinstance(frame, UserStoppedSpeakingFrame):
+            self._mark("user_stop", timestamp)
+        elif isinstance(frame, TranscriptionFrame):
+            if "start" not in self._marks:
+                self._begin_turn(timestamp)
+            self._mark("transcription", timestamp)
+        elif isinstance(frame, LLMContextFrame):
+            self._mark("context", timestamp)
+        elif isinstance(frame, (LLMTextFrame, FunctionCallsStartedFrame)):
+            self._mark("llm_first_token", timestamp)
+            if isinstance(frame, FunctionCallsStartedFrame):
+                self._calls_expected += len(frame.function_calls)
+        elif isinstance(frame, FunctionCallInProgressFrame):
+            self._mark("function_call", timestamp)
+            self._functions.append(frame.function_name)
+        elif isinstance(frame, OutputTransportMessageUrgentFrame):
+            if isinstance(frame.message, dict) and frame.message.get("type") == "llm-function-call":
+                self._mark("rtvi_push", timestamp)
+                # Fast-path turns never reach the LLM and end with the push
+                if "context" not in self._marks:
+                    self._finish_turn()
+        elif isinstance(frame, FunctionCallResultFrame):
+            self._results_seen += 1
+            self._mark("function_result", timestamp)
+        elif isinstance(frame, LLMFullResponseEndFrame):
+            # With tool calls the turn ends with the response that follows the results
+            if self._results_seen >= self._calls_expected and "context" in self._marks:
+                self._mark("llm_end", timestamp)
+                self._finish_turn()
+        elif isinstance(frame, (EndFrame, CancelFrame)):
+            self._finish_turn()
+
+    def _begin_turn(self, timestamp: int) -> None:
+        # A new utterance while the previous turn is still in flight closes it as-is
+        if "context" in self._marks:
+            self._finish_turn()
+        if "start" not in self._marks:
+            self._marks["start"] = timestamp
+
+    def _mark(self, name: str, timestamp: int) -> None:
+        if "start" in self._marks:
+            self._marks.setdefault(name, timestamp)
+
+    def _finish_turn(self) -> None:
+        marks = self._marks
+        if "context" in marks or "rtvi_push" in marks:
+            start = marks["start"]
+            stages = {}
+            for stage, (begin, end) in STAGES.items():
+                if begin in marks and end in marks:
+                    stages[stage] = (marks[end] - marks[begin]) / 1e6
+            self._stats.record({
+                "session_id": self._session_id,
+                "turn": self._turn_index,
+                "wall_time": time.time(),
+                "functions": self._functions,
+                "marks_ms": {name: (value - start) / 1e6 for name, value in marks.items() if name != "start"},
+                "stages_ms": stages,
+            })
+            self._turn_index += 1
+        self._reset_turn()
+
+
+# Process-wide latency histograms
+LATENCY_STATS = LatencyStats()
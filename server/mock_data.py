@@ -0,0 +1,136 @@
+"""
+Seed hotel data for the server-side lookup engines.
+
+Mirrors client/src/data/mockData.ts so that results computed on the server
+match what the frontend would have found in its own mock data.
+In production these records would be loaded from the database at startup.
+"""
+
+from typing import Dict, Any, List
+
+
+MOCK_GUESTS: List[Dict[str, Any]] = [
+    {
+        "id": "guest-1",
+        "name": "John Smith",
+        "email": "john.smith@email.com",
+        "phone": "+1-555-0101",
+        "id_type": "passport",
+        "id_number": "P12345678",
+        "created_at": "2024-01-15T10:00:00Z",
+        "updated_at": "2024-01-15T10:00:00Z",
+    },
+    {
+        "id": "guest-2",
+        "name": "Sarah Johnson",
+        "email": "sarah.j@email.com",
+        "phone": "+1-555-0102",
+        "id_type": "drivers_license",
+        "id_number": "DL987654",
+        "created_at": "2024-02-20T14:30:00Z",
+        "updated_at": "2024-02-20T14:30:00Z",
+    },
+    {
+        "id": "guest-3",
+        "name": "Michael Chen",
+        "email": "mchen@email.com",
+        "phone": "+1-555-0103",
+        "id_type": "passport",
+        "id_number": "P87654321",
+        "created_at": "2024-03-10T09:15:00Z",
+        "updated_at": "2024-03-10T09:15:00Z",
+    },
+    {
+        "id": "guest-4",
+        "name": "Emily Rodriguez",
+        "email": "emily.r@email.com",
+        "phone": "+1-555-0104",
+        "id_type": "passport",
+        "id_number": "P45678912",
+        "created_at": "2024-03-12T16:45:00Z",
+        "updated_at": "2024-03-12T16:45:00Z",
+    },
+]
+
+
+def _room(room_id: str, room_number: str, room_type: str, amenities: List[str], price: int) -> Dict[str, Any]:
+    return {
+        "id": room_id,
+        "room_number": room_number,
+        "room_type": room_type,
+        "amenities": amenities,
+        "price_per_night": price,
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+    }
+
+
+MOCK_ROOMS: List[Dict[str, Any]] = [
+    _room("room-1", "101", "standard", ["wifi", "tv", "minibar"], 120),
+    _room("room-2", "102", "standard", ["wifi", "tv", "minibar"], 120),
+    _room("room-3", "201", "deluxe", ["wifi", "tv", "minibar", "balcony", "jacuzzi"], 200),
+    _room("room-4", "202", "deluxe", ["wifi", "tv", "minibar", "balcony", "jacuzzi"], 200),
+    _room("room-5", "301", "suite", ["wifi", "tv", "minibar", "balcony", "jacuzzi", "kitchen", "living_room"], 350),
+    _room("room-6", "302", "suite", ["wifi", "tv", "minibar", "balcony", "jacuzzi", "kitchen", "living_room"], 350),
+    _room("room-7", "103", "standard", ["wifi", "tv"], 100),
+    _room("room-8", "203", "deluxe", ["wifi", "tv", "minibar", "balcony"], 180),
+]
+
+
+MOCK_RESERVATIONS: List[Dict[str, Any]] = [
+    {
+        "id": "res-1",
+        "guest_id": "guest-1",
+        "room_id": "room-2",
+        "check_in_date": "2025-10-22",
+        "check_out_date": "2025-10-25",
+        "status": "checked_in",
+        "special_requests": "Late checkout requested",
+        "total_amount": 360,
+        "created_at": "2025-10-15T10:00:00Z",
+        "updated_at": "2025-10-22T10:00:00Z",
+        "guest": MOCK_GUESTS[0],
+        "room": MOCK_ROOMS[1],
+    },
+    {
+        "id": "res-2",
+        "guest_id": "guest-2",
+        "room_id": "room-4",
+        "check_in_date": "2025-10-20",
+        "check_out_date": "2025-10-27",
+        "status": "checked_in",
+        "special_requests": "Extra pillows",
+        "total_amount": 1400,
+        "created_at": "2025-10-10T14:30:00Z",
+        "updated_at": "2025-10-20T15:00:00Z",
+        "guest": MOCK_GUESTS[1],
+        "room": MOCK_ROOMS[3],
+    },
+    {
+        "id": "res-3",
+        "guest_id": "guest-3",
+        "room_id": "room-1",
+        "check_in_date": "2025-10-25",
+        "check_out_date": "2025-10-28",
+        "status": "confirmed",
+        "total_amount": 360,
+        "created_at": "2025-10-18T09:15:00Z",
+        "updated_at": "2025-10-18T09:15:00Z",
+        "guest": MOCK_GUESTS[2],
+        "room": MOCK_ROOMS[0],
+    },
+    {
+        "id": "res-4",
+        "guest_id": "guest-4",
+        "room_id": "room-3",
+        "check_in_date": "2025-10-23",
+        "check_out_date": "2025-10-26",
+        "status": "confirmed",
+        "special_requests": "Quiet room preferred",
+        "total_amount": 600,
+        "created_at": "2025-10-16T16:45:00Z",
+        "updated_at": "2025-10-16T16:45:00Z",
+        "guest": MOCK_GUESTS[3],
+        "room": MOCK_ROOMS[2],
+    },
+]
@@ -0,0 +1,160 @@
+"""
+Prompt prefix reuse for the Ollama LLM.
+
+Every request starts with the same system instruction and tool schemas, and
+Ollama's runner reuses the KV cache for a byte-identical prompt prefix as long
+as the model stays loaded. This module keeps both conditions true:
+
+- Pinning: the model is loaded with keep_alive=OLLAMA_KEEP_ALIVE (-1 keeps it
+  resident) through the native API. Requests on the OpenAI-compatible endpoint
+  reset keep_alive to the server default, so the pin is refreshed every
+  OLLAMA_KEEP_ALIVE_REFRESH_SECS while the process is serving.
+- Priming: the prefix is evaluated once at warm-up with exactly the messages
+  and tools the pipeline sends (built through pipecat's OpenAI adapter).
+- Verification: the priming request is repeated and Ollama's
+  prompt_eval_count / prompt_eval_duration for the cold and warm runs are
+  compared, so a prompt change that breaks reuse shows up in the logs.
+
+Set LLM_PREFIX_CACHE=false to only warm the model without pinning.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+from loguru import logger
+
+from pipecat.adapters.schemas.tools_schema import ToolsSchema
+from pipecat.adapters.services.open_ai_adapter import OpenAILLMAdapter
+from pipecat.processors.aggregators.llm_context import LLMContext
+
+from services import OLLAMA_BASE_URL, OLLAMA_MODEL
+
+
+LLM_PREFIX_CACHE = os.getenv("LLM_PREFIX_CACHE", "true").lower() != "false"
+
+# Ollama keep_alive for the pinned model ("-1" keeps it loaded indefinitely)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "-1")
+
+# Must stay below the Ollama server's default keep_alive (5 minutes)
+OLLAMA_KEEP_ALIVE_REFRESH_SECS = float(os.getenv("OLLAMA_KEEP_ALIVE_REFRESH_SECS", "120"))
+
+# Canned utterance appended to the prefix when priming
+PROBE_UTTERANCE = "Hi, I have a reservation under John Smith"
+
+
+def ollama_api_url(base_url: str = OLLAMA_BASE_URL) -> str:
+    """Native Ollama API root for an OpenAI-compatible base URL."""
+    base_url = base_url.rstrip("/")
+    if base_url.endswith("/v1"):
+        base_url = base_url[:-3]
+    return f"{base_url}/api"
+
+
+def prefix_request(system_instruction: str, tools: ToolsSchema) -> Dict[str, Any]:
+    """Messages and tools exactly as the pipeline's LLM service serializes them."""
+    context = LLMContext([{"role": "system", "content": system_instruction}], tools)
+    params = OpenAILLMAdapter().get_llm_invocation_params(context)
+    return {"messages": list(params["messages"]), "tools": params["tools"]}
+
+
+def _keep_alive() -> Any:
+    try:
+        return int(OLLAMA_KEEP_ALIVE)
+    except ValueError:
+        return OLLAMA_KEEP_ALIVE  # duration string such as "30m"
+
+
+class PrefixCache:
+    """Keeps the Ollama model resident and its prompt prefix cached."""
+
+    def __init__(self, model: str = OLLAMA_MODEL, base_url: str = OLLAMA_BASE_URL):
+        self.model = model
+        self.api_url = ollama_api_url(base_url)
+        self.cold: Optional[Dict[str, float]] = None
+        self.warm: Optional[Dict[str, float]] = None
+        self.pins = 0
+        self.pin_errors = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def prime(self, system_instruction: str, tools: ToolsSchema) -> Dict[str, Any]:
+        """Load the model, evaluate the prompt prefix and (when enabled) verify reuse."""
+        request = prefix_request(system_instruction, tools)
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            if LLM_PREFIX_CACHE:
+                await self._pin(client)
+            self.cold = await self._probe(client, request)
+            if LLM_PREFIX_CACHE:
+                self.warm = await self._probe(client, request)
+
+        stats = self.stats()
+        if self.warm:
+            logger.info(
+                f"Prompt prefix: {self.cold['prompt_eval_count']} tokens in "
+                f"{self.cold['prompt_eval_ms']:.0f}ms cold, {self.warm['prompt_eval_count']} tokens in "
+                f"{self.warm['prompt_eval_ms']:.0f}ms reused ({stats['reused_fraction']:.0%} cached)"
+            )
+        return stats
+
+    def keep_pinned(self) -> None:
+        """Start refreshing the keep-alive pin on the running event loop (once per process)."""
+        if not LLM_PREFIX_CACHE or (self._refresh_task and not self._refresh_task.done()):
+            return
+        self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    def stats(self) -> Dict[str, Any]:
+        reused = 0.0
+        if self.cold and self.warm and self.cold["prompt_eval_ms"]:
+            reused = max(0.0, 1 - self.warm["prompt_eval_ms"] / self.cold["prompt_eval_ms"])
+        return {
+            "enabled": LLM_PREFIX_CACHE,
+            "cold": self.cold,
+            "warm": self.warm,
+            "reused_fraction": reused,
+            "pins": self.pins,
+            "pin_errors": self.pin_errors,
+        }
+
+    async def _refresh_loop(self) -> None:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            while True:
+                await asyncio.sleep(OLLAMA_KEEP_ALIVE_REFRESH_SECS)
+                try:
+                    await self._pin(client)
+                except Exception as e:
+                    self.pin_errors += 1
+                    logger.warning(f"Failed to refresh Ollama keep-alive: {e}")
+
+    async def _pin(self, client: httpx.AsyncClient) -> None:
+        # A generate request without a prompt only loads the model and sets keep_alive
+        response = await client.post(
+            f"{self.api_url}/generate",
+            json={"model": self.model, "keep_alive": _keep_alive()},
+        )
+        response.raise_for_status()
+        self.pins += 1
+
+    async def _probe(self, client: httpx.AsyncClient, request: Dict[str, Any]) -> Dict[str, float]:
+        response = await client.post(
+            f"{self.api_url}/chat",
+            json={
+                "model": self.model,
+                "messages": request["messages"] + [{"role": "user", "content": PROBE_UTTERANCE}],
+                "tools": request["tools"],
+                "stream": False,
+                "options": {"num_predict": 1},
+                **({"keep_alive": _keep_alive()} if LLM_PREFIX_CACHE else {}),
+            },
+        )
+        response.raise_for_status()
+        body = response.json()
+        return {
+            "prompt_eval_count": body.get("prompt_eval_count", 0),
+            "prompt_eval_ms": body.get("prompt_eval_duration", 0) / 1e6,
+            "total_ms": body.get("total_duration", 0) / 1e6,
+        }
+
+
+# Process-wide prefix cache for the shared Ollama model
+PREFIX_CACHE = PrefixCache()
@@ -0,0 +1,266 @@
+"""
+In-memory reservation lookup index for the check-in workflow.
+
+Guest names arrive from Whisper transcripts, so they are frequently misheard
+("Jon Smyth" for "John Smith"). Lookups therefore go through several hash-based
+indexes, from most to least precise:
+
+- Reservation number / room number exact match
+- Normalized name tokens
+- Phonetic (Soundex) keys of name tokens
+- Character trigrams of name tokens (fallback for partial or garbled names)
+
+Every lookup only touches the posting lists of the query's keys, so the cost
+depends on the query rather than on the number of reservations indexed.
+The index is built once at startup and updated incrementally with
+add/update/remove as reservations change.
+"""
+
+import heapq
+import re
+import unicodedata
+from typing import Dict, Any, Optional, List, Set, Tuple
+
+
+# Posting lists longer than this are too unselective to be worth scanning
+# (e.g. the trigram " jo" in a large property); they are skipped.
+MAX_TRIGRAM_POSTINGS = 2000
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+# Score weights used for ranking candidates
+_EXACT_TOKEN_SCORE = 10.0
+_PHONETIC_SCORE = 6.0
+_TRIGRAM_SCORE = 4.0
+_NUMBER_SCORE = 100.0
+_ROOM_SCORE = 50.0
+
+_STATUS_RANK = {"checked_in": 0, "confirmed": 1, "checked_out": 2, "cancelled": 3}
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and punctuation, and collapse whitespace."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _NON_ALNUM_RE.sub(" ", text.lower())
+    return " ".join(text.split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized tokens."""
+    return normalize_text(text).split()
+
+
+def soundex(token: str) -> str:
+    """Return the Soundex code of a token (e.g. 'smith' and 'smyth' -> 'S530')."""
+    letters = [ch for ch in token if ch.isalpha()]
+    if not letters:
+        return ""
+
+    first = letters[0]
+    code = first.upper()
+    previous = _SOUNDEX_CODES.get(first, "")
+    for ch in letters[1:]:
+        digit = _SOUNDEX_CODES.get(ch, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # 'h' and 'w' do not separate letters with the same code
+        if ch not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def trigrams(token: str) -> Set[str]:
+    """Return the padded character trigrams of a token."""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ReservationIndex:
+    """Incrementally maintained multi-key index over reservation records.
+
+    Reservation records use the same shape as the frontend's Reservation type,
+    including the nested ``guest`` and ``room`` objects.
+    """
+
+    def __init__(self, reservations: Optional[List[Dict[str, Any]]] = None):
+        self._reservations: Dict[str, Dict[str, Any]] = {}
+        self._by_number: Dict[str, str] = {}
+        self._by_room: Dict[str, Set[str]] = {}
+        self._by_token: Dict[str, Set[str]] = {}
+        self._by_phonetic: Dict[str, Set[str]] = {}
+        self._by_trigram: Dict[str, Set[str]] = {}
+        # Keys each reservation was indexed under, for incremental removal
+        self._keys: Dict[str, Tuple[str, str, List[str], Set[str], Set[str]]] = {}
+
+        for reservation in reservations or []:
+            self.add(reservation)
+
+    def __len__(self) -> int:
+        return len(self._reservations)
+
+    def get(self, reservation_id: str) -> Optional[Dict[str, Any]]:
+        """Return a reservation by its ID."""
+        return self._reservations.get(reservation_id)
+
+    def reservations(self) -> List[Dict[str, Any]]:
+        """Return every indexed reservation."""
+        return list(self._reservations.values())
+
+    def add(self, reservation: Dict[str, Any]) -> None:
+        """Index a reservation, replacing any previous version with the same ID."""
+        reservation_id = reservation["id"]
+        if reservation_id in self._reservations:
+            self.remove(reservation_id)
+
+        guest_name = (reservation.get("guest") or {}).get("name", "")
+        room_number = (reservation.get("room") or {}).get("room_number", "")
+        tokens = tokenize(guest_name)
+        phonetic_keys = {soundex(t) for t in tokens} - {""}
+        trigram_keys = {g for t in tokens for g in trigrams(t)}
+        number_key = normalize_text(reservation_id)
+
+        self._reservations[reservation_id] = reservation
+        self._by_number[number_key] = reservation_id
+        if room_number:
+            self._by_room.setdefault(room_number, set()).add(reservation_id)
+        for token in tokens:
+            self._by_token.setdefault(token, set()).add(reservation_id)
+        for key in phonetic_keys:
+            self._by_phonetic.setdefault(key, set()).add(reservation_id)
+        for key in trigram_keys:
+            self._by_trigram.setdefault(key, set()).add(reservation_id)
+
+        self._keys[reservation_id] = (number_key, room_number, tokens, phonetic_keys, trigram_keys)
+
+    def update(self, reservation: Dict[str, Any]) -> None:
+        """Re-index a reservation after it changed."""
+        self.add(reservation)
+
+    def remove(self, reservation_id: str) -> None:
+        """Remove a reservation from all indexes."""
+        if reservation_id not in self._reservations:
+            return
+
+        number_key, room_number, tokens, phonetic_keys, trigram_keys = self._keys.pop(reservation_id)
+        del self._reservations[reservation_id]
+        self._by_number.pop(number_key, None)
+        if room_number:
+            self._discard(self._by_room, room_number, reservation_id)
+        for token in tokens:
+            self._discard(self._by_token, token, reservation_id)
+        for key in phonetic_keys:
+            self._discard(self._by_phonetic, key, reservation_id)
+        for key in trigram_keys:
+            self._discard(self._by_trigram, key, reservation_id)
+
+    def find_by_number(self, reservation_number: str) -> Optional[Dict[str, Any]]:
+        """Exact lookup by reservation number."""
+        reservation_id = self._by_number.get(normalize_text(reservation_number))
+        return self._reservations.get(reservation_id) if reservation_id else None
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Return reservations matching a guest name, reservation number or room number.
+
+        Args:
+            query: Free-form query, typically the guest name from the transcript
+            limit: Maximum number of results
+
+        Returns:
+            Reservations ranked by match quality (best first)
+        """
+        normalized = normalize_text(query)
+        if not normalized:
+            return []
+
+        scores: Dict[str, float] = {}
+
+        reservation_id = self._by_number.get(normalized)
+        if reservation_id:
+            scores[reservation_id] = _NUMBER_SCORE
+        for reservation_id in self._by_room.get(normalized, ()):
+            scores[reservation_id] = scores.get(reservation_id, 0.0) + _ROOM_SCORE
+
+        # Posting set per query token: exact token first, then phonetic key
+        token_matches: List[Tuple[float, Set[str]]] = []
+        unmatched = []
+        for token in normalized.split():
+            exact = self._by_token.get(token)
+            if exact:
+                token_matches.append((_EXACT_TOKEN_SCORE, exact))
+                continue
+
+            phonetic = self._by_phonetic.get(soundex(token))
+            if phonetic:
+                token_matches.append((_PHONETIC_SCORE, phonetic))
+                continue
+
+            unmatched.append(token)
+
+        # Reservations matching every token only require walking the smallest set,
+        # which keeps full-name lookups cheap even when the first name is common
+        matched_all: Set[str] = set()
+        if len(token_matches) > 1:
+            ordered = sorted(token_matches, key=lambda match: len(match[1]))
+            matched_all = ordered[0][1].intersection(*(postings for _, postings in ordered[1:]))
+
+        if matched_all:
+            total = sum(weight for weight, _ in token_matches)
+            for reservation_id in matched_all:
+                scores[reservation_id] = scores.get(reservation_id, 0.0) + total
+        else:
+            for weight, postings in token_matches:
+                for reservation_id in postings:
+                    scores[reservation_id] = scores.get(reservation_id, 0.0) + weight
+
+        # Trigram fallback only for tokens nothing else could explain
+        for token in unmatched:
+            query_grams = trigrams(token)
+            overlap: Dict[str, int] = {}
+            for gram in query_grams:
+                postings = self._by_trigram.get(gram)
+                if not postings or len(postings) > MAX_TRIGRAM_POSTINGS:
+                    continue
+                for reservation_id in postings:
+                    overlap[reservation_id] = overlap.get(reservation_id, 0) + 1
+            for reservation_id, count in overlap.items():
+                similarity = count / len(query_grams)
+                if similarity >= 0.5:
+                    scores[reservation_id] = scores.get(reservation_id, 0.0) + _TRIGRAM_SCORE * similarity
+
+        if not scores:
+            return []
+
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: self._rank_key(item[0], item[1]))
+        return [self._reservations[reservation_id] for reservation_id, _ in ranked]
+
+    def _rank_key(self, reservation_id: str, score: float) -> Tuple[float, int, str]:
+        reservation = self._reservations[reservation_id]
+        return (
+            -score,
+            _STATUS_RANK.get(reservation.get("status", ""), len(_STATUS_RANK)),
+            reservation.get("check_in_date", ""),
+        )
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, reservation_id: str) -> None:
+        postings = index.get(key)
+        if postings is None:
+            return
+        postings.discard(reservation_id)
+        if not postings:
+            del index[key]
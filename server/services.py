@@ -0,0 +1,312 @@
+"""
+Speech and language services shared by every desk session in the process.
+
+Each desk session gets its own pipeline processors, but they all sit on top
+of one set of process-wide resources:
+
+- STT (STT_BACKEND): on Apple Silicon, mlx_whisper caches the loaded model
+  per process, so every session's WhisperSTTServiceMLX uses the same
+  weights. Inference on that model is serialized through a shared FIFO slot
+  (STT_CONCURRENCY) so concurrent sessions queue instead of contending for
+  the GPU. Elsewhere the int8 faster-whisper backend shares one CPU model
+  and batches concurrent sessions' utterances (see faster_whisper_stt.py).
+  STT_BACKEND=none runs without STT for text-only input.
+- Vocabulary: both STT backends are biased towards the hotel's guest names,
+  room numbers and room types (see vocabulary.py).
+- Interim STT: with SPECULATIVE_EXTRACTION=true the buffered speech is also
+  transcribed when VAD detects a pause, before the turn analyzer ends the
+  turn, and pushed as an InterimTranscriptionFrame for speculative
+  extraction (see fast_path.py).
+- LLM: all sessions share one AsyncOpenAI client per Ollama endpoint with a
+  bounded connection pool (LLM_POOL_SIZE); requests beyond the pool size wait
+  for a free connection. LLM_BACKEND=stub replaces Ollama with the
+  rule-based stub in stub_llm.py for benchmarks and load tests.
+"""
+
+import asyncio
+import os
+import platform
+import time
+from typing import Any, AsyncGenerator, Dict, Optional
+
+import httpx
+import numpy as np
+from loguru import logger
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from pipecat.frames.frames import (
+    ErrorFrame,
+    Frame,
+    InterimTranscriptionFrame,
+    TranscriptionFrame,
+    UserStoppedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.llm_service import LLMService
+from pipecat.services.ollama.llm import OLLamaLLMService
+from pipecat.services.stt_service import SegmentedSTTService
+from pipecat.services.whisper.stt import MLXModel, WhisperSTTService, WhisperSTTServiceMLX
+from pipecat.utils.time import time_now_iso8601
+
+from vocabulary import stt_prompt
+
+
+# Concurrent STT inferences on the shared model
+STT_CONCURRENCY = int(os.getenv("STT_CONCURRENCY", "1"))
+
+# Concurrent connections to Ollama shared by all sessions
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "8"))
+
+# STT engine: auto (mlx on Apple Silicon, else faster-whisper), mlx, faster-whisper or none
+STT_BACKEND = os.getenv("STT_BACKEND", "auto").lower()
+
+STT_MODEL = MLXModel.LARGE_V3_TURBO_Q4
+
+# Transcribe at each VAD pause for speculative extraction
+STT_INTERIM_RESULTS = os.getenv("SPECULATIVE_EXTRACTION", "false").lower() == "true"
+
+# LLM engine: ollama, or stub for offline benchmarks
+LLM_BACKEND = os.getenv("LLM_BACKEND", "ollama").lower()
+
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2:latest")
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1")
+
+
+class _InferenceSlots:
+    """FIFO-fair limit on concurrent inferences, with queueing metrics."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.calls = 0
+        self.total_wait_secs = 0.0
+        self.max_wait_secs = 0.0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        return self._semaphore
+
+    async def __aenter__(self):
+        semaphore = self._get_semaphore()
+        self.waiting += 1
+        start = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        wait = time.perf_counter() - start
+        self.calls += 1
+        self.total_wait_secs += wait
+        self.max_wait_secs = max(self.max_wait_secs, wait)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._get_semaphore().release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "avg_wait_ms": self.total_wait_secs / self.calls * 1000 if self.calls else 0.0,
+            "max_wait_ms": self.max_wait_secs * 1000,
+        }
+
+
+_stt_slots = _InferenceSlots(STT_CONCURRENCY)
+
+_MLX_HALLUCINATION_RATIO = 0.5555555555555556
+
+# Ollama base URL -> shared client
+_llm_clients: Dict[str, AsyncOpenAI] = {}
+
+
+class _InterimTranscriptionMixin:
+    """Adds interim transcriptions at VAD pauses to a segmented Whisper STT service."""
+
+    def __init__(self, *, interim_results: bool = STT_INTERIM_RESULTS, **kwargs):
+        super().__init__(**kwargs)
+        self._interim_results = interim_results
+        self._interim_task: Optional[asyncio.Task] = None
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        if isinstance(frame, UserStoppedSpeakingFrame):
+            # The final transcription supersedes any interim still running
+            await self._cancel_interim()
+
+        await super().process_frame(frame, direction)
+
+        if (
+            self._interim_results
+            and isinstance(frame, VADUserStoppedSpeakingFrame)
+            and self._user_speaking
+            and self._audio_buffer
+        ):
+            await self._cancel_interim()
+            self._interim_task = self.create_task(self._transcribe_interim(bytes(self._audio_buffer)))
+
+    async def _transcribe_interim(self, audio: bytes):
+        async for frame in self.run_stt(audio):
+            if isinstance(frame, TranscriptionFrame):
+                await self.push_frame(
+                    InterimTranscriptionFrame(
+                        text=frame.text,
+                        user_id=frame.user_id,
+                        timestamp=frame.timestamp,
+                        language=frame.language,
+                    )
+                )
+
+    async def _cancel_interim(self):
+        if self._interim_task:
+            await self.cancel_task(self._interim_task)
+            self._interim_task = None
+
+
+class SharedWhisperSTTServiceMLX(_InterimTranscriptionMixin, WhisperSTTServiceMLX):
+    """WhisperSTTServiceMLX that queues for the process-wide shared model."""
+
+    async def run_stt(self, audio: bytes) -> AsyncGenerator[Frame, None]:
+        import mlx_whisper
+
+        await self.start_processing_metrics()
+        await self.start_ttfb_metrics()
+
+        audio_float = np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+        # Decode inside the slot and yield after releasing it, so downstream
+        # processing never holds up other sessions' inference
+        try:
+            async with _stt_slots:
+                result = await asyncio.to_thread(
+                    mlx_whisper.transcribe,
+                    audio_float,
+                    path_or_hf_repo=self.model_name,
+                    temperature=self._temperature,
+                    language=self.language_to_service_language(self._settings["language"]),
+                    initial_prompt=stt_prompt(),
+                )
+        except Exception as e:
+            logger.exception(f"MLX Whisper transcription error: {e}")
+            yield ErrorFrame(f"Transcription failed: {e}")
+            return
+
+        await self.stop_ttfb_metrics()
+        await self.stop_processing_metrics()
+
+        text = " ".join(
+            segment.get("text", "").strip()
+            for segment in result.get("segments", [])
+            # Same filters as WhisperSTTServiceMLX: likely silence, and the
+            # compression ratio of a known hallucination
+            if segment.get("no_speech_prob", 0.0) < self._no_speech_prob
+            and segment.get("compression_ratio") != _MLX_HALLUCINATION_RATIO
+        ).strip()
+        if text:
+            await self._handle_transcription(text, True, self._settings["language"])
+            logger.debug(f"Transcription: [{text}]")
+            yield TranscriptionFrame(text, self._user_id, time_now_iso8601(), self._settings["language"])
+
+
+class SharedFasterWhisperSTTService(_InterimTranscriptionMixin, WhisperSTTService):
+    """Whisper STT on the process-wide int8 faster-whisper model with cross-session batching."""
+
+    def __init__(self, **kwargs):
+        from faster_whisper_stt import STT_COMPUTE_TYPE, STT_DEVICE, STT_FASTER_WHISPER_MODEL
+
+        super().__init__(
+            model=STT_FASTER_WHISPER_MODEL, device=STT_DEVICE, compute_type=STT_COMPUTE_TYPE, **kwargs
+        )
+
+    def _load(self):
+        from faster_whisper_stt import shared_whisper_model
+
+        self._model = shared_whisper_model()
+
+    async def run_stt(self, audio: bytes) -> AsyncGenerator[Frame, None]:
+        from faster_whisper_stt import STT_BATCHER
+
+        await self.start_processing_metrics()
+        await self.start_ttfb_metrics()
+
+        audio_float = np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+        try:
+            text = await STT_BATCHER.transcribe(
+                audio_float, self.language_to_service_language(self._settings["language"]), stt_prompt()
+            )
+        except Exception as e:
+            yield ErrorFrame(f"Transcription failed: {e}")
+            return
+
+        await self.stop_ttfb_metrics()
+        await self.stop_processing_metrics()
+
+        if text:
+            await self._handle_transcription(text, True, self._settings["language"])
+            logger.debug(f"Transcription: [{text}]")
+            yield TranscriptionFrame(text, self._user_id, time_now_iso8601(), self._settings["language"])
+
+
+class PooledOLLamaLLMService(OLLamaLLMService):
+    """OLLamaLLMService that reuses one pooled HTTP client per Ollama endpoint."""
+
+    def create_client(self, base_url=None, **kwargs):
+        client = _llm_clients.get(base_url)
+        if client is None:
+            logger.debug(f"Creating shared Ollama client for {base_url} (pool size {LLM_POOL_SIZE})")
+            client = AsyncOpenAI(
+                api_key=kwargs.get("api_key") or "ollama",
+                base_url=base_url,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=LLM_POOL_SIZE,
+                        max_keepalive_connections=LLM_POOL_SIZE,
+                        keepalive_expiry=None,
+                    )
+                ),
+            )
+            _llm_clients[base_url] = client
+        return client
+
+
+def stt_backend() -> str:
+    """Resolve STT_BACKEND ("auto" picks MLX on Apple Silicon, faster-whisper elsewhere)."""
+    if STT_BACKEND == "auto":
+        return "mlx" if platform.system() == "Darwin" and platform.machine() == "arm64" else "faster-whisper"
+    return STT_BACKEND
+
+
+def create_stt_service() -> Optional[SegmentedSTTService]:
+    """Create a session's STT service on top of the shared Whisper model (None without STT)."""
+    backend = stt_backend()
+    if backend == "none":
+        return None
+    if backend == "faster-whisper":
+        return SharedFasterWhisperSTTService()
+    return SharedWhisperSTTServiceMLX(model=STT_MODEL)
+
+
+def create_llm_service() -> LLMService:
+    """Create a session's LLM service on top of the shared Ollama client (or the stub)."""
+    if LLM_BACKEND == "stub":
+        from stub_llm import StubLLMService
+
+        return StubLLMService()
+    return PooledOLLamaLLMService(model=OLLAMA_MODEL, base_url=OLLAMA_BASE_URL)
+
+
+def _faster_whisper_stats() -> Dict[str, Any]:
+    from faster_whisper_stt import STT_BATCHER
+
+    return STT_BATCHER.stats()
+
+
+def shared_service_stats() -> Dict[str, Any]:
+    """Queueing metrics for the shared services."""
+    return {
+        "stt": _stt_slots.stats() if stt_backend() == "mlx" else _faster_whisper_stats(),
+        "llm_clients": len(_llm_clients),
+    }
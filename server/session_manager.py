@@ -0,0 +1,98 @@
+"""
+Admission control for concurrent front-desk sessions in one process.
+
+Every connected desk runs its own pipeline, while STT and LLM resources are
+shared (see services.py). The session manager caps how many desks run at
+once, queues connections briefly when the box is full and rejects them when
+no slot frees up in time. It also tracks the active sessions for monitoring.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from loguru import logger
+
+
+# Maximum number of desk sessions hosted by one process
+MAX_DESK_SESSIONS = int(os.getenv("MAX_DESK_SESSIONS", "20"))
+
+# How long a new connection may wait for a free slot before being rejected
+ADMISSION_TIMEOUT_SECS = float(os.getenv("ADMISSION_TIMEOUT_SECS", "5"))
+
+
+class SessionLimitError(Exception):
+    """Raised when a session cannot be admitted because the process is full."""
+
+
+class DeskSession:
+    """One connected front-desk station."""
+
+    def __init__(self, session_id: str, transport: str):
+        self.session_id = session_id
+        self.transport = transport
+        self.started_at = time.time()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "transport": self.transport,
+            "uptime_secs": round(time.time() - self.started_at, 1),
+        }
+
+
+class SessionManager:
+    """Tracks desk sessions and enforces the per-process session limit."""
+
+    def __init__(self, max_sessions: int = MAX_DESK_SESSIONS, admission_timeout: float = ADMISSION_TIMEOUT_SECS):
+        self.max_sessions = max_sessions
+        self.admission_timeout = admission_timeout
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._sessions: Dict[str, DeskSession] = {}
+        self.admitted = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def session(self, transport: str = "", session_id: Optional[str] = None) -> AsyncIterator[DeskSession]:
+        """
+        Hold a session slot for the lifetime of a desk connection.
+
+        Raises:
+            SessionLimitError: If no slot became free within the admission timeout
+        """
+        if self._slots is None:
+            # Created lazily so it binds to the running event loop
+            self._slots = asyncio.Semaphore(self.max_sessions)
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.admission_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise SessionLimitError(f"All {self.max_sessions} desk sessions are in use")
+
+        desk = DeskSession(session_id or uuid.uuid4().hex[:8], transport)
+        self._sessions[desk.session_id] = desk
+        self.admitted += 1
+        logger.info(f"Desk session {desk.session_id} started ({len(self._sessions)}/{self.max_sessions} active)")
+        try:
+            yield desk
+        finally:
+            del self._sessions[desk.session_id]
+            self._slots.release()
+            logger.info(f"Desk session {desk.session_id} ended ({len(self._sessions)}/{self.max_sessions} active)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "sessions": [desk.info() for desk in self._sessions.values()],
+        }
+
+
+# Process-wide session manager used by the bot entry point
+SESSION_MANAGER = SessionManager()
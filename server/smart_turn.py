@@ -0,0 +1,50 @@
+"""
+In-process end-of-turn detection.
+
+Runs pipecat's bundled smart-turn v3 ONNX model on the CPU instead of calling
+the remote Fal endpoint, so every end-of-turn decision stays in-process and
+offline deployments get model-based turn detection instead of plain VAD.
+
+The ONNX session and Whisper feature extractor are loaded once per process
+and shared by every desk session; each session's analyzer keeps only its own
+audio buffer and single-thread executor. Inference on a shared
+onnxruntime session is thread-safe.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+from loguru import logger
+
+from pipecat.audio.turn.smart_turn.base_smart_turn import BaseSmartTurn
+from pipecat.audio.turn.smart_turn.local_smart_turn_v3 import LocalSmartTurnAnalyzerV3
+
+
+# Custom smart-turn v3 ONNX model (defaults to the model bundled with pipecat)
+SMART_TURN_MODEL_PATH = os.getenv("SMART_TURN_MODEL_PATH", "")
+
+_shared_model: Optional[LocalSmartTurnAnalyzerV3] = None
+_shared_model_lock = threading.Lock()
+
+
+def shared_turn_model() -> LocalSmartTurnAnalyzerV3:
+    """Load the smart-turn model once per process."""
+    global _shared_model
+    with _shared_model_lock:
+        if _shared_model is None:
+            _shared_model = LocalSmartTurnAnalyzerV3(smart_turn_model_path=SMART_TURN_MODEL_PATH or None)
+            logger.info("Loaded shared local smart-turn model")
+        return _shared_model
+
+
+class SharedLocalSmartTurnAnalyzer(BaseSmartTurn):
+    """Per-session smart-turn analyzer on top of the process-wide ONNX model."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._model = shared_turn_model()
+
+    def _predict_endpoint(self, audio_array: np.ndarray) -> Dict[str, Any]:
+        return self._model._predict_endpoint(audio_array)
@@ -0,0 +1,133 @@
+"""
+Versioned per-session form state for delta-encoded client updates.
+
+Each function (one per workflow form) has a version counter on the server.
+Every update bumps the version and is sent as a patch against the last
+version the client acknowledged:
+
+    {"version": 5, "base_version": 3, "patch": {<fields changed since 3>}}
+
+Patches only set fields, so one computed against an older base still
+applies cleanly on top of any newer state the client holds. The client
+acknowledges each patch it applies (state-ack); a base_version of 0 is a
+full snapshot that replaces the form. A client that sees a base newer than
+its own version (it reloaded, or missed a message) asks for a resync
+(state-resync) and receives a snapshot.
+
+Clients that never acknowledge keep receiving snapshots, which is exactly
+the old full-payload behavior.
+"""
+
+import json
+import os
+from typing import Any, Dict
+
+from loguru import logger
+
+from coalescer import field_diff
+
+
+# Unacknowledged versions kept per form to diff against; older bases get a snapshot
+STATE_HISTORY = int(os.getenv("STATE_HISTORY", "16"))
+
+
+class FormState:
+    """Current fields of one form, its version and the client's acknowledged version."""
+
+    __slots__ = ("fields", "version", "acked_version", "history")
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.version = 0
+        self.acked_version = 0
+        # Version -> fields at that version, for versions newer than acked_version
+        self.history: Dict[int, Dict[str, Any]] = {0: {}}
+
+
+class SessionStateStore:
+    """Server-side copy of a session's AI form state, producing versioned patches."""
+
+    def __init__(self, history: int = STATE_HISTORY):
+        self._history = history
+        self._forms: Dict[str, FormState] = {}
+        self.patches = 0
+        self.snapshots = 0
+        self.acks = 0
+        self.resyncs = 0
+        self.patch_bytes = 0
+        self.full_bytes = 0
+
+    def update(self, form: str, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply changed fields to a form and build the message for the client.
+
+        Args:
+            form: Function name the fields belong to
+            changes: Fields that changed since the previous update
+
+        Returns:
+            Patch envelope with version, base_version and patch fields
+        """
+        state = self._forms.setdefault(form, FormState())
+        state.fields = {**state.fields, **changes}
+        state.version += 1
+        state.history[state.version] = state.fields
+
+        # Keep the acked base plus the newest versions
+        for version in sorted(state.history)[:-self._history]:
+            if version != state.acked_version:
+                del state.history[version]
+
+        base = state.history.get(state.acked_version)
+        if base is None or state.acked_version == 0:
+            message = self.snapshot(form)
+        else:
+            message = {
+                "version": state.version,
+                "base_version": state.acked_version,
+                "patch": field_diff(base, state.fields),
+            }
+            self.patches += 1
+
+        self.patch_bytes += _size(message["patch"])
+        self.full_bytes += _size(state.fields)
+        return message
+
+    def snapshot(self, form: str) -> Dict[str, Any]:
+        """Full state of a form, applied by the client as a replacement."""
+        state = self._forms.setdefault(form, FormState())
+        self.snapshots += 1
+        return {"version": state.version, "base_version": 0, "patch": dict(state.fields)}
+
+    def ack(self, form: str, version: int) -> None:
+        """Record that the client applied the form up to ``version``."""
+        state = self._forms.get(form)
+        if state is None or not state.acked_version < version <= state.version or version not in state.history:
+            return
+        self.acks += 1
+        state.acked_version = version
+        for old in [v for v in state.history if v < version]:
+            del state.history[old]
+
+    def resync(self, form: str) -> Dict[str, Any]:
+        """Snapshot for a client that lost track of a form's state."""
+        self.resyncs += 1
+        logger.debug(f"Resyncing {form} state")
+        return self.snapshot(form)
+
+    def reset(self) -> None:
+        """Forget all forms (the client cleared them)."""
+        self._forms.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "patches": self.patches,
+            "snapshots": self.snapshots,
+            "acks": self.acks,
+            "resyncs": self.resyncs,
+            "bytes_saved": self.full_bytes - self.patch_bytes,
+        }
+
+
+def _size(fields: Dict[str, Any]) -> int:
+    return len(json.dumps(fields, default=str))
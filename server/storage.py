@@ -0,0 +1,395 @@
+"""
+Persistent storage for the front-desk workflows.
+
+Check-ins, special requests and reservation modifications are committed to a
+SQLite database (STORAGE_PATH). The schema and statements stick to SQL that
+Postgres accepts as well (ON CONFLICT upserts, no SQLite-only types), so a
+hosted database can replace the file later.
+
+- Connection pool: reads run on STORAGE_POOL_SIZE worker threads, each owning
+  one connection opened on first use, so a call never pays for connecting.
+- Prepared statements: every query is a fixed entry of STATEMENTS, and
+  sqlite3 keeps the compiled form in each connection's statement cache.
+- Batched writes: writes from all sessions are queued and committed together
+  in one transaction by a single writer thread, either when
+  STORAGE_BATCH_SIZE writes are queued or STORAGE_BATCH_MS after the first
+  one (group commit). Each caller still awaits its own write's commit;
+  request handlers go through the write-behind queue (write_behind.py) and
+  never wait for storage.
+- IDs come from ``new_id``: a readable date prefix plus 48 random bits,
+  instead of per-second timestamps that collide under concurrency.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from mock_data import MOCK_RESERVATIONS
+
+
+# SQLite database file, next to this module by default (":memory:" keeps
+# everything in-process, e.g. for benchmarks)
+STORAGE_PATH = os.getenv("STORAGE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "hotel_desk.db"))
+
+# Reader connections (one per worker thread)
+STORAGE_POOL_SIZE = int(os.getenv("STORAGE_POOL_SIZE", "4"))
+
+# Maximum time a write waits for others to share its commit
+STORAGE_BATCH_MS = float(os.getenv("STORAGE_BATCH_MS", "5"))
+
+# Queued writes that trigger an immediate commit
+STORAGE_BATCH_SIZE = int(os.getenv("STORAGE_BATCH_SIZE", "64"))
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS reservations (
+        id TEXT PRIMARY KEY,
+        guest_id TEXT,
+        room_id TEXT,
+        check_in_date TEXT NOT NULL,
+        check_out_date TEXT NOT NULL,
+        status TEXT NOT NULL,
+        special_requests TEXT,
+        total_amount REAL,
+        updated_at TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS checkins (
+        reservation_id TEXT PRIMARY KEY,
+        guest_name TEXT NOT NULL,
+        id_type TEXT NOT NULL,
+        room_number TEXT,
+        checked_in_at TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS special_requests (
+        id TEXT PRIMARY KEY,
+        room_number TEXT,
+        request_type TEXT NOT NULL,
+        details TEXT,
+        status TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS reservation_changes (
+        id TEXT PRIMARY KEY,
+        reservation_id TEXT NOT NULL,
+        new_check_in_date TEXT,
+        new_check_out_date TEXT,
+        new_room_type TEXT,
+        additional_services TEXT,
+        created_at TEXT NOT NULL
+    )""",
+]
+
+# Every query the application runs; sqlite3 caches each one prepared per connection.
+# Writes are idempotent so journaled writes can be replayed (see write_behind.py)
+STATEMENTS: Dict[str, str] = {
+    "seed_reservation": (
+        "INSERT INTO reservations (id, guest_id, room_id, check_in_date, check_out_date, status,"
+        " special_requests, total_amount, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT (id) DO NOTHING"
+    ),
+    "update_reservation_dates": (
+        "UPDATE reservations SET check_in_date = ?, check_out_date = ?, updated_at = ? WHERE id = ?"
+    ),
+    "update_reservation_room": "UPDATE reservations SET room_id = ?, updated_at = ? WHERE id = ?",
+    "update_reservation_status": "UPDATE reservations SET status = ?, updated_at = ? WHERE id = ?",
+    "upsert_checkin": (
+        "INSERT INTO checkins (reservation_id, guest_name, id_type, room_number, checked_in_at)"
+        " VALUES (?, ?, ?, ?, ?) ON CONFLICT (reservation_id) DO UPDATE SET"
+        " guest_name = excluded.guest_name, id_type = excluded.id_type, room_number = excluded.room_number"
+    ),
+    # A request is refined over several calls; empty fields keep what was saved
+    "upsert_special_request": (
+        "INSERT INTO special_requests (id, room_number, request_type, details, status, created_at)"
+        " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET"
+        " room_number = CASE WHEN excluded.room_number = '' THEN special_requests.room_number"
+        " ELSE excluded.room_number END,"
+        " request_type = excluded.request_type,"
+        " details = CASE WHEN excluded.details = '' THEN special_requests.details ELSE excluded.details END"
+    ),
+    "insert_reservation_change": (
+        "INSERT INTO reservation_changes (id, reservation_id, new_check_in_date, new_check_out_date,"
+        " new_room_type, additional_services, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT (id) DO NOTHING"
+    ),
+    "list_reservations": "SELECT id, room_id, check_in_date, check_out_date, status FROM reservations",
+}
+
+Write = Tuple[str, Sequence[Any]]
+
+
+def new_id(prefix: str) -> str:
+    """Collision-free record ID such as ``req-20251022-3f9c0a1b2d4e``."""
+    return f"{prefix}-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:12]}"
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def checkin_writes(reservation_id: str, guest_name: str, id_type: str, room_number: str) -> List[Write]:
+    """Statements committing a completed check-in and marking the reservation checked in."""
+    now = _now()
+    return [
+        ("upsert_checkin", (reservation_id, guest_name, id_type, room_number, now)),
+        ("update_reservation_status", ("checked_in", now, reservation_id)),
+    ]
+
+
+def special_request_writes(request_id: str, room_number: str, request_type: str, details: str) -> List[Write]:
+    """Statements creating a special request, or updating it when the ID exists."""
+    return [("upsert_special_request", (request_id, room_number, request_type, details, "open", _now()))]
+
+
+def modification_writes(
+    reservation: Dict[str, Any],
+    new_check_in_date: str,
+    new_check_out_date: str,
+    new_room_type: str,
+    additional_services: List[str],
+) -> List[Write]:
+    """Statements committing a reservation's dates and room together with the change record."""
+    now = _now()
+    return [
+        (
+            "update_reservation_dates",
+            (reservation["check_in_date"], reservation["check_out_date"], now, reservation["id"]),
+        ),
+        ("update_reservation_room", (reservation.get("room_id"), now, reservation["id"])),
+        (
+            "insert_reservation_change",
+            (
+                new_id("chg"),
+                reservation["id"],
+                new_check_in_date,
+                new_check_out_date,
+                new_room_type,
+                json.dumps(additional_services),
+                now,
+            ),
+        ),
+    ]
+
+
+class _PendingWrite:
+    """Statements of one ``write`` call, committed atomically within a batch."""
+
+    __slots__ = ("writes", "future", "loop")
+
+    def __init__(self, writes: Sequence[Write], future: asyncio.Future):
+        self.writes = writes
+        self.future = future
+        self.loop = future.get_loop()
+
+
+class Storage:
+    """Pooled, batched access to the desk database."""
+
+    def __init__(
+        self,
+        path: str = STORAGE_PATH,
+        pool_size: int = STORAGE_POOL_SIZE,
+        batch_secs: float = STORAGE_BATCH_MS / 1000,
+        batch_size: int = STORAGE_BATCH_SIZE,
+    ):
+        self.path = path
+        self.pool_size = pool_size
+        self.batch_secs = batch_secs
+        self.batch_size = batch_size
+        self._readers: Optional[ThreadPoolExecutor] = None
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._open_lock = threading.Lock()
+        # Held by the in-memory database so it lives as long as the Storage
+        self._keeper: Optional[sqlite3.Connection] = None
+        self._queue: List[_PendingWrite] = []
+        self._queue_lock = threading.Lock()
+        # Event loop with a pending batch timer; a write from another loop
+        # (e.g. after the server's loop stopped) schedules its own
+        self._flush_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.writes = 0
+        self.commits = 0
+        self.write_errors = 0
+
+    async def write(self, *writes: Write) -> None:
+        """
+        Queue statements for the next group commit and wait until they are committed.
+
+        All statements of one call are committed or rolled back together; a
+        failing call does not affect the others sharing its commit.
+
+        Args:
+            writes: (statement name, parameters) pairs
+        """
+        self._ensure_open()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._queue_lock:
+            self._queue.append(_PendingWrite(writes, future))
+            self.writes += len(writes)
+            flush_now = len(self._queue) >= self.batch_size
+            schedule = not flush_now and self._flush_loop is not loop
+            if schedule:
+                self._flush_loop = loop
+        if flush_now:
+            self._flush()
+        elif schedule:
+            loop.call_later(self.batch_secs, self._flush)
+        await future
+
+    async def fetch(self, statement: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """Run a read statement on a pooled connection."""
+        self._ensure_open()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._query, statement, tuple(params))
+
+    async def fetch_one(self, statement: str, params: Sequence[Any] = ()) -> Optional[Dict[str, Any]]:
+        rows = await self.fetch(statement, params)
+        return rows[0] if rows else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "writes": self.writes,
+            "commits": self.commits,
+            "writes_per_commit": round(self.writes / self.commits, 1) if self.commits else 0.0,
+            "write_errors": self.write_errors,
+        }
+
+    def close(self) -> None:
+        """Commit queued writes (blocking until they are) and shut the pool down."""
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        self._writer = self._readers = None
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
+
+    def _ensure_open(self) -> None:
+        if self._writer is not None:
+            return
+        with self._open_lock:
+            if self._writer is not None:
+                return
+            if self._is_memory:
+                self._keeper = self._connect()
+            connection = self._connect()
+            with connection:
+                for statement in SCHEMA:
+                    connection.execute(statement)
+                connection.executemany(
+                    STATEMENTS["seed_reservation"],
+                    [
+                        (
+                            r["id"], r.get("guest_id"), r.get("room_id"), r["check_in_date"], r["check_out_date"],
+                            r.get("status", "confirmed"), r.get("special_requests"), r.get("total_amount"),
+                            r.get("updated_at", _now()),
+                        )
+                        for r in MOCK_RESERVATIONS
+                    ],
+                )
+            connection.close()
+            self._readers = ThreadPoolExecutor(self.pool_size, thread_name_prefix="storage-read")
+            self._writer = ThreadPoolExecutor(1, thread_name_prefix="storage-write")
+            logger.info(f"Opened storage at {self.path} ({self.pool_size} reader connections)")
+
+    @property
+    def _is_memory(self) -> bool:
+        return self.path == ":memory:"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._is_memory:
+            # Named shared-cache database so every pooled connection sees the same data
+            target = f"file:storage-{id(self)}?mode=memory&cache=shared"
+        else:
+            target = self.path
+        connection = sqlite3.connect(
+            target,
+            uri=self._is_memory,
+            check_same_thread=False,
+            cached_statements=len(STATEMENTS) * 2,
+            isolation_level=None,
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA busy_timeout = 5000")
+        if not self._is_memory:
+            # Readers never block the writer (and vice versa)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per pool thread, opened on the thread's first query
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def _query(self, statement: str, params: Tuple[Any, ...]) -> List[Dict[str, Any]]:
+        cursor = self._connection().execute(STATEMENTS[statement], params)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def _flush(self) -> None:
+        with self._queue_lock:
+            batch, self._queue = self._queue, []
+            self._flush_loop = None
+        if batch:
+            self._writer.submit(self._commit_batch, batch)
+
+    def _commit_batch(self, batch: List[_PendingWrite]) -> None:
+        connection = self._connection()
+        errors: List[Optional[Exception]] = []
+        try:
+            connection.execute("BEGIN")
+            for pending in batch:
+                errors.append(self._apply(connection, pending.writes))
+            connection.execute("COMMIT")
+            self.commits += 1
+        except Exception as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            errors = [e] * len(batch)
+
+        for pending, error in zip(batch, errors):
+            if error is not None:
+                self.write_errors += 1
+            try:
+                pending.loop.call_soon_threadsafe(_resolve, pending.future, error)
+            except RuntimeError:
+                # The caller's event loop closed (shutdown); nobody awaits this write any more
+                pass
+
+    @staticmethod
+    def _apply(connection: sqlite3.Connection, writes: Sequence[Write]) -> Optional[Exception]:
+        # Savepoints keep one caller's failed statements out of the shared commit
+        connection.execute("SAVEPOINT write_group")
+        try:
+            for statement, params in writes:
+                connection.execute(STATEMENTS[statement], tuple(params))
+        except Exception as e:
+            connection.execute("ROLLBACK TO SAVEPOINT write_group")
+            connection.execute("RELEASE SAVEPOINT write_group")
+            return e
+        connection.execute("RELEASE SAVEPOINT write_group")
+        return None
+
+
+def _resolve(future: asyncio.Future, error: Optional[Exception]) -> None:
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+
+# Process-wide storage shared by every desk session
+STORAGE = Storage()
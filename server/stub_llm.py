@@ -0,0 +1,83 @@
+"""
+Deterministic stand-in for the Ollama LLM (LLM_BACKEND=stub).
+
+Benchmarks and load tests need the rest of the pipeline (context aggregation,
+function dispatch, state patches) without a model server and without
+inference time that varies from run to run. StubLLMService answers each
+user turn with the function calls the fast-path rules find in it (see
+fast_path.match_rules), including the utterances the fast path itself
+declined because they were ambiguous, and stays silent after function
+results, like the real model is instructed to. STUB_LLM_LATENCY_MS adds a
+fixed inference delay to model a real LLM's cost.
+"""
+
+import asyncio
+import os
+import uuid
+from typing import Any, Dict, List
+
+from pipecat.frames.frames import (
+    Frame,
+    FunctionCallFromLLM,
+    LLMContextFrame,
+    LLMFullResponseEndFrame,
+    LLMFullResponseStartFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection
+from pipecat.services.llm_service import LLMService
+
+from fast_path import match_rules
+
+
+# Simulated inference time per response
+STUB_LLM_LATENCY_MS = float(os.getenv("STUB_LLM_LATENCY_MS", "0"))
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+class StubLLMService(LLMService):
+    """LLM service that extracts function calls with the fast-path rules."""
+
+    def __init__(self, latency_secs: float = STUB_LLM_LATENCY_MS / 1000, **kwargs):
+        super().__init__(**kwargs)
+        self._latency_secs = latency_secs
+        self.responses = 0
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        if isinstance(frame, LLMContextFrame):
+            await self._respond(frame.context)
+        else:
+            await self.push_frame(frame, direction)
+
+    async def _respond(self, context) -> None:
+        await self.push_frame(LLMFullResponseStartFrame())
+        await self.start_processing_metrics()
+        await self.start_ttfb_metrics()
+        if self._latency_secs > 0:
+            await asyncio.sleep(self._latency_secs)
+        await self.stop_ttfb_metrics()
+
+        messages: List[Dict[str, Any]] = context.get_messages()
+        last = messages[-1] if messages else {}
+        # Only a new user turn gets calls; after function results the model stays silent
+        if last.get("role") == "user":
+            await self.run_function_calls([
+                FunctionCallFromLLM(
+                    function_name=function_name,
+                    tool_call_id=f"stub-{uuid.uuid4().hex[:12]}",
+                    arguments=arguments,
+                    context=context,
+                )
+                for function_name, arguments in match_rules(_message_text(last))
+            ])
+
+        self.responses += 1
+        await self.stop_processing_metrics()
+        await self.push_frame(LLMFullResponseEndFrame())
@@ -0,0 +1,115 @@
+"""
+Transport parameter factories for the bot entry point.
+
+The runner hands each connection to ``create_transport`` together with a dict
+of per-transport parameter factories and calls only the factory for the
+transport actually in use. All transport-, VAD- and turn-analyzer-specific
+imports therefore live inside the factories, so a process serving WebRTC
+never imports Daily or the FastAPI websocket stack, and analyzers are only
+constructed for the connection that needs them.
+"""
+
+import os
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+
+# Seconds of silence before VAD reports the end of speech
+VAD_STOP_SECS = float(os.getenv("VAD_STOP_SECS", "0.2"))
+
+# End-of-turn detection: auto, local (in-process smart-turn), remote (Fal) or none
+TURN_ANALYZER = os.getenv("TURN_ANALYZER", "auto").lower()
+
+# Silence after which the smart-turn analyzers end the turn regardless of the model
+SMART_TURN_STOP_SECS = float(os.getenv("SMART_TURN_STOP_SECS", "3.0"))
+
+
+def create_vad_analyzer():
+    """Create a Silero VAD analyzer for one connection."""
+    from pipecat.audio.vad.silero import SileroVADAnalyzer
+    from pipecat.audio.vad.vad_analyzer import VADParams
+
+    return SileroVADAnalyzer(params=VADParams(stop_secs=VAD_STOP_SECS))
+
+
+def turn_analyzer_kind() -> str:
+    """Resolve TURN_ANALYZER ("auto" uses the remote service when configured, else local)."""
+    if TURN_ANALYZER == "auto":
+        return "remote" if os.getenv("REMOTE_SMART_TURN_URL") else "local"
+    return TURN_ANALYZER
+
+
+def create_turn_analyzer() -> Optional[Any]:
+    """Create the end-of-turn analyzer selected by TURN_ANALYZER, or None for plain VAD."""
+    kind = turn_analyzer_kind()
+    if kind == "none":
+        return None
+
+    from pipecat.audio.turn.smart_turn.base_smart_turn import SmartTurnParams
+
+    params = SmartTurnParams(
+        stop_secs=SMART_TURN_STOP_SECS,
+        pre_speech_ms=0.0,
+        max_duration_secs=8.0
+    )
+
+    if kind == "remote":
+        remote_smart_turn_url = os.getenv("REMOTE_SMART_TURN_URL")
+        if not remote_smart_turn_url:
+            logger.warning("TURN_ANALYZER=remote but REMOTE_SMART_TURN_URL is not set; using VAD only")
+            return None
+
+        from pipecat.audio.turn.smart_turn.fal_smart_turn import FalSmartTurnAnalyzer
+
+        return FalSmartTurnAnalyzer(url=remote_smart_turn_url, params=params)
+
+    from smart_turn import SharedLocalSmartTurnAnalyzer
+
+    return SharedLocalSmartTurnAnalyzer(params=params)
+
+
+def _audio_params() -> Dict[str, Any]:
+    return {
+        "audio_in_enabled": True,
+        "audio_out_enabled": False,
+        "vad_analyzer": create_vad_analyzer(),
+        "turn_analyzer": create_turn_analyzer(),
+    }
+
+
+def _daily_params():
+    from pipecat.transports.daily.transport import DailyParams
+
+    return DailyParams(**_audio_params())
+
+
+def _websocket_params():
+    from pipecat.transports.websocket.fastapi import FastAPIWebsocketParams
+
+    return FastAPIWebsocketParams(**_audio_params())
+
+
+def rtvi_websocket_params():
+    """Parameters for RTVI clients on a plain websocket (see websocket_server.py)."""
+    from pipecat.serializers.protobuf import ProtobufFrameSerializer
+    from pipecat.transports.websocket.fastapi import FastAPIWebsocketParams
+
+    # The serializer of the RTVI websocket client; unlike the telephony
+    # serializers it carries RTVI messages as well as audio
+    return FastAPIWebsocketParams(serializer=ProtobufFrameSerializer(), **_audio_params())
+
+
+def _webrtc_params():
+    from pipecat.transports.base_transport import TransportParams
+
+    return TransportParams(**_audio_params())
+
+
+def transport_params() -> Dict[str, Callable[[], Any]]:
+    """Parameter factories keyed by the runner's transport names."""
+    return {
+        "daily": _daily_params,
+        "twilio": _websocket_params,
+        "webrtc": _webrtc_params,
+    }
@@ -0,0 +1,222 @@
+"""
+Hotel vocabulary for speech recognition.
+
+Whisper has never heard most guest names, so "John Smith" arrives as
+"Jon Smyth" and a "suite" as a "sweet". Every misheard word costs an extra
+LLM call or a reservation search that misses. HotelVocabulary uses the words
+the desk is most likely to hear in two places:
+
+- Biasing: ``prompt()`` lists the expected and in-house guests (closest
+  check-in to today first, up to VOCABULARY_MAX_NAMES), the room numbers and
+  the room types. It is passed to Whisper as hotwords (faster-whisper) or
+  initial prompt (MLX).
+- Correction: VocabularyCorrectionProcessor sits right after STT and
+  rewrites transcript words that sound like a guest name word (same Soundex
+  key, see reservation_index.py) and share enough of its character trigrams,
+  plus a few known room-type mishearings. Decisions are cached per word, so
+  a transcript usually costs one dict lookup per word.
+
+The vocabulary is rebuilt from the reservation and availability indexes
+every VOCABULARY_REFRESH_SECS, so new arrivals are picked up as the day goes
+on. Set STT_VOCABULARY=false to disable both.
+"""
+
+import os
+import re
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional, Set
+
+from loguru import logger
+
+from pipecat.frames.frames import Frame, InterimTranscriptionFrame, TranscriptionFrame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from functions import AVAILABILITY_INDEX, RESERVATION_INDEX
+from reservation_index import soundex, trigrams
+
+
+# Set to "false" to disable STT biasing and transcript correction
+VOCABULARY_ENABLED = os.getenv("STT_VOCABULARY", "true").lower() != "false"
+
+# Guest names included in the STT prompt (Whisper's prompt holds ~220 tokens)
+VOCABULARY_MAX_NAMES = int(os.getenv("VOCABULARY_MAX_NAMES", "40"))
+
+# Seconds before the vocabulary is rebuilt from the indexes
+VOCABULARY_REFRESH_SECS = float(os.getenv("VOCABULARY_REFRESH_SECS", "300"))
+
+# Share of a heard word's trigrams a vocabulary word must contain to replace it
+VOCABULARY_MIN_SIMILARITY = float(os.getenv("VOCABULARY_MIN_SIMILARITY", "0.5"))
+
+# Cached per-word correction decisions (cleared when full)
+VOCABULARY_CACHE_SIZE = 4096
+
+# Reservations whose guests the desk can expect to talk to
+_ACTIVE_STATUSES = ("confirmed", "checked_in")
+
+# Mishearings too far from the word to be caught phonetically
+_ALIASES = {"sweet": "suite", "sweets": "suites"}
+
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z'-]*")
+
+
+class HotelVocabulary:
+    """Guest names, room numbers and room types for STT biasing and correction."""
+
+    def __init__(self, refresh_secs: float = VOCABULARY_REFRESH_SECS, min_similarity: float = VOCABULARY_MIN_SIMILARITY):
+        self.refresh_secs = refresh_secs
+        self.min_similarity = min_similarity
+        self._built_at: Optional[float] = None
+        self._prompt = ""
+        self._words: Dict[str, str] = {}
+        # Soundex key -> lowercase vocabulary words
+        self._by_soundex: Dict[str, List[str]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        # Lowercase heard word -> replacement (None to keep it)
+        self._corrections: Dict[str, Optional[str]] = {}
+        self.transcripts = 0
+        self.corrected_transcripts = 0
+        self.corrected_words = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._correct_secs = 0.0
+
+    def prompt(self) -> str:
+        """Text to bias the STT model towards the hotel's vocabulary."""
+        self._refresh()
+        return self._prompt
+
+    def correct(self, text: str) -> str:
+        """
+        Replace misheard vocabulary words in a transcript.
+
+        Args:
+            text: Transcript from the STT service
+
+        Returns:
+            The transcript with misheard names and room types corrected
+        """
+        start = time.perf_counter()
+        self._refresh()
+        corrected_words = 0
+
+        def replace(match: "re.Match[str]") -> str:
+            nonlocal corrected_words
+            word = match.group(0)
+            replacement = self._correction(word.lower())
+            if replacement is None:
+                return word
+            corrected_words += 1
+            return replacement[0].upper() + replacement[1:] if word[0].isupper() else replacement
+
+        corrected = _WORD_RE.sub(replace, text)
+        self.transcripts += 1
+        if corrected_words:
+            self.corrected_transcripts += 1
+            self.corrected_words += corrected_words
+            logger.debug(f"Vocabulary correction: [{text}] -> [{corrected}]")
+        self._correct_secs += time.perf_counter() - start
+        return corrected
+
+    def invalidate(self) -> None:
+        """Rebuild the vocabulary on next use (e.g. after loading new reservations)."""
+        self._built_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "words": len(self._words),
+            "transcripts": self.transcripts,
+            "corrected_transcripts": self.corrected_transcripts,
+            "corrected_words": self.corrected_words,
+            "cache_hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "avg_correct_us": self._correct_secs / self.transcripts * 1e6 if self.transcripts else 0.0,
+        }
+
+    def _correction(self, word: str) -> Optional[str]:
+        if word in self._corrections:
+            self.cache_hits += 1
+            return self._corrections[word]
+
+        self.cache_misses += 1
+        replacement = _ALIASES.get(word)
+        if replacement is None and len(word) >= 3 and word not in self._words:
+            query_grams = trigrams(word)
+            best_similarity = self.min_similarity
+            for candidate in self._by_soundex.get(soundex(word), ()):
+                similarity = len(query_grams & self._trigrams[candidate]) / len(query_grams)
+                if similarity >= best_similarity:
+                    replacement, best_similarity = self._words[candidate], similarity
+
+        if len(self._corrections) >= VOCABULARY_CACHE_SIZE:
+            self._corrections.clear()
+        self._corrections[word] = replacement
+        return replacement
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._built_at is not None and now - self._built_at < self.refresh_secs:
+            return
+
+        today = date.today().toordinal()
+        active = [r for r in RESERVATION_INDEX.reservations() if r.get("status") in _ACTIVE_STATUSES]
+        # Today's arrivals first, then the closest check-ins either side
+        active.sort(key=lambda r: abs(date.fromisoformat(r["check_in_date"]).toordinal() - today))
+
+        # Ordered and de-duplicated
+        names = list(dict.fromkeys(
+            " ".join(((reservation.get("guest") or {}).get("name") or "").split()) for reservation in active
+        ))
+        names = [name for name in names if name]
+
+        rooms = AVAILABILITY_INDEX.rooms
+        room_numbers = sorted({room["room_number"] for room in rooms})
+        room_types = sorted({room["room_type"] for room in rooms})
+
+        # Whisper follows the style of the prompt, so keep it a plain sentence
+        parts = ["Hotel front desk."]
+        if names:
+            parts.append(f"Guests: {', '.join(names[:VOCABULARY_MAX_NAMES])}.")
+        if room_numbers:
+            parts.append(f"Rooms {', '.join(room_numbers)}.")
+        if room_types:
+            parts.append(f"Room types: {', '.join(room_types)}.")
+        self._prompt = " ".join(parts)
+
+        # Every active guest is corrected to, not only the ones in the prompt.
+        # Room types are ordinary words ("suit" -> "suite" would be wrong), so
+        # they are only reached through _ALIASES.
+        name_words = {word.lower(): word for name in names for word in _WORD_RE.findall(name)}
+        self._words = {**name_words, **{room_type.lower(): room_type for room_type in room_types}}
+        self._by_soundex = {}
+        for word in name_words:
+            self._by_soundex.setdefault(soundex(word), []).append(word)
+        self._trigrams = {word: trigrams(word) for word in name_words}
+        self._corrections.clear()
+        self._built_at = now
+
+
+# Process-wide vocabulary shared by every desk session
+HOTEL_VOCABULARY = HotelVocabulary()
+
+
+def stt_prompt() -> Optional[str]:
+    """The STT biasing prompt, or None with STT_VOCABULARY=false."""
+    return HOTEL_VOCABULARY.prompt() if VOCABULARY_ENABLED else None
+
+
+class VocabularyCorrectionProcessor(FrameProcessor):
+    """Corrects misheard guest names and room types in transcriptions before extraction."""
+
+    def __init__(self, vocabulary: HotelVocabulary = HOTEL_VOCABULARY, **kwargs):
+        super().__init__(**kwargs)
+        self._vocabulary = vocabulary
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+
+        # Interim transcripts too, so speculative extraction sees the same words
+        if isinstance(frame, (TranscriptionFrame, InterimTranscriptionFrame)) and frame.text:
+            frame.text = self._vocabulary.correct(frame.text)
+
+        await self.push_frame(frame, direction)
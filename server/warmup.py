@@ -0,0 +1,143 @@
+"""
+Process start-up warm-up for the speech and language models.
+
+Loading Whisper, initializing Silero VAD and the local smart-turn model, and
+the first Ollama inference each take seconds when done cold. Running them
+once on canned input before any desk connects moves that cost to process
+start: the Whisper weights stay in mlx_whisper's per-process model cache (or
+in the shared faster-whisper model), the smart-turn model is shared by all
+sessions, and Ollama keeps the model (and the evaluated system prompt) loaded
+for the next request. Sessions only signal bot-ready once the warm-up has
+finished.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import numpy as np
+from loguru import logger
+
+if TYPE_CHECKING:
+    from pipecat.adapters.schemas.tools_schema import ToolsSchema
+
+
+# Set to "false" to skip warm-up (e.g. when models are already resident)
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() != "false"
+
+SAMPLE_RATE = 16000
+
+
+class ModelWarmup:
+    """Runs each warm-up stage once and records how long it took."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._task: Optional[asyncio.Future] = None
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def run(self, system_instruction: str, tools: "ToolsSchema") -> Dict[str, float]:
+        """Warm up STT, VAD and the LLM (blocking). Later calls return the first report."""
+        with self._lock:
+            if self._done.is_set():
+                return self.timings
+
+            if WARMUP_ENABLED:
+                start = time.perf_counter()
+                self._stage("stt", self._warm_stt)
+                self._stage("vad", self._warm_vad)
+                self._stage("turn", self._warm_turn)
+                self._stage("llm", lambda: self._warm_llm(system_instruction, tools))
+                self.timings["total"] = time.perf_counter() - start
+                summary = ", ".join(f"{stage}={secs:.2f}s" for stage, secs in self.timings.items())
+                logger.info(f"Model warm-up finished: {summary}")
+            else:
+                logger.info("Model warm-up disabled")
+
+            self._done.set()
+            return self.timings
+
+    async def wait_ready(self, system_instruction: str, tools: "ToolsSchema") -> None:
+        """Wait for warm-up, starting it in a worker thread if it has not run yet."""
+        if self._done.is_set():
+            return
+        if self._task is None:
+            self._task = asyncio.ensure_future(
+                asyncio.to_thread(self.run, system_instruction, tools)
+            )
+        await asyncio.shield(self._task)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "timings_secs": dict(self.timings),
+            "errors": dict(self.errors),
+        }
+
+    def _stage(self, name: str, fn) -> None:
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            # A failed stage only means that model stays cold; sessions still work
+            self.errors[name] = str(e)
+            logger.warning(f"Warm-up stage {name} failed: {e}")
+        self.timings[name] = time.perf_counter() - start
+        logger.info(f"Warm-up stage {name}: {self.timings[name]:.2f}s")
+
+    def _warm_stt(self) -> None:
+        from services import STT_MODEL, stt_backend
+
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        backend = stt_backend()
+        if backend == "faster-whisper":
+            from faster_whisper_stt import shared_whisper_model
+
+            # Loads the shared CTranslate2 model and runs one decode
+            list(shared_whisper_model().transcribe(silence, language="en")[0])
+        elif backend == "mlx":
+            import mlx_whisper
+
+            # One second of silence loads the weights into mlx_whisper's model cache
+            mlx_whisper.transcribe(silence, path_or_hf_repo=STT_MODEL.value, language="en")
+
+    def _warm_vad(self) -> None:
+        from transports import create_vad_analyzer
+
+        vad = create_vad_analyzer()
+        vad.set_sample_rate(SAMPLE_RATE)
+        silence = bytes(vad.num_frames_required() * 2)
+        vad.voice_confidence(silence)
+
+    def _warm_turn(self) -> None:
+        from transports import turn_analyzer_kind
+
+        if turn_analyzer_kind() != "local":
+            return
+
+        from smart_turn import shared_turn_model
+
+        shared_turn_model()._predict_endpoint(np.zeros(SAMPLE_RATE, dtype=np.float32))
+
+    def _warm_llm(self, system_instruction: str, tools: "ToolsSchema") -> None:
+        from services import LLM_BACKEND
+
+        if LLM_BACKEND != "ollama":
+            return
+
+        from prefix_cache import PREFIX_CACHE
+
+        # Loads the model and evaluates the exact prompt prefix the pipeline sends
+        asyncio.run(PREFIX_CACHE.prime(system_instruction, tools))
+
+
+# Process-wide warm-up state
+MODEL_WARMUP = ModelWarmup()
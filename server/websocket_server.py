@@ -0,0 +1,80 @@
+"""
+Plain RTVI websocket entry point for the bot.
+
+The pipecat runner (python bot.py) serves WebRTC and Daily, and websockets
+only for telephony providers, whose serializers carry audio but not RTVI
+messages. This entry point serves /ws with the protobuf serializer of the
+RTVI websocket client, so a client can send client-ready, custom-message and
+the state messages and receive llm-function-call updates over one socket.
+Each connection runs the same run_bot pipeline and admission control as a
+runner session. Used by the load generator (benchmarks/bench_load.py).
+
+Usage:
+    python websocket_server.py --host 0.0.0.0 --port 7861
+"""
+
+import argparse
+import asyncio
+
+from fastapi import FastAPI, WebSocket
+from loguru import logger
+
+from bot import SYSTEM_INSTRUCTION, TOOLS, run_bot
+from functions import load_saved_reservations
+from session_manager import SESSION_MANAGER, SessionLimitError
+from storage import STORAGE
+from transports import rtvi_websocket_params
+from warmup import MODEL_WARMUP
+from write_behind import WRITE_BEHIND
+
+
+app = FastAPI()
+
+
+@app.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket):
+    """Run one desk session for the lifetime of the websocket."""
+    from pipecat.transports.websocket.fastapi import FastAPIWebsocketTransport
+
+    await websocket.accept()
+    try:
+        async with SESSION_MANAGER.session(transport="rtvi-websocket") as desk:
+            transport = FastAPIWebsocketTransport(websocket=websocket, params=rtvi_websocket_params())
+            await run_bot(transport, desk.session_id)
+    except SessionLimitError as e:
+        logger.warning(f"Rejected desk connection: {e}")
+        # 1013: try again later
+        await websocket.close(code=1013)
+
+
+@app.get("/sessions")
+async def sessions():
+    """Active desk sessions, for monitoring."""
+    return SESSION_MANAGER.stats()
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost", help="Host to bind")
+    parser.add_argument("--port", type=int, default=7861, help="Port to listen on")
+    args = parser.parse_args()
+
+    # Commit the writes a previous process left in the journal, then load the saved bookings
+    asyncio.run(WRITE_BEHIND.recover())
+    asyncio.run(load_saved_reservations())
+
+    # Load and exercise STT, VAD and the LLM before accepting connections
+    MODEL_WARMUP.run(SYSTEM_INSTRUCTION, TOOLS)
+
+    try:
+        uvicorn.run(app, host=args.host, port=args.port)
+    finally:
+        # Persist what the sessions left queued before the process exits
+        asyncio.run(WRITE_BEHIND.close())
+        STORAGE.close()
+
+
+if __name__ == "__main__":
+    main()
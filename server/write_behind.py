@@ -0,0 +1,279 @@
+"""
+Write-behind persistence for the workflow handlers.
+
+Handlers hand their storage writes to WRITE_BEHIND and return immediately, so
+a slow or unavailable database never delays form population. Each entry is
+first appended to an on-disk journal (WRITE_BEHIND_JOURNAL), then committed
+in the background through storage.py, which batches the writes of all queued
+entries into shared commits.
+
+- Retries: a failed entry is retried with exponential backoff up to
+  WRITE_BEHIND_MAX_RETRIES times, then moved to the ``.failed`` file next to
+  the journal for manual replay.
+- Durability: the journal is flushed on every append (and fsynced when
+  WRITE_BEHIND_FSYNC is set). Entries not marked done are replayed by
+  ``recover()`` when the next process starts; the storage writes are
+  idempotent, so replaying an entry that was committed just before a crash
+  is harmless. The journal is truncated whenever the queue drains, and
+  ``close()`` commits what is left at shutdown.
+- Metrics: queue depth, lag of the oldest pending entry and commit lag of
+  persisted entries, via ``stats()``.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+from storage import STORAGE, Storage, Write, new_id
+
+
+# Append-only journal of pending writes, next to this module by default
+WRITE_BEHIND_JOURNAL = os.getenv(
+    "WRITE_BEHIND_JOURNAL", os.path.join(os.path.dirname(os.path.abspath(__file__)), "hotel_desk.journal")
+)
+
+# fsync the journal on every append (survives power loss, costs a disk flush per write)
+WRITE_BEHIND_FSYNC = os.getenv("WRITE_BEHIND_FSYNC", "false").lower() == "true"
+
+# Attempts after the first failure before an entry is moved to the failed file
+WRITE_BEHIND_MAX_RETRIES = int(os.getenv("WRITE_BEHIND_MAX_RETRIES", "5"))
+
+# Delay before the first retry; doubles on every further attempt
+WRITE_BEHIND_RETRY_SECS = float(os.getenv("WRITE_BEHIND_RETRY_SECS", "0.5"))
+
+# Entries handed to storage at once (they share its group commit)
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "64"))
+
+# Longest close() waits for pending entries at shutdown; the rest stay journaled for the next start
+WRITE_BEHIND_CLOSE_SECS = float(os.getenv("WRITE_BEHIND_CLOSE_SECS", "30"))
+
+
+class _Entry:
+    """One handler's writes, persisted atomically."""
+
+    __slots__ = ("entry_id", "what", "writes", "enqueued_at", "attempts", "next_attempt")
+
+    def __init__(self, entry_id: str, what: str, writes: Sequence[Write], enqueued_at: float):
+        self.entry_id = entry_id
+        self.what = what
+        self.writes = writes
+        self.enqueued_at = enqueued_at
+        self.attempts = 0
+        self.next_attempt = 0.0
+
+    def record(self) -> Dict[str, Any]:
+        return {
+            "op": "write",
+            "id": self.entry_id,
+            "what": self.what,
+            "writes": [[statement, list(params)] for statement, params in self.writes],
+            "at": self.enqueued_at,
+        }
+
+
+class WriteBehindQueue:
+    """Journaled background queue in front of the storage layer."""
+
+    def __init__(
+        self,
+        storage: Storage = STORAGE,
+        journal_path: str = WRITE_BEHIND_JOURNAL,
+        max_retries: int = WRITE_BEHIND_MAX_RETRIES,
+        retry_secs: float = WRITE_BEHIND_RETRY_SECS,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+    ):
+        self._storage = storage
+        self.journal_path = journal_path
+        self.max_retries = max_retries
+        self.retry_secs = retry_secs
+        self.batch_size = batch_size
+        self._pending: Dict[str, _Entry] = {}
+        self._journal = None
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.persisted = 0
+        self.retries = 0
+        self.failed = 0
+        self.recovered = 0
+        self.max_lag_ms = 0.0
+        self._total_lag_ms = 0.0
+
+    def enqueue(self, what: str, writes: Sequence[Write]) -> str:
+        """
+        Journal writes and schedule them for a background commit.
+
+        Args:
+            what: Short description for logs ("special request", ...)
+            writes: (statement name, parameters) pairs committed together
+
+        Returns:
+            The journal entry ID
+        """
+        self.open()
+        entry = _Entry(new_id("wb"), what, writes, time.time())
+        self._append(entry.record())
+        self._pending[entry.entry_id] = entry
+        self.enqueued += 1
+        self._start()
+        return entry.entry_id
+
+    def open(self) -> None:
+        """Open the journal, queueing the entries a previous process left unfinished."""
+        if self._journal is not None:
+            return
+        for entry in self._read_journal():
+            self._pending[entry.entry_id] = entry
+        self.recovered = len(self._pending)
+        self._journal = open(self.journal_path, "w", encoding="utf-8")
+        for entry in self._pending.values():
+            self._append(entry.record())
+        if self.recovered:
+            logger.info(f"Recovered {self.recovered} unfinished writes from {self.journal_path}")
+
+    async def recover(self) -> int:
+        """
+        Replay the journal and wait until the recovered entries are committed.
+
+        Run at startup, so a crashed process's writes reach the database before
+        the first desk connects rather than with the first handler call.
+
+        Returns:
+            The number of recovered entries
+        """
+        self.open()
+        if self._pending:
+            self._start()
+        await self.drain()
+        return self.recovered
+
+    async def drain(self) -> None:
+        """Wait until every pending entry is persisted or given up on."""
+        while self._task and not self._task.done():
+            await asyncio.shield(self._task)
+
+    async def close(self, timeout: float = WRITE_BEHIND_CLOSE_SECS) -> None:
+        """
+        Commit every pending entry and close the journal.
+
+        Safe to call from a new event loop after the server's loop has
+        stopped: entries whose commit was cancelled with it are resubmitted.
+
+        Args:
+            timeout: Seconds to wait for the commits; entries still pending
+                after that stay in the journal and are replayed at the next start
+        """
+        if self._pending:
+            self._start()
+        try:
+            await asyncio.wait_for(self.drain(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{len(self._pending)} writes not saved at shutdown; kept in {self.journal_path}")
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def stats(self) -> Dict[str, Any]:
+        oldest = min((entry.enqueued_at for entry in self._pending.values()), default=None)
+        return {
+            "depth": len(self._pending),
+            "lag_ms": (time.time() - oldest) * 1000 if oldest else 0.0,
+            "enqueued": self.enqueued,
+            "persisted": self.persisted,
+            "retries": self.retries,
+            "failed": self.failed,
+            "recovered": self.recovered,
+            "avg_commit_lag_ms": self._total_lag_ms / self.persisted if self.persisted else 0.0,
+            "max_commit_lag_ms": self.max_lag_ms,
+        }
+
+    def _read_journal(self) -> List[_Entry]:
+        entries: Dict[str, _Entry] = {}
+        try:
+            with open(self.journal_path, encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn last line from a crash mid-append
+                    if record.get("op") == "write":
+                        writes = [(statement, params) for statement, params in record["writes"]]
+                        entries[record["id"]] = _Entry(record["id"], record["what"], writes, record["at"])
+                    else:
+                        entries.pop(record.get("id"), None)
+        except FileNotFoundError:
+            pass
+        return list(entries.values())
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        try:
+            self._journal.write(json.dumps(record) + "\n")
+            self._journal.flush()
+            if WRITE_BEHIND_FSYNC:
+                os.fsync(self._journal.fileno())
+        except OSError as e:
+            # The entry stays queued in memory; it only loses crash safety
+            logger.error(f"Failed to journal write-behind entry: {e}")
+
+    def _start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._pending:
+            now = time.monotonic()
+            ready = [entry for entry in self._pending.values() if entry.next_attempt <= now][: self.batch_size]
+            if not ready:
+                await asyncio.sleep(min(entry.next_attempt for entry in self._pending.values()) - now)
+                continue
+
+            results = await asyncio.gather(
+                *(self._storage.write(*entry.writes) for entry in ready), return_exceptions=True
+            )
+            for entry, result in zip(ready, results):
+                if isinstance(result, Exception):
+                    self._retry(entry, result)
+                else:
+                    self._done(entry)
+
+        # Queue drained: nothing in the journal is needed any more
+        self._journal.seek(0)
+        self._journal.truncate()
+
+    def _done(self, entry: _Entry) -> None:
+        del self._pending[entry.entry_id]
+        self._append({"op": "done", "id": entry.entry_id})
+        lag_ms = (time.time() - entry.enqueued_at) * 1000
+        self.persisted += 1
+        self._total_lag_ms += lag_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def _retry(self, entry: _Entry, error: Exception) -> None:
+        entry.attempts += 1
+        if entry.attempts <= self.max_retries:
+            self.retries += 1
+            entry.next_attempt = time.monotonic() + self.retry_secs * 2 ** (entry.attempts - 1)
+            logger.warning(f"Saving {entry.what} failed (attempt {entry.attempts}), retrying: {error}")
+            return
+
+        del self._pending[entry.entry_id]
+        self.failed += 1
+        logger.error(f"Giving up on saving {entry.what} after {entry.attempts} attempts: {error}")
+        try:
+            with open(f"{self.journal_path}.failed", "a", encoding="utf-8") as failed:
+                failed.write(json.dumps({**entry.record(), "error": str(error)}) + "\n")
+        except OSError as e:
+            logger.error(f"Failed to record failed write-behind entry: {e}")
+        self._append({"op": "failed", "id": entry.entry_id})
+
+
+# Process-wide write-behind queue shared by every desk session
+WRITE_BEHIND = WriteBehindQueue()